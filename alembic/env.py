@@ -14,6 +14,12 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Use the same DATABASE_URL as the app instead of the URL in alembic.ini.
+# Migrations keep their own NullPool engine: they run once, hold a single
+# connection and must not be cut off by the app's statement_timeout.
+from core.config import settings
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
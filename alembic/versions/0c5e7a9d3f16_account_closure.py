@@ -0,0 +1,50 @@
+"""account closure
+
+Revision ID: 0c5e7a9d3f16
+Revises: f3a8c1d6e290
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5e7a9d3f16'
+down_revision: Union[str, None] = 'f3a8c1d6e290'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'account_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['accounts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['accounts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index(op.f('ix_account_closure_descendant_id'), 'account_closure', ['descendant_id'], unique=False)
+    op.execute(
+        """
+        INSERT INTO account_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM accounts
+            UNION ALL
+            SELECT tree.ancestor_id, accounts.id, tree.depth + 1
+            FROM tree JOIN accounts ON accounts.parent_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_account_closure_descendant_id'), table_name='account_closure')
+    op.drop_table('account_closure')
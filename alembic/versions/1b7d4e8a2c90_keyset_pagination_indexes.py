@@ -0,0 +1,42 @@
+"""keyset pagination indexes
+
+Revision ID: 1b7d4e8a2c90
+Revises: 
+Create Date: 2026-10-18 10:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7d4e8a2c90'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_product_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('idx_product_updated_at_id', 'products', ['updated_at', 'id'], unique=False)
+    op.create_index('idx_product_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('idx_customer_created_at_id', 'customers', ['created_at', 'id'], unique=False)
+    op.create_index('idx_customer_updated_at_id', 'customers', ['updated_at', 'id'], unique=False)
+    op.create_index('idx_customer_name_id', 'customers', ['customer_name', 'id'], unique=False)
+    op.create_index('idx_category_created_at_id', 'categories', ['created_at', 'id'], unique=False)
+    op.create_index('idx_category_updated_at_id', 'categories', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_category_updated_at_id', table_name='categories')
+    op.drop_index('idx_category_created_at_id', table_name='categories')
+    op.drop_index('idx_customer_name_id', table_name='customers')
+    op.drop_index('idx_customer_updated_at_id', table_name='customers')
+    op.drop_index('idx_customer_created_at_id', table_name='customers')
+    op.drop_index('idx_product_name_id', table_name='products')
+    op.drop_index('idx_product_updated_at_id', table_name='products')
+    op.drop_index('idx_product_created_at_id', table_name='products')
@@ -0,0 +1,36 @@
+"""product search vector
+
+Revision ID: 3f1c9a2b7d10
+Revises: 1b7d4e8a2c90
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a2b7d10'
+down_revision: Union[str, None] = '1b7d4e8a2c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index(
+        'idx_product_search_vector', 'products', ['search_vector'],
+        unique=False, postgresql_using='gin'
+    )
+    # Queue every existing product for the background reindexer
+    op.execute("UPDATE products SET search_index_dirty = true")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_product_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,87 @@
+"""stock allocation
+
+Revision ID: 5d8f2a6c9e13
+Revises: e91b3c5a7f24
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8f2a6c9e13'
+down_revision: Union[str, None] = 'e91b3c5a7f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _base_columns():
+    return [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('private_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('model_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'channel_warehouses',
+        sa.Column('channel_id', sa.Integer(), nullable=False),
+        sa.Column('warehouse_id', sa.Integer(), nullable=False),
+        sa.Column('sort_order', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['channel_id'], ['channel.id']),
+        sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id']),
+        sa.PrimaryKeyConstraint('channel_id', 'warehouse_id'),
+    )
+    op.create_table(
+        'order_lines',
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('product_variant_id', sa.Integer(), nullable=True),
+        sa.Column('product_name', sa.String(length=255), nullable=True),
+        sa.Column('product_sku', sa.String(length=255), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('quantity_fulfilled', sa.Integer(), nullable=False),
+        sa.Column('unit_price_gross_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(['order_id'], ['order.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id'], ondelete='SET NULL'),
+        *_base_columns(),
+    )
+    op.create_index(op.f('ix_order_lines_id'), 'order_lines', ['id'], unique=False)
+    op.create_index(op.f('ix_order_lines_order_id'), 'order_lines', ['order_id'], unique=False)
+    op.create_table(
+        'allocations',
+        sa.Column('order_line_id', sa.Integer(), nullable=False),
+        sa.Column('stock_level_id', sa.Integer(), nullable=False),
+        sa.Column('quantity_allocated', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['order_line_id'], ['order_lines.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['stock_level_id'], ['stock_levels.id']),
+        sa.UniqueConstraint('order_line_id', 'stock_level_id', name='uq_allocation_line_stock_level'),
+        *_base_columns(),
+    )
+    op.create_index(op.f('ix_allocations_id'), 'allocations', ['id'], unique=False)
+    op.create_index(op.f('ix_allocations_order_line_id'), 'allocations', ['order_line_id'], unique=False)
+    op.create_index(op.f('ix_allocations_stock_level_id'), 'allocations', ['stock_level_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_allocations_stock_level_id'), table_name='allocations')
+    op.drop_index(op.f('ix_allocations_order_line_id'), table_name='allocations')
+    op.drop_index(op.f('ix_allocations_id'), table_name='allocations')
+    op.drop_table('allocations')
+    op.drop_index(op.f('ix_order_lines_order_id'), table_name='order_lines')
+    op.drop_index(op.f('ix_order_lines_id'), table_name='order_lines')
+    op.drop_table('order_lines')
+    op.drop_table('channel_warehouses')
@@ -0,0 +1,45 @@
+"""journal report indexes
+
+Revision ID: 6e2d9b4a8c57
+Revises: 0c5e7a9d3f16
+Create Date: 2026-10-18 18:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2d9b4a8c57'
+down_revision: Union[str, None] = '0c5e7a9d3f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Journal tables are append-heavy; don't block posting while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_journal_item_entry_id', 'journal_items', ['entry_id'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_journal_item_account_entry', 'journal_items', ['account_id', 'entry_id'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'idx_journal_entry_posted_date', 'journal_entries', ['date', 'id'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'posted'")
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_journal_entry_posted_date', table_name='journal_entries', postgresql_concurrently=True)
+        op.drop_index('idx_journal_item_account_entry', table_name='journal_items', postgresql_concurrently=True)
+        op.drop_index('idx_journal_item_entry_id', table_name='journal_items', postgresql_concurrently=True)
@@ -0,0 +1,54 @@
+"""customer trigram search
+
+Revision ID: 8b2e4d6f1a35
+Revises: 3f1c9a2b7d10
+Create Date: 2026-10-18 11:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a35'
+down_revision: Union[str, None] = '3f1c9a2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGRAM_INDEXES = (
+    ('idx_customer_name_trgm', 'customer_name'),
+    ('idx_customer_email_trgm', 'email_normalized'),
+    ('idx_customer_phone_trgm', 'phone_normalized'),
+    ('idx_customer_tax_id_trgm', 'tax_id'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('customers', sa.Column('phone_normalized', sa.String(length=20), nullable=True))
+    op.add_column('customers', sa.Column('email_normalized', sa.String(length=255), nullable=True))
+    op.execute(
+        """
+        UPDATE customers
+        SET phone_normalized = NULLIF(regexp_replace(phone_number, '\\D', '', 'g'), ''),
+            email_normalized = NULLIF(lower(btrim(email)), '')
+        WHERE phone_number IS NOT NULL OR email IS NOT NULL
+        """
+    )
+    for name, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, 'customers', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name='customers')
+    op.drop_column('customers', 'email_normalized')
+    op.drop_column('customers', 'phone_normalized')
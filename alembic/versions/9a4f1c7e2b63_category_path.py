@@ -0,0 +1,47 @@
+"""category path
+
+Revision ID: 9a4f1c7e2b63
+Revises: 6e2d9b4a8c57
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f1c7e2b63'
+down_revision: Union[str, None] = '6e2d9b4a8c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('path', sa.Text(), nullable=True))
+    # Backfill from parent_id; same format as services.category_tree
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, id::text || '/' AS path FROM categories WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, tree.path || c.id::text || '/'
+            FROM categories c JOIN tree ON c.parent_id = tree.id
+        )
+        UPDATE categories SET path = tree.path FROM tree WHERE categories.id = tree.id
+        """
+    )
+    op.create_index(
+        'idx_category_path', 'categories', ['path'], unique=False,
+        postgresql_ops={'path': 'text_pattern_ops'}
+    )
+    op.create_index('idx_product_category_id', 'products', ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_product_category_id', table_name='products')
+    op.drop_index('idx_category_path', table_name='categories')
+    op.drop_column('categories', 'path')
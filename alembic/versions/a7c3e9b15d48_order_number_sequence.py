@@ -0,0 +1,44 @@
+"""order number sequence
+
+Revision ID: a7c3e9b15d48
+Revises: 5d8f2a6c9e13
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9b15d48'
+down_revision: Union[str, None] = '5d8f2a6c9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('order_number_seq')))
+    # Continue after any number already handed out
+    op.execute(
+        """SELECT setval('order_number_seq', COALESCE((SELECT max(number) FROM "order"), 0) + 1, false)"""
+    )
+    op.create_table(
+        'order_number_counter',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.add_column(
+        'channel',
+        sa.Column('use_sequential_order_numbers', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('channel', 'use_sequential_order_numbers')
+    op.drop_table('order_number_counter')
+    op.execute(sa.schema.DropSequence(sa.Sequence('order_number_seq')))
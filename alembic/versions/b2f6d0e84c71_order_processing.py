@@ -0,0 +1,45 @@
+"""order processing
+
+Revision ID: b2f6d0e84c71
+Revises: a7c3e9b15d48
+Create Date: 2026-10-18 16:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f6d0e84c71'
+down_revision: Union[str, None] = 'a7c3e9b15d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order', sa.Column('total_gross_amount', sa.Numeric(precision=12, scale=2), nullable=True))
+    op.add_column('order', sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('order', sa.Column('processing_error', sa.String(length=255), nullable=True))
+    op.add_column('order', sa.Column('processing_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('order', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('order_lines', sa.Column('unit_price_net_amount', sa.Numeric(precision=12, scale=2), nullable=True))
+    # Orders that existed before are not pending
+    op.execute("""UPDATE "order" SET processed_at = created_at""")
+    op.create_index(
+        'idx_order_pending', 'order', ['id'], unique=False,
+        postgresql_where=sa.text("processed_at IS NULL AND status = 'UNCONFIRMED'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_order_pending', table_name='order')
+    op.drop_column('order_lines', 'unit_price_net_amount')
+    op.drop_column('order', 'next_attempt_at')
+    op.drop_column('order', 'processing_attempts')
+    op.drop_column('order', 'processing_error')
+    op.drop_column('order', 'processed_at')
+    op.drop_column('order', 'total_gross_amount')
@@ -0,0 +1,67 @@
+"""stock levels
+
+Revision ID: c4a7e1d93b52
+Revises: 8b2e4d6f1a35
+Create Date: 2026-10-18 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e1d93b52'
+down_revision: Union[str, None] = '8b2e4d6f1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_levels',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('product_variant_id', sa.Integer(), nullable=False),
+        sa.Column('warehouse_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False, server_default='0'),
+        sa.Column('reserved', sa.Numeric(precision=10, scale=2), nullable=False, server_default='0'),
+        sa.Column(
+            'available', sa.Numeric(precision=10, scale=2),
+            sa.Computed('quantity - reserved', persisted=True), nullable=True
+        ),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('private_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('model_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id']),
+        sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('product_variant_id', 'warehouse_id', name='uq_stock_level_variant_warehouse'),
+    )
+    op.create_index(op.f('ix_stock_levels_id'), 'stock_levels', ['id'], unique=False)
+    # Backfill from the ledger; same sign rule as services.stock_levels
+    op.execute(
+        """
+        INSERT INTO stock_levels (product_variant_id, warehouse_id, quantity, reserved,
+                                  private_metadata, model_metadata)
+        SELECT product_variant_id, warehouse_id,
+               SUM(CASE WHEN type = 'out' THEN -COALESCE(quantity, 0) ELSE COALESCE(quantity, 0) END),
+               0, '{}'::jsonb, '{}'::jsonb
+        FROM stock_movements
+        WHERE product_variant_id IS NOT NULL AND warehouse_id IS NOT NULL
+        GROUP BY product_variant_id, warehouse_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stock_levels_id'), table_name='stock_levels')
+    op.drop_table('stock_levels')
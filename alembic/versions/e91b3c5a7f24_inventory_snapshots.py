@@ -0,0 +1,62 @@
+"""inventory snapshots
+
+Revision ID: e91b3c5a7f24
+Revises: c4a7e1d93b52
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b3c5a7f24'
+down_revision: Union[str, None] = 'c4a7e1d93b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_stock_movement_created_at', 'stock_movements', ['created_at'], unique=False)
+    op.create_table(
+        'inventory_snapshots',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_movement_id', sa.Integer(), nullable=False),
+        sa.Column('line_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('private_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('model_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_inventory_snapshots_id'), 'inventory_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_snapshots_taken_at'), 'inventory_snapshots', ['taken_at'], unique=True)
+    op.create_table(
+        'inventory_snapshot_lines',
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('warehouse_id', sa.Integer(), nullable=False),
+        sa.Column('product_variant_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['inventory_snapshots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id']),
+        sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id']),
+        sa.PrimaryKeyConstraint('snapshot_id', 'warehouse_id', 'product_variant_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('inventory_snapshot_lines')
+    op.drop_index(op.f('ix_inventory_snapshots_taken_at'), table_name='inventory_snapshots')
+    op.drop_index(op.f('ix_inventory_snapshots_id'), table_name='inventory_snapshots')
+    op.drop_table('inventory_snapshots')
+    op.drop_index('idx_stock_movement_created_at', table_name='stock_movements')
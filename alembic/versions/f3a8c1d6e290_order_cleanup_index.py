@@ -0,0 +1,33 @@
+"""order cleanup index
+
+Revision ID: f3a8c1d6e290
+Revises: b2f6d0e84c71
+Create Date: 2026-10-18 17:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c1d6e290'
+down_revision: Union[str, None] = 'b2f6d0e84c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The order table can be large; don't block writes while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_order_channel_status_id', 'order', ['channel_id', 'status', 'id'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_order_channel_status_id', table_name='order', postgresql_concurrently=True)
@@ -0,0 +1,56 @@
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import event
+
+from core.config import settings
+from db.connection import open_routed_session, replica_is_usable
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Holds the unix time until which this client's reads stay on the primary
+WRITER_STICKY_COOKIE = "db_writer_until"
+
+
+def _sticky_to_writer(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(WRITER_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def use_writer_for(request: Request) -> bool:
+    """Whether this request's reads have to go to the primary."""
+    return (
+        request.method not in SAFE_METHODS
+        or _sticky_to_writer(request)
+        or not await replica_is_usable()
+    )
+
+
+def _pin_to_writer(response: Response) -> None:
+    sticky_until = time.time() + settings.REPLICA_STICKY_SECONDS
+    response.set_cookie(
+        WRITER_STICKY_COOKIE,
+        f"{sticky_until:.3f}",
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+async def get_routed_db(request: Request, response: Response):
+    """Request-scoped DB session routed between the primary and the replica.
+
+    Safe methods read from the replica unless the client wrote within the
+    last REPLICA_STICKY_SECONDS (read-your-writes) or the replica lags by
+    more than REPLICA_MAX_LAG_SECONDS. Everything else goes to the primary;
+    once the handler's commit succeeds, the response pins the client's
+    following reads there for the sticky window.
+    """
+    is_write = request.method not in SAFE_METHODS
+    use_writer = await use_writer_for(request)
+
+    async with open_routed_session(use_writer) as db:
+        if is_write:
+            event.listen(db.sync_session, "after_commit", lambda session: _pin_to_writer(response))
+        yield db
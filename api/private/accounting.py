@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import get_routed_db
+from core.auth_cache import UserPrincipal
+from core.security import require_permissions
+from models.account import Account
+from schemas.accounting import AccountLedger, TrialBalance
+from services.ledger_reports import get_account_ledger, get_trial_balance
+
+router = APIRouter(prefix="/api/accounting", tags=["accounting"])
+
+LEDGER_DEFAULT_LINES = 200
+LEDGER_MAX_LINES = 1000
+# Grant needed to read ledger reports; superusers always pass
+VIEW_LEDGER_PERMISSION = "accounting.view_journalentry"
+
+
+def _as_utc(at: Optional[datetime]) -> Optional[datetime]:
+    """Journal dates are naive UTC."""
+    if at is None or at.tzinfo is None:
+        return at
+    return at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/trial-balance", response_model=TrialBalance)
+async def trial_balance(
+    date_from: Optional[datetime] = Query(None, description="Inclusive; everything posted before date_to by default"),
+    date_to: Optional[datetime] = Query(None, description="Exclusive; now by default"),
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(require_permissions(VIEW_LEDGER_PERMISSION))
+):
+    """Debit, credit and balance per account over posted entries.
+
+    Closed months are served from cache; only the open period and
+    partial months at the range edges are aggregated live.
+    """
+    date_from, date_to = _as_utc(date_from), _as_utc(date_to) or datetime.utcnow()
+    if date_from is not None and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return await get_trial_balance(db, date_from, date_to)
+
+
+@router.get("/accounts/{account_id}/ledger", response_model=AccountLedger)
+async def account_ledger(
+    account_id: int,
+    date_from: datetime = Query(..., description="Inclusive"),
+    date_to: Optional[datetime] = Query(None, description="Exclusive; now by default"),
+    limit: int = Query(LEDGER_DEFAULT_LINES, ge=1, le=LEDGER_MAX_LINES),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(require_permissions(VIEW_LEDGER_PERMISSION))
+):
+    """Opening balance, items with running balances and closing balance
+    of one account."""
+    date_from, date_to = _as_utc(date_from), _as_utc(date_to) or datetime.utcnow()
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    if await db.scalar(select(Account.id).where(Account.id == account_id)) is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return await get_account_ledger(db, account_id, date_from, date_to, limit, offset)
@@ -1,20 +1,28 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from api.deps import get_routed_db
+from db.counting import TotalMode, count_total
+from db.pagination import InvalidCursorError, paginate
 from models.categories import Category
-from schemas.categories import CategoryCreate, CategoryPagination, CategoryResponse
+from schemas.categories import CategoryCreate, CategoryPagination, CategoryResponse, CategoryTreeNode
+from services.category_tree import get_category_tree_json
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
+# Columns that are non-nullable and indexed together with id, so they can be
+# used for keyset (cursor) pagination.
+CATEGORY_KEYSET_FIELDS = ("id", "created_at", "updated_at")
+
 
 @router.post("/", response_model=CategoryResponse)
-async def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_routed_db)):
     """Create a new category"""
     # Check if parent exists if parent_id is provided
     if category.parent_id:
-        parent = db.query(Category).filter(Category.id == category.parent_id).first()
+        parent = await db.get(Category, category.parent_id)
         if not parent:
             raise HTTPException(
                 status_code=404,
@@ -24,7 +32,7 @@ async def create_category(category: CategoryCreate, db: Session = Depends(get_db
     # Check if tax_class exists if tax_class_id is provided
     if category.tax_class_id:
         from models.tax import TaxClass
-        tax_class = db.query(TaxClass).filter(TaxClass.id == category.tax_class_id).first()
+        tax_class = await db.get(TaxClass, category.tax_class_id)
         if not tax_class:
             raise HTTPException(
                 status_code=404,
@@ -40,45 +48,72 @@ async def create_category(category: CategoryCreate, db: Session = Depends(get_db
         tax_class_id=category.tax_class_id
     )
     
+    # services.category_tree fills in the path on flush
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+async def get_category_tree(db: AsyncSession = Depends(get_routed_db)):
+    """The whole category tree, siblings ordered by name.
+
+    Served from a cached JSON document that is only rebuilt when a
+    category has changed since it was built.
+    """
+    return Response(content=await get_category_tree_json(db), media_type="application/json")
+
+
 @router.get("/", response_model=CategoryPagination)
 async def list_categories(
     page: int = Query(1, gt=0),
     size: int = Query(10, gt=0, le=100),
     sort_by: str = Query("created_at", description="Field to sort by"),
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="How total is computed (exact, estimate or cached)"),
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_routed_db)
 ):
     """List categories with filtering, pagination, sorting and search."""
-    query = db.query(Category)
+    query = select(Category)
 
     # Apply filters
     if search:
-        query = query.filter(Category.name.ilike(f"%{search}%"))
+        query = query.where(Category.name.ilike(f"%{search}%"))
     
     # Get total count
-    total = query.count()
+    total = await count_total(
+        db,
+        query,
+        table="categories",
+        filters={"search": search},
+        total_mode=total_mode,
+    )
     
-    # Apply sorting
-    if hasattr(Category, sort_by):
-        sort_field = getattr(Category, sort_by)
-        if sort_order == "desc":
-            sort_field = sort_field.desc()
-        query = query.order_by(sort_field)
-        
-    # Apply pagination
-    query = query.offset((page - 1) * size).limit(size)
+    # Apply sorting and pagination
+    try:
+        items, next_cursor = await paginate(
+            db,
+            query,
+            Category,
+            page=page,
+            size=size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            keyset_fields=CATEGORY_KEYSET_FIELDS,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "items": query.all(),
+        "items": items,
         "total": total,
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor,
+        "total_mode": total_mode
     }
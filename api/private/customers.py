@@ -1,28 +1,74 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.deps import get_routed_db, use_writer_for
+from db.counting import TotalMode, count_total
+from db.pagination import InvalidCursorError, paginate
+from services.customer_bulk import CustomerBulkWriter
+from services.customer_search import apply_customer_search
+from services.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, stream_export
 from models.customer import Customer
-from models.users import User
 from models.address import Address
 from schemas.customers import (
     CustomerCreate,
     CustomerUpdate,
     CustomerInDB,
     CustomerPagination,
+    CustomerBulkRequest,
+    CustomerBulkResponse,
     CustomerType,
     CustomerStatus
 )
+from core.auth_cache import UserPrincipal
 from core.security import get_current_active_user
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
+# Columns that are non-nullable and indexed together with id, so they can be
+# used for keyset (cursor) pagination.
+CUSTOMER_KEYSET_FIELDS = ("id", "created_at", "updated_at", "customer_name")
+
+CUSTOMER_EXPORT_COLUMNS = (
+    Customer.id,
+    Customer.customer_name,
+    Customer.customer_type,
+    Customer.tax_id,
+    Customer.email,
+    Customer.phone_number,
+    Customer.website,
+    Customer.industry,
+    Customer.source,
+    Customer.credit_limit,
+    Customer.payment_terms,
+    Customer.status,
+    Customer.billing_address_id,
+    Customer.shipping_address_id,
+    Customer.assigned_user_id,
+    Customer.created_at,
+    Customer.updated_at,
+)
+
+
+def filter_customers(query, dialect_name, customer_type=None, status=None, industry=None, search=None):
+    """Apply the list filters to `query`; returns it with the search rank (or None)."""
+    if customer_type:
+        query = query.where(Customer.customer_type == customer_type)
+    if status:
+        query = query.where(Customer.status == status)
+    if industry:
+        query = query.where(Customer.industry == industry)
+    rank = None
+    if search:
+        query, rank = apply_customer_search(query, search, dialect_name)
+    return query, rank
+
 @router.post("/", response_model=CustomerInDB)
 async def create_customer(
     customer: CustomerCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Create a new customer."""
     # Create customer
@@ -38,18 +84,61 @@ async def create_customer(
     )
     
     db.add(db_customer)
-    db.commit()
-    db.refresh(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
     return db_customer
 
+@router.post("/bulk", response_model=CustomerBulkResponse)
+async def bulk_upsert_customers(
+    payload: CustomerBulkRequest,
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """Create and update many customers at once.
+
+    Creates whose tax_id matches an existing customer update that
+    customer instead. Updates change only the fields sent. Items are
+    applied in chunks, one transaction each, and every item gets a
+    result with its status and customer id or error.
+    """
+    writer = CustomerBulkWriter(db, current_user.id)
+    return await writer.run(payload)
+
+@router.get("/export")
+async def export_customers(
+    request: Request,
+    format: str = Query("csv", description="Export format (csv or ndjson)"),
+    customer_type: Optional[CustomerType] = None,
+    status: Optional[CustomerStatus] = None,
+    industry: Optional[str] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """Stream every customer matching the list filters as CSV or NDJSON, ordered by id."""
+    if format not in EXPORT_FORMATS:
+        # `status` is the filter here, not fastapi.status
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{format}'"
+        )
+    query, _ = filter_customers(
+        select(*CUSTOMER_EXPORT_COLUMNS), db.get_bind().dialect.name, customer_type, status, industry, search
+    )
+    return StreamingResponse(
+        stream_export(query.order_by(Customer.id), format, await use_writer_for(request)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="customers.{format}"'},
+    )
+
 @router.get("/{customer_id}", response_model=CustomerInDB)
 async def get_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific customer by ID."""
-    customer = db.query(Customer).get(customer_id)
+    customer = await db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,11 +150,11 @@ async def get_customer(
 async def update_customer(
     customer_id: int,
     customer_update: CustomerUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Update a specific customer."""
-    db_customer = db.query(Customer).get(customer_id)
+    db_customer = await db.get(Customer, customer_id)
     if not db_customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,7 +163,7 @@ async def update_customer(
     
     # Validate billing address if provided
     if customer_update.billing_address_id:
-        billing_address = db.query(Address).get(customer_update.billing_address_id)
+        billing_address = await db.get(Address, customer_update.billing_address_id)
         if not billing_address:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -83,7 +172,7 @@ async def update_customer(
     
     # Validate shipping address if provided
     if customer_update.shipping_address_id:
-        shipping_address = db.query(Address).get(customer_update.shipping_address_id)
+        shipping_address = await db.get(Address, customer_update.shipping_address_id)
         if not shipping_address:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -96,75 +185,90 @@ async def update_customer(
         setattr(db_customer, field, value)
     
     db_customer.updated_by = current_user.id
-    db.commit()
-    db.refresh(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
     return db_customer
 
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_customer(
     customer_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Delete a specific customer."""
-    db_customer = db.query(Customer).get(customer_id)
+    db_customer = await db.get(Customer, customer_id)
     if not db_customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found"
         )
     
-    db.delete(db_customer)
-    db.commit()
+    await db.delete(db_customer)
+    await db.commit()
 
 @router.get("/", response_model=CustomerPagination)
 async def list_customers(
     page: int = Query(1, gt=0),
     size: int = Query(10, gt=0, le=100),
-    sort_by: str = Query("created_at", description="Field to sort by"),
+    sort_by: Optional[str] = Query(None, description="Field to sort by (relevance when searching, otherwise created_at)"),
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="How total is computed (exact, estimate or cached)"),
     customer_type: Optional[CustomerType] = None,
     status: Optional[CustomerStatus] = None,
     industry: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """List customers with filtering, pagination, sorting and search."""
-    query = db.query(Customer)
-
     # Apply filters
-    if customer_type:
-        query = query.filter(Customer.customer_type == customer_type)
-    if status:
-        query = query.filter(Customer.status == status)
-    if industry:
-        query = query.filter(Customer.industry == industry)
-    if search:
-        search_filter = or_(
-            Customer.customer_name.ilike(f"%{search}%"),
-            Customer.email.ilike(f"%{search}%"),
-            Customer.phone_number.ilike(f"%{search}%"),
-            Customer.tax_id.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    query, rank = filter_customers(
+        select(Customer), db.get_bind().dialect.name, customer_type, status, industry, search
+    )
+    if rank is not None and sort_by in (None, "relevance"):
+        sort_by = "relevance"
+    else:
+        rank = None
+        if sort_by in (None, "relevance"):
+            sort_by = "created_at"
 
     # Get total count
-    total = query.count()
-
-    # Apply sorting
-    if hasattr(Customer, sort_by):
-        sort_field = getattr(Customer, sort_by)
-        if sort_order == "desc":
-            sort_field = sort_field.desc()
-        query = query.order_by(sort_field)
+    total = await count_total(
+        db,
+        query,
+        table="customers",
+        filters={
+            "customer_type": customer_type,
+            "status": status,
+            "industry": industry,
+            "search": search,
+        },
+        total_mode=total_mode,
+    )
 
-    # Apply pagination
-    query = query.offset((page - 1) * size).limit(size)
+    # Apply sorting and pagination
+    try:
+        items, next_cursor = await paginate(
+            db,
+            query,
+            Customer,
+            page=page,
+            size=size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            keyset_fields=CUSTOMER_KEYSET_FIELDS,
+            rank=rank,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "items": query.all(),
+        "items": items,
         "total": total,
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor,
+        "total_mode": total_mode
     }
\ No newline at end of file
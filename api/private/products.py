@@ -1,22 +1,78 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from api.deps import get_routed_db, use_writer_for
+from db.counting import TotalMode, count_total
+from db.pagination import InvalidCursorError, paginate
+from services.category_tree import subtree_ids_query
+from services.export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, stream_export
+from services.product_import import IMPORT_FORMATS, ProductImporter, iter_records
+from services.product_search import search_query
+from models.categories import Category
 from models.products import Product, ProductVariant
 from models.stock import StockMovement
-from schemas.products import ProductCreate, ProductResponse, ProductPagination, ProductStatus
+from schemas.products import ProductCreate, ProductImportResult, ProductResponse, ProductPagination, ProductStatus
 
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
+# Columns that are non-nullable and indexed together with id, so they can be
+# used for keyset (cursor) pagination.
+PRODUCT_KEYSET_FIELDS = ("id", "created_at", "updated_at", "name")
+
+PRODUCT_EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.slug,
+    Product.status,
+    Product.category_id,
+    Product.product_type_id,
+    Product.tax_class_id,
+    Product.rating,
+    Product.created_at,
+    Product.updated_at,
+)
+
+
+async def category_path(db: AsyncSession, category_id: Optional[int]) -> Optional[str]:
+    """Materialized path of the `category_id` filter; 404 if unknown."""
+    if category_id is None:
+        return None
+    path = await db.scalar(select(Category.path).where(Category.id == category_id))
+    if path is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return path
+
+
+def filter_products(query, dialect_name, status=None, search=None, category_path=None):
+    """Apply the list filters to `query`; returns it with the search rank (or None)."""
+    if status:
+        query = query.where(Product.status == status)
+    if category_path:
+        # The category and all its descendants in one index range scan
+        query = query.where(Product.category_id.in_(subtree_ids_query(category_path)))
+    rank = None
+    if search and dialect_name == "postgresql":
+        ts_query = search_query(search)
+        query = query.where(Product.search_vector.op("@@")(ts_query))
+        rank = func.ts_rank(Product.search_vector, ts_query)
+    elif search:
+        search_filter = or_(
+            Product.name.ilike(f"%{search}%"),
+            # Product.sku.ilike(f"%{search}%")
+        )
+        query = query.where(search_filter)
+    return query, rank
+
 @router.post("/", response_model=ProductResponse)
-async def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
+async def create_product(product_data: ProductCreate, db: AsyncSession = Depends(get_routed_db)):
     """Create a new product along with its default variant and initial stock"""
 
     # Check if product with same name exists
-    existing_product = db.query(Product).filter(Product.name == product_data.name).first()
+    existing_product = await db.scalar(select(Product).where(Product.name == product_data.name).limit(1))
     if existing_product:
         raise HTTPException(
             status_code=400,
@@ -24,7 +80,7 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
         )
 
     # Check if product variant with same SKU exists
-    existing_variant = db.query(ProductVariant).filter(ProductVariant.sku == product_data.sku).first()
+    existing_variant = await db.scalar(select(ProductVariant).where(ProductVariant.sku == product_data.sku).limit(1))
     if existing_variant:
         raise HTTPException(
             status_code=400,
@@ -35,9 +91,10 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
         name=product_data.name,
         status=product_data.status,
         category_id=product_data.category_id,
+        search_index_dirty=True,
     )
     db.add(product)
-    db.flush()
+    await db.flush()
 
     product_variant = ProductVariant(
         sku=product_data.sku,
@@ -45,7 +102,7 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
         product_id=product.id,
     )
     db.add(product_variant)
-    db.flush()
+    await db.flush()
 
     stock_movement = StockMovement(
         product_variant_id=product_variant.id,
@@ -54,64 +111,138 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
     )
     db.add(stock_movement)
 
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
 
     return product
 
 
+@router.post("/import", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from the Content-Type"),
+    db: AsyncSession = Depends(get_routed_db)
+):
+    """Bulk import products from an NDJSON or CSV request body.
+
+    Each record has the fields of ProductCreate plus optional
+    price_amount, and quantity/warehouse_id for the initial stock. The
+    body is read as a stream and imported in chunks; rows that fail
+    validation or conflict with an existing name or SKU are skipped and
+    listed in the error report, the rest are committed.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported import format '{format}'"
+        )
+
+    importer = ProductImporter(db)
+    return await importer.run(iter_records(request.stream(), format))
+
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    format: str = Query("csv", description="Export format (csv or ndjson)"),
+    status: Optional[ProductStatus] = None,
+    search: Optional[str] = None,
+    category_id: Optional[int] = Query(None, description="Only products in this category or below it"),
+    db: AsyncSession = Depends(get_routed_db)
+):
+    """Stream every product matching the list filters as CSV or NDJSON, ordered by id."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{format}'"
+        )
+    query, _ = filter_products(
+        select(*PRODUCT_EXPORT_COLUMNS), db.get_bind().dialect.name, status, search, await category_path(db, category_id)
+    )
+    return StreamingResponse(
+        stream_export(query.order_by(Product.id), format, await use_writer_for(request)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
 @router.get("/", response_model=ProductPagination)
 async def list_products(
     page: int = Query(1, gt=0),
     size: int = Query(10, gt=0, le=100),
-    sort_by: str = Query("created_at", description="Field to sort by"),
+    sort_by: Optional[str] = Query(None, description="Field to sort by (relevance when searching, otherwise created_at)"),
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="How total is computed (exact, estimate or cached)"),
     status: Optional[ProductStatus] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    category_id: Optional[int] = Query(None, description="Only products in this category or below it"),
+    db: AsyncSession = Depends(get_routed_db)
 ):
     """List products with filtering, pagination, sorting and search.
     
     Args:
         page: Page number (starts from 1)
         size: Number of items per page (max 100)
-        sort_by: Field to sort by
+        sort_by: Field to sort by; defaults to search relevance when
+            searching and to created_at otherwise
         sort_order: Sort order (asc or desc)
+        cursor: Opaque keyset cursor (next_cursor of the previous page);
+            when given, page is ignored
+        total_mode: exact count, planner estimate, or short-TTL cached count
         status: Filter by product status
-        search: Search in product name or SKU
+        search: Full-text search over name, SKUs, attribute values and
+            description
+        category_id: Filter by category, including its descendants
         db: Database session
         
     Returns:
         Paginated list of products matching the criteria
     """
-    query = db.query(Product)
-    
     # Apply filters
-    if status:
-        query = query.filter(Product.status == status)
-    if search:
-        search_filter = or_(
-            Product.name.ilike(f"%{search}%"),
-            # Product.sku.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    query, rank = filter_products(
+        select(Product), db.get_bind().dialect.name, status, search, await category_path(db, category_id)
+    )
+    if sort_by not in (None, "relevance"):
+        rank = None
+    if rank is not None:
+        sort_by = "relevance"
+    elif sort_by in (None, "relevance"):
+        sort_by = "created_at"
     
     # Get total count
-    total = query.count()
-    
-    # Apply sorting
-    if hasattr(Product, sort_by):
-        sort_field = getattr(Product, sort_by)
-        if sort_order == "desc":
-            sort_field = sort_field.desc()
-        query = query.order_by(sort_field)
+    total = await count_total(
+        db,
+        query,
+        table="products",
+        filters={"status": status, "search": search, "category_id": category_id},
+        total_mode=total_mode,
+    )
     
-    # Apply pagination
-    query = query.offset((page - 1) * size).limit(size)
+    # Apply sorting and pagination
+    try:
+        items, next_cursor = await paginate(
+            db,
+            query,
+            Product,
+            page=page,
+            size=size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            keyset_fields=PRODUCT_KEYSET_FIELDS,
+            rank=rank,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "items": query.all(),
+        "items": items,
         "total": total,
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": next_cursor,
+        "total_mode": total_mode
     }
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import get_routed_db
+from core.auth_cache import UserPrincipal
+from core.security import get_current_active_user
+from models.stock import StockLevel
+from schemas.stock import InventoryAsOf, VariantAvailability, WarehouseAvailability
+from services.inventory_snapshots import get_inventory_as_of
+
+router = APIRouter(prefix="/api/stock", tags=["stock"])
+
+AVAILABILITY_MAX_VARIANTS = 500
+
+
+@router.get("/availability", response_model=List[VariantAvailability])
+async def get_availability(
+    variant_ids: List[int] = Query(...),
+    warehouse_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_routed_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """On-hand, reserved and available stock for many variants in one query.
+
+    Totals are summed over the requested warehouses (all of them by
+    default); variants without stock come back with zeros.
+    """
+    variant_ids = list(dict.fromkeys(variant_ids))
+    if len(variant_ids) > AVAILABILITY_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {AVAILABILITY_MAX_VARIANTS} variant_ids per request"
+        )
+
+    query = (
+        select(
+            StockLevel.product_variant_id,
+            StockLevel.warehouse_id,
+            StockLevel.quantity,
+            StockLevel.reserved,
+            StockLevel.available,
+        )
+        .where(StockLevel.product_variant_id.in_(variant_ids))
+        .order_by(StockLevel.product_variant_id, StockLevel.warehouse_id)
+    )
+    if warehouse_ids:
+        query = query.where(StockLevel.warehouse_id.in_(warehouse_ids))
+
+    availability = {variant_id: VariantAvailability(product_variant_id=variant_id) for variant_id in variant_ids}
+    for variant_id, warehouse_id, quantity, reserved, available in await db.execute(query):
+        totals = availability[variant_id]
+        totals.quantity += quantity
+        totals.reserved += reserved
+        totals.available += available
+        totals.warehouses.append(WarehouseAvailability(
+            warehouse_id=warehouse_id, quantity=quantity, reserved=reserved, available=available
+        ))
+    return list(availability.values())
+
+
+@router.get("/as-of", response_model=InventoryAsOf)
+async def get_stock_as_of(
+    at: datetime = Query(..., description="Point in time; naive values are read as UTC"),
+    warehouse_ids: Optional[List[int]] = Query(None),
+    variant_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_routed_db)
+):
+    """Stock on hand per variant and warehouse at a past point in time.
+
+    Reads the nearest earlier inventory snapshot and only the movements
+    recorded after it.
+    """
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return await get_inventory_as_of(db, at, warehouse_ids, variant_ids)
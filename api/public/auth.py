@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from core.security import Token, create_tokens, get_current_active_user, get_password_hash, verify_password
-from db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps import get_routed_db
+from core.auth_cache import UserPrincipal
+from core.security import Token, create_tokens, get_current_active_user, get_password_hash_async, verify_password_async
 from models.users import User
 from schemas.users import UserCreate, UserLogin, UserResponse
 
@@ -9,9 +12,10 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_routed_db)):
     """Authenticate a user and return access & refresh tokens."""
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    # POST routes to the writer, so a just-created user can log in at once
+    user = await db.scalar(select(User).where(User.email == user_credentials.email).limit(1))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -19,7 +23,7 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    if not verify_password(user_credentials.password, user.hashed_password):
+    if not await verify_password_async(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -30,32 +34,33 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(payload: UserCreate, db: Session = Depends(get_db)):
+async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_routed_db)):
     """
     Create a new user.
     """
-    existing_user = db.query(User).filter(User.email == payload.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == payload.email).limit(1))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists",
         )
         
+    hashed_password = await get_password_hash_async(payload.password)
     user = User(
         email=payload.email,
         first_name=payload.first_name,
         last_name=payload.last_name,
-        hashed_password=get_password_hash(payload.password)
+        hashed_password=hashed_password
     )
     
     try:
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         return user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error creating user",
@@ -63,7 +68,7 @@ async def create_user(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/verify")
-async def verify_token(current_user: User = Depends(get_current_active_user)):
+async def verify_token(current_user: UserPrincipal = Depends(get_current_active_user)):
     """Verify token and return user information if valid."""
     return {
         "status": "success",
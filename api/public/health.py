@@ -1,6 +1,9 @@
-from fastapi import APIRouter, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
+from core.auth_cache import UserPrincipal
+from core.security import get_current_active_user
+from db.engines import registry
 from db.session import SessionLocal
 
 router = APIRouter(prefix="/api/health", tags=["health"])
@@ -26,4 +29,17 @@ async def health_check():
             "api": {"status": "healthy", "message": "API is running"},
             "database": db_status
         }
-    )
\ No newline at end of file
+    )
+
+@router.get("/db-pool", status_code=status.HTTP_200_OK)
+async def db_pool_stats(current_user: UserPrincipal = Depends(get_current_active_user)):
+    """Live connection pool gauges for every engine this process has opened.
+
+    Superusers only: the gauges describe the deployment, not the shop.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return {"engines": registry.pool_stats()}
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.deps import get_routed_db
+from core.auth_cache import UserPrincipal
 from core.security import ALGORITHM, REFRESH_SECRET_KEY, Token, create_tokens, get_current_active_user, oauth2_scheme
-from db.session import get_db
 from schemas.users import UserResponse
 from models.users import User
 
@@ -12,7 +14,7 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(refresh_token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_routed_db)):
     """Get new access token using refresh token."""
     try:
         payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
@@ -26,7 +28,7 @@ async def refresh_token(refresh_token: str = Depends(oauth2_scheme), db: Session
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        user = db.query(User).filter(User.email == username).first()
+        user = await db.scalar(select(User).where(User.email == username).limit(1))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,12 +46,17 @@ async def refresh_token(refresh_token: str = Depends(oauth2_scheme), db: Session
         )
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(current_user: UserPrincipal = Depends(get_current_active_user)):
     """Logout user (client should remove tokens)."""
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: UserPrincipal = Depends(get_current_active_user), db: AsyncSession = Depends(get_routed_db)):
     """Get current user information"""
-    print("current_user: ", current_user)
-    return current_user
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
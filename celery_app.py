@@ -1,7 +1,9 @@
 from celery import Celery
-from celery.signals import after_setup_logger
+from celery.signals import after_setup_logger, worker_process_init
 import logging
 
+from db.engines import registry
+
 app = Celery('dropship-tracker')
 app.config_from_object('celeryconfig')
 
@@ -13,6 +15,11 @@ def setup_loggers(logger, *args, **kwargs):
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
+# Pooled connections must not be shared across the prefork boundary
+@worker_process_init.connect
+def reset_db_pools(**kwargs):
+    registry.dispose(close=False)
+
 # Import tasks
 app.autodiscover_tasks(['tasks'])
 
@@ -20,4 +20,26 @@ beat_schedule = {
         'task': 'tasks.example',
         'schedule': timedelta(minutes=30),
     },
+    'update-products-search-vector': {
+        'task': 'tasks.update_products_search_vector',
+        'schedule': timedelta(minutes=1),
+    },
+    # Bulk-imported orders are left pending instead of getting a task each
+    'process-pending-orders': {
+        'task': 'tasks.process_pending_orders',
+        'schedule': timedelta(seconds=30),
+    },
+    'expire-unpaid-orders': {
+        'task': 'tasks.expire_unpaid_orders',
+        'schedule': timedelta(minutes=5),
+    },
+    'purge-expired-orders': {
+        'task': 'tasks.purge_expired_orders',
+        'schedule': timedelta(minutes=10),
+    },
+    # As-of queries replay at most one interval of movements
+    'take-inventory-snapshots': {
+        'task': 'tasks.take_inventory_snapshots',
+        'schedule': timedelta(hours=6),
+    },
 }
\ No newline at end of file
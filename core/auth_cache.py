@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, inspect
+
+from core.config import settings
+from db.invalidation import invalidate_on_commit
+from models.users import User
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY_PREFIX = "auth:principal:"
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The slice of a user that authenticated requests need."""
+    id: int
+    uuid: Optional[uuid.UUID]
+    email: str
+    is_active: bool
+    is_superuser: bool
+    jwt_token_key: Optional[str]
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["uuid"] = str(self.uuid) if self.uuid else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw) -> "UserPrincipal":
+        data = json.loads(raw)
+        data["uuid"] = uuid.UUID(data["uuid"]) if data["uuid"] else None
+        return cls(**data)
+
+
+class PrincipalCache:
+    """Principals keyed by token subject (the user's email).
+
+    A small in-process TTL/LRU tier answers most requests. With
+    AUTH_PRINCIPAL_CACHE_REDIS the entries are also shared through Redis
+    for AUTH_PRINCIPAL_CACHE_TTL_SECONDS; the local tier then only lives
+    AUTH_PRINCIPAL_LOCAL_TTL_SECONDS, which bounds how long another
+    replica can keep serving a principal after it was invalidated.
+    Redis errors fall back to the database instead of failing auth.
+    """
+
+    def __init__(self):
+        self.use_redis = settings.AUTH_PRINCIPAL_CACHE_REDIS
+        self.local_ttl = (
+            settings.AUTH_PRINCIPAL_LOCAL_TTL_SECONDS if self.use_redis
+            else settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+        )
+        self.max_entries = settings.AUTH_PRINCIPAL_CACHE_SIZE
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._invalidations = 0
+        self._redis = None
+        self._sync_redis = None
+        self._pending = set()
+
+    def _get_local(self, subject: str) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return principal
+
+    def _set_local(self, subject: str, principal: UserPrincipal) -> None:
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.local_ttl, principal)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _async_client(self):
+        if self._redis is None:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    def _sync_client(self):
+        if self._sync_redis is None:
+            import redis
+            self._sync_redis = redis.Redis.from_url(settings.REDIS_URL)
+        return self._sync_redis
+
+    def generation(self) -> int:
+        """Snapshot to pass to `set()`, taken before reading the database."""
+        return self._invalidations
+
+    async def get(self, subject: str) -> Optional[UserPrincipal]:
+        principal = self._get_local(subject)
+        if principal is not None or not self.use_redis:
+            return principal
+        try:
+            raw = await self._async_client().get(PRINCIPAL_KEY_PREFIX + subject)
+        except Exception as e:
+            logger.warning(f"Principal cache read failed: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        principal = UserPrincipal.from_json(raw)
+        self._set_local(subject, principal)
+        return principal
+
+    async def set(self, subject: str, principal: UserPrincipal, generation: int) -> None:
+        # An invalidation that landed while the row was being read may
+        # already describe a newer state; don't cache over it.
+        if generation != self._invalidations:
+            return
+        self._set_local(subject, principal)
+        if not self.use_redis:
+            return
+        try:
+            await self._async_client().set(
+                PRINCIPAL_KEY_PREFIX + subject,
+                principal.to_json(),
+                ex=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {str(e)}")
+
+    def invalidate(self, *subjects: str) -> None:
+        with self._lock:
+            self._invalidations += 1
+            for subject in subjects:
+                self._entries.pop(subject, None)
+        if self.use_redis and subjects:
+            self._invalidate_shared([PRINCIPAL_KEY_PREFIX + subject for subject in subjects])
+
+    def _invalidate_shared(self, keys) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        try:
+            if loop is None:
+                self._sync_client().delete(*keys)
+                return
+            # Commits of async sessions run on the event loop; don't block it
+            task = loop.create_task(self._async_client().delete(*keys))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed: {str(e)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+class TokenCache:
+    """Decoded access tokens keyed by the SHA-256 of the raw token.
+
+    Clients resend the same token until it expires, so the signature only
+    has to be checked once. Each entry expires at the token's own `exp`,
+    never later; the cache is bounded LRU. Only successfully verified
+    tokens are stored.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def invalidate_user_principals(*subjects: str) -> None:
+    """Drop cached principals; call after Core-level writes to users."""
+    principal_cache.invalidate(*subjects)
+
+
+def _subjects(users: Iterable[User]) -> set:
+    subjects = set()
+    for user in users:
+        subjects.add(user.email)
+        # A changed email also retires the old subject
+        subjects.update(inspect(user).attrs.email.history.deleted)
+    subjects.discard(None)
+    return subjects
+
+
+# Load the replaced email even on an expired instance, so its history
+# still names the old subject at flush time
+@event.listens_for(User.email, 'set', active_history=True)
+def _keep_replaced_email(target, value, oldvalue, initiator):
+    pass
+
+
+def _changed_subjects(session):
+    return _subjects(instance for instance in (*session.dirty, *session.deleted) if isinstance(instance, User))
+
+
+invalidate_on_commit('principal_cache_subjects', lambda subjects: principal_cache.invalidate(*subjects), _changed_subjects)
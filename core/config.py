@@ -1,6 +1,13 @@
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import validator
+from sqlalchemy.engine import make_url
+
+
+def asyncpg_url(url: str) -> str:
+    """`url` with its driver swapped for asyncpg, whatever driver it named."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
 
 class Settings(BaseSettings):
     # API Settings
@@ -14,10 +21,47 @@ class Settings(BaseSettings):
     # Database Settings
     DATABASE_URL: str
     REPLICA_URL: Optional[str] = None
+    # Async driver URL; derived from DATABASE_URL (asyncpg) when unset.
+    # Tests point this at "sqlite+aiosqlite://".
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Read routing: reads go to the primary for this long after a write
+    # (read-your-writes), and whenever the replica lags more than the limit.
+    REPLICA_STICKY_SECONDS: int = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    # Connection pools (per engine, per process): budget
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW) x processes against max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement_timeout; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
     
     # Redis Settings
     REDIS_URL: str
     
+    # Authenticated user (principal) cache. With the Redis tier on, entries
+    # are shared across replicas and the local tier only lives a few seconds.
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    AUTH_PRINCIPAL_LOCAL_TTL_SECONDS: int = 5
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_CACHE_REDIS: bool = False
+    # Verified access tokens, each kept until its own exp
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    
+    # bcrypt runs on a dedicated pool ("thread" or "process"); requests
+    # beyond PASSWORD_HASH_MAX_PENDING in flight get a 503.
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # Ledger: postings for a month are accepted until this many days into
+    # the next one; totals of closed months are cached per process.
+    LEDGER_PERIOD_CLOSE_DAYS: int = 5
+    LEDGER_PERIOD_CACHE_MAX_PERIODS: int = 240
+    
     # Kafka Settings
     KAFKA_BROKER: str
     
@@ -36,12 +80,30 @@ class Settings(BaseSettings):
             raise ValueError("Invalid environment")
         return v
     
+    @validator("PASSWORD_HASH_EXECUTOR")
+    def validate_password_hash_executor(cls, v: str) -> str:
+        if v not in ["thread", "process"]:
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be 'thread' or 'process'")
+        return v
+    
     @validator("DATABASE_URL")
     def validate_database_url(cls, v: str) -> str:
-        if not v.startswith("postgresql://"):
+        if not v.startswith(("postgresql://", "postgresql+")):
             raise ValueError("DATABASE_URL must be a PostgreSQL connection string")
         return v
     
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return asyncpg_url(self.DATABASE_URL)
+    
+    @property
+    def async_replica_url(self) -> Optional[str]:
+        if not self.REPLICA_URL:
+            return None
+        return asyncpg_url(self.REPLICA_URL)
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from core.config import settings
+
+
+class PasswordPoolSaturatedError(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordPool:
+    """Size-limited executor for bcrypt work.
+
+    bcrypt costs a few hundred milliseconds of CPU per call; running it
+    inside an `async def` handler stalls every other request on the
+    worker. Calls run on at most PASSWORD_HASH_WORKERS threads (the
+    bcrypt extension releases the GIL) or processes, and at most
+    PASSWORD_HASH_MAX_PENDING calls may be running or queued at once so a
+    login storm is shed early instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        # Created on first use so forked workers don't inherit pool threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    async def run(self, func: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordPoolSaturatedError("Password hashing queue is full")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+)
@@ -6,10 +6,14 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from api.deps import get_routed_db
+from core.auth_cache import UserPrincipal, principal_cache, token_cache
+from core.password_pool import PasswordPoolSaturatedError, password_pool
 from models.users import User
+from services.permissions import get_user_permissions_async
 
 # Security configurations
 SECRET_KEY = "your-secret-key-here"
@@ -42,6 +46,24 @@ def get_password_hash(password: str) -> str:
     """Generate a hash from a plain password."""
     return pwd_context.hash(password)
 
+async def _run_password_work(func, *args):
+    try:
+        return await password_pool.run(func, *args)
+    except PasswordPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password pool, for use in async handlers."""
+    return await _run_password_work(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password pool, for use in async handlers."""
+    return await _run_password_work(get_password_hash, password)
+
 def create_refresh_token(data: dict) -> str:
     """Create a new JWT refresh token."""
     to_encode = data.copy()
@@ -76,39 +98,81 @@ def create_tokens(data: dict) -> Token:
     )
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get the current user from the token."""
+    """Get the current user from the token.
+
+    Verified tokens are cached until their `exp`, so repeated requests
+    with the same token skip the signature check.
+    """
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    print("creating token data: ", credentials_exception)
-    
+
     try:
-        print("token: ", token)
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print("payload: ", payload)
         username: str = payload.get("sub")
-        print("username: ", username)
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
-        print("token_data: ", token_data)
-    except JWTError as e:
-        print("error: ", e)
+    except JWTError:
         raise credentials_exception
 
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(token, token_data, expires_at)
     return token_data
 
-async def get_current_active_user(current_user = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get the current active user."""
-    user = db.query(User).filter(User.email == current_user.username).first()
-    print("user: ", user)
+async def get_current_active_user(current_user = Depends(get_current_user), db: AsyncSession = Depends(get_routed_db)) -> UserPrincipal:
+    """Get the current active user.
+
+    Returns a cached UserPrincipal rather than the full row; endpoints
+    that need other user fields load them by `id`.
+    """
+    user = await principal_cache.get(current_user.username)
+    if user is not None:
+        return user
+
+    generation = principal_cache.generation()
+    row = (await db.execute(
+        select(User.id, User.uuid, User.email, User.is_active, User.is_superuser, User.jwt_token_key)
+        .where(User.email == current_user.username)
+        .limit(1)
+    )).first()
 
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    return user
\ No newline at end of file
+    user = UserPrincipal(**row._mapping)
+    await principal_cache.set(current_user.username, user, generation)
+    return user
+
+def require_permissions(*permissions: str):
+    """Dependency factory for route-level permission checks.
+
+    Usage: `Depends(require_permissions("products.change_product"))`.
+    Superusers pass every check; everyone else needs all of the given
+    `app_label.codename` permissions, directly or through a group.
+    """
+    async def check_permissions(
+        current_user: UserPrincipal = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_routed_db),
+    ) -> UserPrincipal:
+        if current_user.is_superuser:
+            return current_user
+        granted = await get_user_permissions_async(db, current_user.id)
+        if not granted.issuperset(permissions):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+
+    return check_permissions
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from db.invalidation import invalidate_on_commit
+
+
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
+
+
+COUNT_CACHE_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+class explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` wrapper that keeps the statement's bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    """Compile the EXPLAIN wrapper for PostgreSQL."""
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+class CountCache:
+    """Short-lived per-process cache of list totals.
+
+    Entries are keyed by table name and the non-empty filters. Each
+    table also carries a version that is bumped whenever a transaction
+    writing to it commits, so an entry is dropped as soon as its table
+    changes instead of living out its TTL; the TTL is short because
+    other processes don't see that bump.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL_SECONDS, max_entries: int = COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(table: str, filters: dict) -> tuple:
+        normalized = []
+        for name, value in sorted(filters.items()):
+            if value is None or value == "":
+                continue
+            if isinstance(value, Enum):
+                value = value.value
+            # Strings stay as given: the filters match them verbatim, so
+            # " phone" and "phone" can have different totals
+            normalized.append((name, value))
+        return (table, tuple(normalized))
+
+    def get(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, version, total = entry
+            if expires_at < time.monotonic() or version != self._versions.get(key[0], 0):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def set(self, key: tuple, total: int) -> None:
+        with self._lock:
+            version = self._versions.get(key[0], 0)
+            self._entries[key] = (time.monotonic() + self.ttl, version, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+count_cache = CountCache()
+
+
+def invalidate_counts(*tables: str) -> None:
+    """Drop cached totals for `tables`; call after Core-level bulk writes."""
+    count_cache.invalidate(*tables)
+
+
+def _written_tables(session):
+    tables = (getattr(instance, '__tablename__', None) for instance in (*session.new, *session.dirty, *session.deleted))
+    return {table for table in tables if table}
+
+
+invalidate_on_commit('count_cache_tables', lambda tables: count_cache.invalidate(*tables), _written_tables)
+
+
+async def exact_count(db: AsyncSession, query: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def estimate_count(db: AsyncSession, query: Select, table: str) -> int:
+    """Planner estimate of the rows `query` returns.
+
+    Unfiltered queries read `pg_class.reltuples`; filtered ones read the
+    top-level "Plan Rows" from EXPLAIN. Neither touches table data.
+    Dialects other than PostgreSQL fall back to an exact count.
+    """
+    if db.get_bind().dialect.name != 'postgresql':
+        return await exact_count(db, query)
+
+    if query.whereclause is None:
+        reltuples = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table},
+        )
+        # -1 means the table was never vacuumed/analyzed
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    plan = (await db.execute(explain(query))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+    db: AsyncSession,
+    query: Select,
+    *,
+    table: str,
+    filters: dict,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> int:
+    """Total number of rows for a list endpoint according to `total_mode`."""
+    if total_mode == TotalMode.ESTIMATE:
+        return await estimate_count(db, query, table)
+
+    if total_mode == TotalMode.CACHED:
+        key = count_cache.make_key(table, filters)
+        total = count_cache.get(key)
+        if total is None:
+            total = await exact_count(db, query)
+            count_cache.set(key, total)
+        return total
+
+    return await exact_count(db, query)
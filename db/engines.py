@@ -0,0 +1,231 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.config import settings
+
+WRITER = "writer"
+REPLICA = "replica"
+
+
+class PoolWaitStats:
+    """Time callers spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.last_seconds = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "wait_seconds_total": round(self.total_seconds, 6),
+                "wait_seconds_max": round(self.max_seconds, 6),
+                "wait_seconds_last": round(self.last_seconds, 6),
+            }
+
+
+class _WaitTimingMixin:
+    # Set up in __init__ so pools rebuilt by dispose() start fresh counters
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs(url: str, is_async: bool) -> dict:
+    """Pool and connection settings for `url`; SQLite (tests) keeps its defaults."""
+    backend = make_url(url).get_backend_name()
+    if backend != "postgresql":
+        return {}
+
+    kwargs = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return kwargs
+
+
+class EngineRegistry:
+    """Process-wide engines, created on first use.
+
+    There is at most one sync and one async engine per role, so a process
+    holds at most four pools (two without a replica). Without REPLICA_URL
+    the replica role resolves to the writer engine.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[Tuple[str, bool], object] = {}
+        self._option_engines: Dict[Tuple[str, bool, tuple], object] = {}
+        self._on_create: List[Callable[[str, Engine], None]] = []
+
+    def _url(self, role: str, is_async: bool) -> str:
+        if role == REPLICA and settings.REPLICA_URL:
+            return settings.async_replica_url if is_async else settings.REPLICA_URL
+        return settings.async_database_url if is_async else settings.DATABASE_URL
+
+    def _resolve_role(self, role: str) -> str:
+        if role not in (WRITER, REPLICA):
+            raise ValueError(f"Unknown database role '{role}'")
+        return role if role == WRITER or settings.REPLICA_URL else WRITER
+
+    def _get(self, role: str, is_async: bool):
+        role = self._resolve_role(role)
+        key = (role, is_async)
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                url = self._url(role, is_async)
+                factory = create_async_engine if is_async else create_engine
+                engine = factory(url, **_engine_kwargs(url, is_async))
+                sync_engine = engine.sync_engine if is_async else engine
+                for callback in self._on_create:
+                    callback(role, sync_engine)
+                self._engines[key] = engine
+        return engine
+
+    def get_engine(self, role: str = WRITER, **execution_options) -> Engine:
+        engine = self._get(role, is_async=False)
+        return self._with_options(engine, role, False, execution_options)
+
+    def get_async_engine(self, role: str = WRITER, **execution_options) -> AsyncEngine:
+        engine = self._get(role, is_async=True)
+        return self._with_options(engine, role, True, execution_options)
+
+    def _with_options(self, engine, role: str, is_async: bool, execution_options: dict):
+        # Option engines share the parent's pool; cache them so repeated
+        # lookups don't build a new proxy each time.
+        if not execution_options:
+            return engine
+        key = (self._resolve_role(role), is_async, tuple(sorted(execution_options.items())))
+        option_engine = self._option_engines.get(key)
+        if option_engine is None:
+            option_engine = engine.execution_options(**execution_options)
+            self._option_engines[key] = option_engine
+        return option_engine
+
+    def on_engine_created(self, callback: Callable[[str, Engine], None]) -> None:
+        """Run `callback(role, sync_engine)` for every engine, existing or future."""
+        with self._lock:
+            self._on_create.append(callback)
+            existing = [
+                (role, engine.sync_engine if is_async else engine)
+                for (role, is_async), engine in self._engines.items()
+            ]
+        for role, sync_engine in existing:
+            callback(role, sync_engine)
+
+    def dispose(self, close: bool = True) -> None:
+        """Drop pooled connections, e.g. in a freshly forked worker (`close=False`)."""
+        for engine in list(self._engines.values()):
+            sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+            sync_engine.dispose(close=close)
+
+    def pool_stats(self) -> List[dict]:
+        """Live gauges for every engine created so far."""
+        stats = []
+        for (role, is_async), engine in list(self._engines.items()):
+            sync_engine = engine.sync_engine if is_async else engine
+            pool = sync_engine.pool
+            entry = {
+                "role": role,
+                "driver": sync_engine.dialect.driver,
+                "async": is_async,
+                "pool": type(pool).__name__,
+            }
+            if isinstance(pool, QueuePool):
+                entry.update({
+                    "size": pool.size(),
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                    "max_overflow": pool._max_overflow,
+                })
+            wait_stats: Optional[PoolWaitStats] = getattr(pool, "wait_stats", None)
+            if wait_stats is not None:
+                entry.update(wait_stats.snapshot())
+            stats.append(entry)
+        return stats
+
+
+registry = EngineRegistry()
+
+
+def get_engine(role: str = WRITER, **execution_options) -> Engine:
+    return registry.get_engine(role, **execution_options)
+
+
+def get_async_engine(role: str = WRITER, **execution_options) -> AsyncEngine:
+    return registry.get_async_engine(role, **execution_options)
+
+
+class RegistrySession(Session):
+    """Session bound lazily to a registry engine.
+
+    The role comes from `info["db_role"]` and `info["writer_allowed"]`
+    adds the matching execution option, so session factories can be
+    declared at import time without creating any engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        return get_engine(self.info.get("db_role", WRITER), **self._execution_options())
+
+    def _execution_options(self) -> dict:
+        return {"writer_allowed": True} if self.info.get("writer_allowed") else {}
+
+
+class AsyncRegistrySession(RegistrySession):
+    """`sync_session_class` for AsyncSession: same lookup, async engines."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        role = self.info.get("db_role", WRITER)
+        return get_async_engine(role, **self._execution_options()).sync_engine
+
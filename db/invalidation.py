@@ -0,0 +1,44 @@
+from typing import Callable, Hashable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+def mark_changed(session: Session, key: str, changed: Iterable[Hashable]) -> None:
+    """Record `changed` under `session.info[key]` until the transaction ends."""
+    changed = set(changed)
+    if changed:
+        session.info.setdefault(key, set()).update(changed)
+
+
+def invalidate_on_commit(
+    key: str,
+    invalidate: Callable[[set], None],
+    collect: Optional[Callable[[Session], Iterable[Hashable]]] = None,
+) -> None:
+    """Keep a process-local cache in step with committed writes.
+
+    `collect(session)` runs after every flush and returns what the flush
+    changed (ids, table names, or `{True}` for a cache without keys);
+    Core writes can add to it with `mark_changed`. Once the transaction
+    commits, `invalidate` is called with everything collected under
+    `key`; a rollback discards it.
+
+    Invalidation is only visible in this process: other processes keep
+    serving their copy until it expires, so caches registered here
+    either use a short TTL or also check a stamp read from the database.
+    """
+    if collect is not None:
+        @event.listens_for(Session, 'after_flush')
+        def _collect(session, flush_context):
+            mark_changed(session, key, collect(session) or ())
+
+    @event.listens_for(Session, 'after_commit')
+    def _invalidate(session):
+        changed = session.info.pop(key, None)
+        if changed:
+            invalidate(changed)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _discard(session):
+        session.info.pop(key, None)
@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded or doesn't match the request."""
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "value"):  # Enum members
+        return value.value
+    return value
+
+
+def _deserialize(column, value):
+    """Turn a JSON cursor value back into the column's python type."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_by: str, sort_order: str, value, row_id: int) -> str:
+    """Build an opaque cursor pointing just after the row `(value, row_id)`."""
+    payload = json.dumps([sort_by, sort_order, _serialize(value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return `(sort_by, sort_order, value, row_id)` from an opaque cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_by, sort_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(row_id, int):
+        raise InvalidCursorError("Malformed cursor")
+    return sort_by, sort_order, value, row_id
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    *,
+    page: int,
+    size: int,
+    sort_by: str,
+    sort_order: str,
+    cursor: Optional[str] = None,
+    keyset_fields: Iterable[str] = (),
+    rank=None,
+):
+    """Fetch one page of `query` and the cursor for the page after it.
+
+    Results are always ordered by `(sort_by, id)` so ties are stable.
+    When `cursor` is given the page is located with a row comparison on
+    that pair (keyset pagination), which an index on `(sort_by, id)` can
+    answer without scanning the skipped rows; `page` is ignored. Without
+    a cursor the classic `offset((page - 1) * size)` mode is used.
+
+    `next_cursor` is only produced for `keyset_fields`, the columns that
+    are non-nullable and safe to seek on.
+
+    `rank` (e.g. full-text relevance) replaces the sort column, best
+    match first. It isn't stored on the row, so ranked pages are
+    offset-only.
+    """
+    keyset_fields = set(keyset_fields)
+    descending = sort_order == "desc"
+    if rank is not None:
+        sort_column, descending = rank, True
+    else:
+        sort_column = getattr(model, sort_by) if hasattr(model, sort_by) else None
+    keyset_enabled = rank is None and sort_column is not None and sort_by in keyset_fields
+
+    if cursor is not None:
+        if not keyset_enabled:
+            raise InvalidCursorError(f"Cursor pagination is not supported for sort_by '{sort_by}'")
+        cursor_sort_by, cursor_sort_order, value, row_id = decode_cursor(cursor)
+        if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+            raise InvalidCursorError("Cursor does not match sort_by/sort_order")
+        boundary = tuple_(_deserialize(sort_column, value), row_id)
+        position = tuple_(sort_column, model.id)
+        query = query.where(position < boundary if descending else position > boundary)
+
+    # Apply sorting
+    order_by = [sort_column] if sort_column is not None and sort_by != "id" else []
+    order_by.append(model.id)
+    query = query.order_by(*[field.desc() if descending else field for field in order_by])
+
+    # Apply pagination; one extra row tells us whether a next page exists
+    if cursor is None:
+        query = query.offset((page - 1) * size)
+    rows = (await db.scalars(query.limit(size + 1))).all()
+    items = rows[:size]
+
+    next_cursor = None
+    if keyset_enabled and len(rows) > size:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id)
+
+    return items, next_cursor
@@ -1,12 +1,37 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from core.config import settings
 
-# Create database engine
-engine = create_engine(settings.DATABASE_URL)
+from db.engines import AsyncRegistrySession, RegistrySession, get_async_engine, get_engine
 
-# Create SessionLocal class for dependency injection
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions resolve the writer engine from the registry on first use, so
+# importing this module doesn't open a pool. These sessions are the
+# primary's own, so the replica guard lets them write.
+SessionLocal = sessionmaker(
+    class_=RegistrySession,
+    autocommit=False,
+    autoflush=False,
+    info={"writer_allowed": True},
+)
+
+# Create AsyncSessionLocal class for async dependency injection.
+# Objects stay usable after commit so handlers can serialize them without
+# triggering a lazy refresh outside the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=AsyncRegistrySession,
+    autoflush=False,
+    expire_on_commit=False,
+    info={"writer_allowed": True},
+)
+
+
+def __getattr__(name):
+    # Backwards compatible `from db.session import engine, async_engine`
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Dependency to get DB session
 def get_db():
@@ -14,4 +39,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
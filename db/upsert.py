@@ -0,0 +1,11 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def upsert_insert(table: Table, dialect_name: str):
+    """INSERT for `table` that supports `on_conflict_do_update` on this dialect."""
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"INSERT ... ON CONFLICT is not supported on {dialect_name}")
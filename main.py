@@ -3,9 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from api.public.health import router as health_router
 from api.public.users import router as user_router
 from api.public.auth import router as auth_router
+from api.private.accounting import router as accounting_router
 from api.private.categories import router as categories_router
 from api.private.customers import router as customer_router
 from api.private.products import router as product_router
+from api.private.stock import router as stock_router
 from core.config import settings
 
 app = FastAPI(
@@ -31,6 +33,8 @@ app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(product_router)
 app.include_router(categories_router)
+app.include_router(stock_router)
+app.include_router(accounting_router)
 
 # Add private routes
 app.include_router(customer_router)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Numeric, String, Table, Text
 from sqlalchemy.orm import relationship
 from models.base import BaseModel
 
@@ -13,9 +13,18 @@ class Account(BaseModel):
     currency = Column(String(3))
     balance = Column(Numeric(precision=18, scale=6))
     
+    parent = relationship('Account', remote_side='Account.id', back_populates='children')
     children = relationship('Account', back_populates='parent')
     journal_items = relationship('JournalItem', back_populates='account')
 
+# Every (ancestor, descendant) pair of the account tree, including each
+# account with itself at depth 0; kept in sync by services.account_tree.
+account_closure = Table('account_closure', BaseModel.metadata,
+    Column('ancestor_id', Integer, ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True),
+    Column('descendant_id', Integer, ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True, index=True),
+    Column('depth', Integer, nullable=False)
+)
+
 class JournalEntry(BaseModel):
     __tablename__ = 'journal_entries'
     date = Column(DateTime, nullable=False)
@@ -26,6 +35,11 @@ class JournalEntry(BaseModel):
     
     items = relationship('JournalItem', back_populates='entry')
 
+    __table_args__ = (
+        # Report ranges only read posted entries
+        Index('idx_journal_entry_posted_date', date, 'id', postgresql_where=(status == 'posted')),
+    )
+
 class JournalItem(BaseModel):
     __tablename__ = 'journal_items'
     entry_id = Column(Integer, ForeignKey('journal_entries.id'))
@@ -36,3 +50,9 @@ class JournalItem(BaseModel):
     
     entry = relationship('JournalEntry', back_populates='items')
     account = relationship('Account', back_populates='journal_items')
+
+    __table_args__ = (
+        Index('idx_journal_item_entry_id', entry_id),
+        # Ledger of one account, joined to its entries
+        Index('idx_journal_item_account_entry', account_id, entry_id),
+    )
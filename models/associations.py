@@ -25,3 +25,10 @@ variant_media = Table('variant_media', BaseModel.metadata,
     Column('variant_id', Integer, ForeignKey('product_variants.id'), primary_key=True),
     Column('media_id', Integer, ForeignKey('product_media.id'), primary_key=True)
 )
+
+# Warehouses a channel sells from; sort_order ranks them for allocation
+channel_warehouses = Table('channel_warehouses', BaseModel.metadata,
+    Column('channel_id', Integer, ForeignKey('channel.id'), primary_key=True),
+    Column('warehouse_id', Integer, ForeignKey('warehouses.id'), primary_key=True),
+    Column('sort_order', Integer, nullable=False, default=0)
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,9 @@ class Category(BaseModel):
     description = Column(String(255), nullable=True)
     parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
     tax_class_id = Column(Integer, ForeignKey('tax_classes.id'), nullable=True)
+    # Ids from the root down, each followed by '/' (e.g. '1/5/12/'); kept
+    # in sync by services.category_tree
+    path = Column(Text, nullable=True)
     
     parent = relationship('Category',
                          primaryjoin='Category.parent_id == Category.id',
@@ -19,4 +22,12 @@ class Category(BaseModel):
                          back_populates='children')
     products = relationship('Product', back_populates='category')
     tax_class = relationship('TaxClass', back_populates='categories')
-    children = relationship('Category', back_populates='parent')
\ No newline at end of file
+    children = relationship('Category', back_populates='parent')
+
+    __table_args__ = (
+        # Keyset pagination indexes: (sort field, id)
+        Index('idx_category_created_at_id', 'created_at', 'id'),
+        Index('idx_category_updated_at_id', 'updated_at', 'id'),
+        # Subtree lookups are prefix matches on the path
+        Index('idx_category_path', path, postgresql_ops={'path': 'text_pattern_ops'}),
+    )
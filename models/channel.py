@@ -3,7 +3,7 @@ from sqlalchemy.orm import validates, relationship
 
 from core.config import settings
 from models.base import BaseModel
-from models.associations import group_channels, shipping_zone_channels
+from models.associations import channel_warehouses, group_channels, shipping_zone_channels
 
 class Channel(BaseModel):
     __tablename__ = 'channel'
@@ -26,6 +26,8 @@ class Channel(BaseModel):
     automatically_complete_fully_paid_checkouts = Column(Boolean, default=False)
     draft_order_line_price_freeze_period = Column(Integer, nullable=True)
     use_legacy_line_discount_propagation_for_order = Column(Boolean, default=True)
+    # Number orders strictly in allocation order instead of from per-process blocks
+    use_sequential_order_numbers = Column(Boolean, default=False, nullable=False)
     
     # Add relationship with Group
     groups = relationship('Group', secondary=group_channels, back_populates='channels')
@@ -35,6 +37,8 @@ class Channel(BaseModel):
     tax_configuration = relationship('TaxConfiguration', back_populates='channel', uselist=False)
     # Add relationship with Order
     orders = relationship('Order', back_populates='channel')
+    # Add relationship with Warehouse
+    warehouses = relationship('Warehouse', secondary=channel_warehouses)
     
     @validates('currency_code')
     def validate_currency(self, key, value):
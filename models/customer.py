@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Enum, Text, Numeric, Integer, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Enum, Text, Numeric, Integer, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from models.base import BaseModel
 from schemas.customers import CustomerStatus, CustomerType
+from utils.helpers import normalize_email, normalize_phone
 
 class Customer(BaseModel):
     __tablename__ = "customers"
@@ -11,6 +12,9 @@ class Customer(BaseModel):
     tax_id = Column(String(50), unique=True, nullable=True)
     phone_number = Column(String(20), nullable=True)
     email = Column(String(255), nullable=True)
+    # Search keys kept in sync with phone_number/email (trigram indexed)
+    phone_normalized = Column(String(20), nullable=True)
+    email_normalized = Column(String(255), nullable=True)
     website = Column(String(255), nullable=True)
     industry = Column(String(100), nullable=True)
     source = Column(String(100), nullable=True)
@@ -29,5 +33,31 @@ class Customer(BaseModel):
     billing_address = relationship("Address", foreign_keys=[billing_address_id])
     shipping_address = relationship("Address", foreign_keys=[shipping_address_id])
 
+    __table_args__ = (
+        # Keyset pagination indexes: (sort field, id)
+        Index('idx_customer_created_at_id', 'created_at', 'id'),
+        Index('idx_customer_updated_at_id', 'updated_at', 'id'),
+        Index('idx_customer_name_id', customer_name, 'id'),
+        # Trigram indexes for substring search (PostgreSQL, needs pg_trgm)
+        Index('idx_customer_name_trgm', customer_name,
+              postgresql_using='gin', postgresql_ops={'customer_name': 'gin_trgm_ops'}),
+        Index('idx_customer_email_trgm', email_normalized,
+              postgresql_using='gin', postgresql_ops={'email_normalized': 'gin_trgm_ops'}),
+        Index('idx_customer_phone_trgm', phone_normalized,
+              postgresql_using='gin', postgresql_ops={'phone_normalized': 'gin_trgm_ops'}),
+        Index('idx_customer_tax_id_trgm', tax_id,
+              postgresql_using='gin', postgresql_ops={'tax_id': 'gin_trgm_ops'}),
+    )
+
+    @validates('phone_number')
+    def validate_phone_number(self, key, value):
+        self.phone_normalized = normalize_phone(value)
+        return value
+
+    @validates('email')
+    def validate_email(self, key, value):
+        self.email_normalized = normalize_email(value)
+        return value
+
     def __repr__(self):
         return f"<Customer(id={self.id}, name='{self.customer_name}')"
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, ForeignKey, Numeric
+from sqlalchemy import BigInteger, Column, Index, Integer, Sequence, String, Boolean, DateTime, ForeignKey, Numeric, Table
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,15 @@ from models.base import BaseModel
 from models.shipping import ShippingMethod  # Add this import
 from models.stock import Warehouse  # Add this import
 
+# Source of Order.number (see services.order_numbers). Databases without
+# sequences fall back to the single-row counter table.
+order_number_sequence = Sequence('order_number_seq', metadata=BaseModel.metadata)
+
+order_number_counter = Table('order_number_counter', BaseModel.metadata,
+    Column('id', Integer, primary_key=True),
+    Column('last_value', BigInteger, nullable=False)
+)
+
 class Order(BaseModel):
     __tablename__ = 'order'
 
@@ -17,7 +26,9 @@ class Order(BaseModel):
     use_old_id = Column(Boolean, default=False)
     expired_at = Column(DateTime, nullable=True)
 
-    status = Column(String(32), default='UNFULFILLED')
+    # New orders start pending; services.order_processing confirms them
+    # (UNFULFILLED) once they are validated and allocated
+    status = Column(String(32), default='UNCONFIRMED')
     authorize_status = Column(String(32), default='NONE', index=True)
     charge_status = Column(String(32), default='NONE', index=True)
     
@@ -50,6 +61,7 @@ class Order(BaseModel):
     
     channel_id = Column(Integer, ForeignKey('channel.id'))
     channel = relationship('Channel', back_populates='orders')
+    lines = relationship('OrderLine', back_populates='order', cascade='all, delete-orphan')
     
     shipping_price_net_amount = Column(Numeric(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES), default=Decimal('0.0'))
     shipping_price_net = MoneyField(amount_field='shipping_price_net_amount', currency_field='currency')
@@ -82,8 +94,37 @@ class Order(BaseModel):
     checkout_token = Column(String(36))
     
     total_net_amount = Column(Numeric(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES), default=Decimal('0.0'))
+    total_gross_amount = Column(Numeric(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES), default=Decimal('0.0'))
+    
+    # Set by services.order_processing when it confirms the order;
+    # UNCONFIRMED orders without it are pending
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    processing_error = Column(String(255), nullable=True)
+    # Failed processing runs; the order is retried after next_attempt_at
+    processing_attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         Index('idx_order_user_id', user_id),
         Index('idx_order_status', status),
+        # Keyset walks of the expiry/purge jobs
+        Index('idx_order_channel_status_id', channel_id, status, 'id'),
+        Index('idx_order_pending', 'id', postgresql_where=(processed_at.is_(None)) & (status == 'UNCONFIRMED')),
     )
+
+class OrderLine(BaseModel):
+    __tablename__ = 'order_lines'
+
+    order_id = Column(Integer, ForeignKey('order.id', ondelete='CASCADE'), nullable=False, index=True)
+    order = relationship('Order', back_populates='lines')
+    product_variant_id = Column(Integer, ForeignKey('product_variants.id', ondelete='SET NULL'), nullable=True)
+    product_variant = relationship('ProductVariant')
+
+    product_name = Column(String(255))
+    product_sku = Column(String(255), nullable=True)
+    quantity = Column(Integer, nullable=False)
+    quantity_fulfilled = Column(Integer, default=0, nullable=False)
+    unit_price_net_amount = Column(Numeric(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES), default=Decimal('0.0'))
+    unit_price_gross_amount = Column(Numeric(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES), default=Decimal('0.0'))
+
+    allocations = relationship('Allocation', back_populates='order_line', cascade='all, delete-orphan')
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, String, Boolean, ForeignKey, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import object_session, relationship
 from sqlalchemy.ext.declarative import declared_attr
 
 from models.base import BaseModel
@@ -52,30 +52,81 @@ class PermissionsMixin:
     def user_permissions(cls):
         return relationship('Permission', secondary='user_user_permissions', back_populates='users')
     
-    def get_user_permissions(self, obj=None):
-        """Return a list of permission strings that this user has directly."""
-        # Implementation would depend on your auth backend
-        pass
+    def _permissions_session(self, db=None):
+        db = db if db is not None else object_session(self)
+        if db is None:
+            raise ValueError(f"{self!r} is detached; pass the session as `db`")
+        return db
+
+    def get_user_permissions(self, obj=None, db=None):
+        """Return a set of permission strings that this user has directly.
+
+        Queries through `db`, or the session the user is attached to;
+        async callers use `get_user_permissions_async`.
+        """
+        # Imported here: services.permissions imports the models
+        from services.permissions import codenames, user_permissions_query
+        if obj is not None:
+            return set()
+        return set(codenames(self._permissions_session(db).execute(user_permissions_query(self.id))))
+
+    async def get_user_permissions_async(self, db, obj=None):
+        """`get_user_permissions` through an AsyncSession."""
+        from services.permissions import codenames, user_permissions_query
+        if obj is not None:
+            return set()
+        return set(codenames(await db.execute(user_permissions_query(self.id))))
     
-    def get_group_permissions(self, obj=None):
-        """Return a list of permission strings that this user has through their groups."""
-        # Implementation would depend on your auth backend
-        pass
+    def get_group_permissions(self, obj=None, db=None):
+        """Return a set of permission strings that this user has through their groups."""
+        from services.permissions import codenames, group_permissions_query
+        if obj is not None:
+            return set()
+        return set(codenames(self._permissions_session(db).execute(group_permissions_query(self.id))))
+
+    async def get_group_permissions_async(self, db, obj=None):
+        """`get_group_permissions` through an AsyncSession."""
+        from services.permissions import codenames, group_permissions_query
+        if obj is not None:
+            return set()
+        return set(codenames(await db.execute(group_permissions_query(self.id))))
     
-    def get_all_permissions(self, obj=None):
-        """Return all permissions available to this user."""
-        permissions = set()
-        permissions.update(self.get_user_permissions(obj))
-        permissions.update(self.get_group_permissions(obj))
-        return permissions
+    def get_all_permissions(self, obj=None, db=None):
+        """Return all permissions available to this user.
+
+        Resolved with one query and cached per user, so repeated
+        `has_perm` checks don't load `user_permissions`, `groups` or
+        each group's `permissions`.
+        """
+        from services.permissions import get_user_permissions
+        if obj is not None:
+            return set()
+        return get_user_permissions(self._permissions_session(db), self.id)
+
+    async def get_all_permissions_async(self, db, obj=None):
+        """`get_all_permissions` through an AsyncSession."""
+        from services.permissions import get_user_permissions_async
+        if obj is not None:
+            return set()
+        return await get_user_permissions_async(db, self.id)
     
-    def has_perm(self, perm, obj=None):
+    def has_perm(self, perm, obj=None, db=None):
         """Return True if the user has the specified permission."""
         if self.is_superuser:
             return True
-        # Implementation would depend on your auth backend
-        return perm in self.get_all_permissions(obj)
+        return perm in self.get_all_permissions(obj, db)
+
+    async def has_perm_async(self, db, perm, obj=None):
+        """`has_perm` through an AsyncSession."""
+        if self.is_superuser:
+            return True
+        return perm in await self.get_all_permissions_async(db, obj)
     
-    def has_perms(self, perm_list, obj=None):
+    def has_perms(self, perm_list, obj=None, db=None):
         """Return True if the user has all of the specified permissions."""
-        return all(self.has_perm(perm, obj) for perm in perm_list)
+        return all(self.has_perm(perm, obj, db) for perm in perm_list)
+
+    async def has_perms_async(self, db, perm_list, obj=None):
+        """`has_perms` through an AsyncSession."""
+        granted = await self.get_all_permissions_async(db, obj)
+        return self.is_superuser or all(perm in granted for perm in perm_list)
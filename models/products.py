@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Index, Numeric, String, Text, DateTime, ForeignKey, Integer, Boolean, Float
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel
@@ -42,6 +42,9 @@ class Product(BaseModel):
     description = Column(JSONB)
     description_plaintext = Column(Text)
     search_document = Column(Text, default="")
+    # Weighted full-text vector built by the search reindexer from
+    # search_document parts; plain text outside PostgreSQL.
+    search_vector = Column(TSVECTOR().with_variant(Text(), 'sqlite'), nullable=True)
     search_index_dirty = Column(Boolean, default=False, index=True)
     rating = Column(Float)
     status = Column(String(20), default='active')
@@ -64,9 +67,17 @@ class Product(BaseModel):
     tax_class_id = Column(Integer, ForeignKey('tax_classes.id'), nullable=True)
     tax_class = relationship('TaxClass', back_populates='products')
     
+    attributevalues = relationship('AssignedProductAttributeValue', back_populates='product')
+    
     __table_args__ = (
         Index('idx_product_slug', slug),
         Index('idx_product_name', name),
+        Index('idx_product_category_id', category_id),
+        # Keyset pagination indexes: (sort field, id)
+        Index('idx_product_created_at_id', 'created_at', 'id'),
+        Index('idx_product_updated_at_id', 'updated_at', 'id'),
+        Index('idx_product_name_id', name, 'id'),
+        Index('idx_product_search_vector', search_vector, postgresql_using='gin'),
     )
 
 
@@ -86,6 +97,7 @@ class ProductType(BaseModel):
     tax_class = relationship("TaxClass", back_populates="product_types")
     # Add the products relationship
     products = relationship("Product", back_populates="product_type")
+    attributeproduct = relationship("AttributeProduct", back_populates="product_type")
 
 
 class ProductMedia(BaseModel):
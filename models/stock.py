@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Integer, Numeric, String, Table, UniqueConstraint
 from sqlalchemy.orm import relationship
 from models.base import BaseModel
 
@@ -24,6 +24,68 @@ class StockMovement(BaseModel):
     
     product_variant = relationship('ProductVariant', back_populates='stock_movements')
     warehouse = relationship('Warehouse', back_populates='stock_movements')
+    
+    __table_args__ = (
+        # Point-in-time queries read the movements after a snapshot
+        Index('idx_stock_movement_created_at', 'created_at'),
+    )
+
+class StockLevel(BaseModel):
+    """On-hand projection of the StockMovement ledger per variant and warehouse.
+
+    Maintained in the same transaction as every movement insert (see
+    services.stock_levels); `reserved` is held back by allocations.
+    """
+    __tablename__ = 'stock_levels'
+    product_variant_id = Column(Integer, ForeignKey('product_variants.id'), nullable=False)
+    warehouse_id = Column(Integer, ForeignKey('warehouses.id'), nullable=False)
+    quantity = Column(Numeric(precision=10, scale=2), nullable=False, default=0)
+    reserved = Column(Numeric(precision=10, scale=2), nullable=False, default=0)
+    available = Column(Numeric(precision=10, scale=2), Computed("quantity - reserved", persisted=True))
+    
+    product_variant = relationship('ProductVariant')
+    warehouse = relationship('Warehouse')
+    
+    __table_args__ = (
+        UniqueConstraint('product_variant_id', 'warehouse_id', name='uq_stock_level_variant_warehouse'),
+    )
+
+class Allocation(BaseModel):
+    """Stock reserved for an order line at one warehouse.
+
+    The reserved quantity is also counted in `StockLevel.reserved`; the
+    two change together in services.allocation.
+    """
+    __tablename__ = 'allocations'
+    order_line_id = Column(Integer, ForeignKey('order_lines.id', ondelete='CASCADE'), nullable=False, index=True)
+    stock_level_id = Column(Integer, ForeignKey('stock_levels.id'), nullable=False, index=True)
+    quantity_allocated = Column(Numeric(precision=10, scale=2), nullable=False, default=0)
+    
+    order_line = relationship('OrderLine', back_populates='allocations')
+    stock_level = relationship('StockLevel')
+    
+    __table_args__ = (
+        UniqueConstraint('order_line_id', 'stock_level_id', name='uq_allocation_line_stock_level'),
+    )
+
+class InventorySnapshot(BaseModel):
+    """Stock on hand per variant and warehouse as of `taken_at`.
+
+    Covers exactly the movements with an id up to `last_movement_id`
+    (the last one created at or before `taken_at`); lines with a zero
+    quantity are left out.
+    """
+    __tablename__ = 'inventory_snapshots'
+    taken_at = Column(DateTime(timezone=True), nullable=False, unique=True, index=True)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+
+inventory_snapshot_lines = Table('inventory_snapshot_lines', BaseModel.metadata,
+    Column('snapshot_id', Integer, ForeignKey('inventory_snapshots.id', ondelete='CASCADE'), primary_key=True),
+    Column('warehouse_id', Integer, ForeignKey('warehouses.id'), primary_key=True),
+    Column('product_variant_id', Integer, ForeignKey('product_variants.id'), primary_key=True),
+    Column('quantity', Numeric(precision=10, scale=2), nullable=False)
+)
 
 class InventoryAdjustment(BaseModel):
     __tablename__ = 'inventory_adjustments'
@@ -5,6 +5,7 @@ from datetime import datetime
 
 from models.base import BaseModel
 from models.group import Group
+from models.permission import PermissionsMixin
 from models.address import Address
 from models.order import Order  # Add this import
 
@@ -26,7 +27,7 @@ user_user_permissions = Table('user_user_permissions', BaseModel.metadata,
     Column('permission_id', Integer, ForeignKey('permissions.id'), primary_key=True)
 )
 
-class User(BaseModel):
+class User(PermissionsMixin, BaseModel):
     __tablename__ = 'users'
 
     email = Column(String, unique=True, nullable=False)
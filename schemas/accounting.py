@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TrialBalanceLine(BaseModel):
+    account_id: int
+    code: Optional[str] = None
+    name: str
+    type: Optional[str] = None
+    debit: Decimal
+    credit: Decimal
+    balance: Decimal
+
+
+class TrialBalance(BaseModel):
+    date_from: Optional[datetime] = None
+    date_to: datetime
+    lines: List[TrialBalanceLine]
+    total_debit: Decimal
+    total_credit: Decimal
+
+
+class LedgerLine(BaseModel):
+    entry_id: int
+    item_id: int
+    date: datetime
+    reference: Optional[str] = None
+    description: Optional[str] = None
+    debit: Decimal
+    credit: Decimal
+    balance: Decimal
+
+
+class AccountLedger(BaseModel):
+    account_id: int
+    date_from: datetime
+    date_to: datetime
+    opening_balance: Decimal
+    debit: Decimal
+    credit: Decimal
+    closing_balance: Decimal
+    lines: List[LedgerLine]
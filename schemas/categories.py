@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 class CategoryCreate(BaseModel):
@@ -19,6 +19,16 @@ class CategoryResponse(BaseModel):
     description: Optional[str] = None
     parent_id: Optional[int] = None
     tax_class_id: Optional[int] = None
+    path: Optional[str] = None
+
+
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    slug: Optional[str] = None
+    parent_id: Optional[int] = None
+    path: Optional[str] = None
+    children: List["CategoryTreeNode"] = []
     
     
 class CategoryPagination(BaseModel):
@@ -26,4 +36,6 @@ class CategoryPagination(BaseModel):
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = None
+    total_mode: str = "exact"
 
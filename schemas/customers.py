@@ -1,4 +1,5 @@
-from typing import Optional, List
+from decimal import Decimal
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
@@ -47,6 +48,55 @@ class CustomerInDB(CustomerBase):
     class Config:
         from_attributes = True
 
+class CustomerBulkFields(BaseModel):
+    """Writable customer columns accepted by the bulk endpoint.
+
+    Limits mirror the column sizes, so an oversized value fails
+    validation instead of a whole chunk in the database.
+    """
+    customer_name: Optional[str] = Field(None, alias="customerName", max_length=255)
+    customer_type: Optional[CustomerType] = Field(None, alias="customerType")
+    tax_id: Optional[str] = Field(None, alias="taxId", max_length=50)
+    email: Optional[str] = Field(None, max_length=255)
+    phone: Optional[str] = Field(None, max_length=20)
+    website: Optional[str] = Field(None, max_length=255)
+    industry: Optional[str] = Field(None, max_length=100)
+    source: Optional[str] = Field(None, max_length=100)
+    credit_limit: Optional[Decimal] = Field(None, alias="creditLimit", max_digits=15, decimal_places=2)
+    payment_terms: Optional[str] = Field(None, alias="paymentTerms", max_length=100)
+    status: Optional[CustomerStatus] = None
+    billing_address_id: Optional[int] = Field(None, alias="billingAddressId")
+    shipping_address_id: Optional[int] = Field(None, alias="shippingAddressId")
+
+    class Config:
+        populate_by_name = True
+
+class CustomerBulkCreate(CustomerBulkFields):
+    """A new customer; when tax_id matches an existing one it is updated instead."""
+    customer_name: str = Field(alias="customerName", max_length=255)
+    customer_type: CustomerType = Field(alias="customerType")
+
+class CustomerBulkUpdate(CustomerBulkFields):
+    """Partial update of an existing customer; only the fields sent are changed."""
+    id: int
+
+class CustomerBulkRequest(BaseModel):
+    creates: List[CustomerBulkCreate] = []
+    updates: List[CustomerBulkUpdate] = []
+
+class CustomerBulkItemResult(BaseModel):
+    operation: Literal["create", "update"]
+    index: int
+    status: Literal["created", "updated", "error"]
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class CustomerBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[CustomerBulkItemResult]
+
 class CustomerFilter(BaseModel):
     customer_type: Optional[CustomerType] = None
     status: Optional[CustomerStatus] = None
@@ -58,3 +108,5 @@ class CustomerPagination(BaseModel):
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = None
+    total_mode: str = "exact"
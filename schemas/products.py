@@ -1,4 +1,5 @@
 from token import OP
+from decimal import Decimal
 from typing import Optional
 from pydantic import BaseModel
 from enum import Enum
@@ -25,9 +26,33 @@ class ProductResponse(BaseModel):
     status: Optional[ProductStatus] = None
     
 
+class ProductImportRow(ProductCreate):
+    price_amount: Optional[Decimal] = None
+    # Initial stock for the default variant
+    quantity: Optional[Decimal] = None
+    warehouse_id: Optional[int] = None
+
+
+class ProductImportError(BaseModel):
+    row: int
+    field: Optional[str] = None
+    message: str
+
+
+class ProductImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: list[ProductImportError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class ProductPagination(BaseModel):
     items: list[ProductResponse]
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = None
+    total_mode: str = "exact"
     
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class WarehouseAvailability(BaseModel):
+    warehouse_id: int
+    quantity: Decimal
+    reserved: Decimal
+    available: Decimal
+
+
+class VariantAvailability(BaseModel):
+    product_variant_id: int
+    quantity: Decimal = Decimal(0)
+    reserved: Decimal = Decimal(0)
+    available: Decimal = Decimal(0)
+    warehouses: List[WarehouseAvailability] = []
+
+
+class InventoryLine(BaseModel):
+    product_variant_id: int
+    warehouse_id: int
+    quantity: Decimal
+
+
+class InventoryAsOf(BaseModel):
+    at: datetime
+    snapshot_at: Optional[datetime] = None
+    items: List[InventoryLine]
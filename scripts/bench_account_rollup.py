@@ -0,0 +1,113 @@
+"""Group account rollups: per-level tree walk vs. closure-table aggregate.
+
+Loads a synthetic chart of accounts (five root groups, nested groups,
+leaf accounts with balances) into the database from DATABASE_URL (use a
+scratch database), then times the subtree balance of every group
+account three ways: walking children one query per level, one closure
+table aggregate, and the cached totals:
+
+    python scripts/bench_account_rollup.py --accounts 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from db.engines import get_engine
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.account import Account
+from services.account_tree import (
+    account_totals_cache,
+    get_subtree_balances,
+    rebuild_account_closure,
+    subtree_balances_query,
+)
+
+ACCOUNT_TYPES = ["asset", "liability", "equity", "income", "expense"]
+
+
+def load(db: Session, accounts: int, branching: int, prefix: str):
+    """Breadth-first chart with `branching` children per group; returns the group ids."""
+    table = Account.__table__
+    roots = db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        [{"name": kind.title(), "code": f"{prefix}-{kind}", "type": kind, "balance": 0} for kind in ACCOUNT_TYPES],
+    ).scalars().all()
+    frontier, created = list(roots), len(roots)
+    while created < accounts:
+        parents = [parent_id for parent_id in frontier for _ in range(branching)][:accounts - created]
+        frontier = db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": f"{prefix} account {created + index}",
+                    "code": f"{prefix}-{created + index}",
+                    "parent_id": parent_id,
+                    "balance": Decimal(random.randint(-100000, 100000)) / 100,
+                }
+                for index, parent_id in enumerate(parents)
+            ],
+        ).scalars().all()
+        created += len(frontier)
+    groups = db.scalars(
+        select(Account.parent_id).where(Account.parent_id.isnot(None), Account.code.startswith(f"{prefix}-")).distinct()
+    ).all()
+    db.execute(update(table).where(table.c.id.in_(groups)).values(is_group=True, balance=0))
+    rebuild_account_closure(db)
+    db.commit()
+    return sorted(groups)
+
+
+def walk_subtree(db: Session, account_id: int) -> Decimal:
+    """The old way: fetch children level by level and sum in Python."""
+    total = db.scalar(select(Account.balance).where(Account.id == account_id)) or Decimal(0)
+    frontier = [account_id]
+    while frontier:
+        rows = db.execute(select(Account.id, Account.balance).where(Account.parent_id.in_(frontier))).all()
+        total += sum((balance or 0 for _, balance in rows), Decimal(0))
+        frontier = [child_id for child_id, _ in rows]
+    return total
+
+
+def timed(label: str, action):
+    started = time.perf_counter()
+    result = action()
+    print(f"{label:<34}{(time.perf_counter() - started) * 1000:>10.1f} ms")
+    return result
+
+
+def bench(db: Session, args):
+    groups = timed(f"load {args.accounts} accounts", lambda: load(db, args.accounts, args.branching, uuid.uuid4().hex[:8]))
+    print(f"group accounts: {len(groups)}")
+    walked = timed("per-level walk, every group", lambda: {group: walk_subtree(db, group) for group in groups})
+    aggregated = timed("closure aggregate, every group", lambda: dict(db.execute(subtree_balances_query(groups)).all()))
+    timed("closure aggregate, one root", lambda: db.execute(subtree_balances_query(groups[:1])).all())
+    timed("per-level walk, one root", lambda: walk_subtree(db, groups[0]))
+    account_totals_cache.invalidate(groups)
+    timed("cached totals, cold", lambda: get_subtree_balances(db, groups))
+    cached = timed("cached totals, warm", lambda: get_subtree_balances(db, groups))
+    mismatches = sum(walked[group] != aggregated[group] or walked[group] != cached[group] for group in groups)
+    print(f"mismatched totals: {mismatches}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--branching", type=int, default=6)
+    args = parser.parse_args()
+    with Session(get_engine()) as db:
+        sys.exit(1 if bench(db, args) else 0)
+
+
+if __name__ == "__main__":
+    main()
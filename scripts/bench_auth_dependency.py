@@ -0,0 +1,51 @@
+"""Microbenchmark of the per-request cost of the auth dependency.
+
+Times `core.security.get_current_user` for the same access token with the
+verified-token cache cleared before every call (a full `jwt.decode`) and
+with it warm, as the SPA clients hit it:
+
+    python scripts/bench_auth_dependency.py --iterations 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.auth_cache import token_cache
+from core.security import create_tokens, get_current_user
+
+
+async def measure(token: str, iterations: int, cold: bool):
+    samples = []
+    for _ in range(iterations):
+        if cold:
+            token_cache.clear()
+        started = time.perf_counter()
+        await get_current_user(token)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+async def run(args):
+    token = create_tokens({"sub": "bench@example.com"}).access_token
+    print(f"{'mode':<8}{'p50 us':>10}{'p99 us':>10}")
+    for name, cold in (("decode", True), ("cached", False)):
+        token_cache.clear()
+        p50, p99 = await measure(token, args.iterations, cold)
+        print(f"{name:<8}{p50:>10.1f}{p99:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Customer search benchmark: leading-wildcard ILIKE vs. pg_trgm indexed search.
+
+Loads synthetic customers into the database from DATABASE_URL (use a
+scratch database), then times both search paths (the trigram one ranked
+by similarity and ordered by date) for a few typical CRM keystroke
+searches:
+
+    python scripts/bench_customer_search.py --rows 1000000 --load
+    python scripts/bench_customer_search.py --repeat 50
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select, text
+
+from db.engines import get_engine
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.customer import Customer
+from schemas.customers import CustomerStatus, CustomerType
+from services.customer_search import apply_customer_search, legacy_search_filter
+
+FIRST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Smith", "Garcia", "Muller", "Rossi", "Kim", "Silva"]
+COMPANY_WORDS = ["Trading", "Logistics", "Supply", "Retail", "Import", "Export", "Digital", "Global"]
+SEARCH_TERMS = ["logist", "smith", "@example", "(555) 01", "TX00012", "42", "zzzz-no-match"]
+
+
+def random_customer(index: int) -> dict:
+    name = f"{random.choice(FIRST_NAMES)} {random.choice(COMPANY_WORDS)} {index}"
+    local = "".join(random.choices(string.ascii_lowercase, k=8))
+    email = f"{local}.{index}@example.com"
+    phone = f"+1 (555) {random.randint(0, 999):03d}-{random.randint(0, 9999):04d}"
+    return {
+        "customer_name": name,
+        "customer_type": random.choice(list(CustomerType)),
+        "status": random.choice(list(CustomerStatus)),
+        "email": email,
+        "email_normalized": email.lower(),
+        "phone_number": phone,
+        "phone_normalized": "".join(ch for ch in phone if ch.isdigit()),
+        "tax_id": f"TX{index:09d}",
+    }
+
+
+def load(engine, rows: int, batch_size: int) -> None:
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        offset = conn.scalar(text("SELECT coalesce(max(id), 0) FROM customers"))
+    for start in range(0, rows, batch_size):
+        batch = [random_customer(offset + i) for i in range(start, min(start + batch_size, rows))]
+        with engine.begin() as conn:
+            conn.execute(insert(Customer.__table__), batch)
+        print(f"\rloaded {start + len(batch)}/{rows}", end="", flush=True)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE customers"))
+    print(f"\nloaded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+def legacy_query(search: str, size: int):
+    return (
+        select(Customer.id)
+        .where(legacy_search_filter(search))
+        .order_by(Customer.created_at.desc(), Customer.id.desc())
+        .limit(size)
+    )
+
+
+def trigram_query(search: str, size: int, ranked: bool = True):
+    query, rank = apply_customer_search(select(Customer.id), search, "postgresql")
+    if not ranked:
+        # sort_by=created_at: same filter, newest first like the legacy query
+        return query.order_by(Customer.created_at.desc(), Customer.id.desc()).limit(size)
+    return query.order_by(rank.desc(), Customer.id.desc()).limit(size)
+
+
+def time_query(conn, statement, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(statement).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def plan_root(conn, statement) -> str:
+    compiled = statement.compile(dialect=conn.dialect)
+    plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)]
+    # Scan node that actually reads customers
+    return next((line.strip() for line in plan if "on customers" in line), plan[0].strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--load", action="store_true", help="Insert --rows synthetic customers first")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--size", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.load:
+        load(engine, args.rows, args.batch_size)
+
+    with engine.connect() as conn:
+        total = conn.scalar(text("SELECT count(*) FROM customers"))
+        print(f"customers: {total}")
+        print(
+            f"{'term':<16}{'legacy p50':>12}{'legacy p99':>12}{'trgm p50':>12}{'trgm p99':>12}"
+            f"{'by date p50':>13}{'by date p99':>13}  trgm plan"
+        )
+        for term in SEARCH_TERMS:
+            legacy_p50, legacy_p99 = time_query(conn, legacy_query(term, args.size), args.repeat)
+            trgm_p50, trgm_p99 = time_query(conn, trigram_query(term, args.size), args.repeat)
+            dated_p50, dated_p99 = time_query(conn, trigram_query(term, args.size, ranked=False), args.repeat)
+            print(
+                f"{term:<16}{legacy_p50:>12.1f}{legacy_p99:>12.1f}{trgm_p50:>12.1f}{trgm_p99:>12.1f}"
+                f"{dated_p50:>13.1f}{dated_p99:>13.1f}  {plan_root(conn, trigram_query(term, args.size))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Journal posting throughput: ORM entry by entry vs. the batched poster.
+
+Creates leaf accounts in the database from DATABASE_URL (use a scratch
+database), then posts the same synthetic settlement (balanced entries of
+four items each) twice: as ORM objects with a Decimal balance update per
+item, and through `services.journal_posting.post_journal_entries`:
+
+    python scripts/bench_journal_posting.py --items 200000 --accounts 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from db.engines import get_engine
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.account import Account, JournalEntry, JournalItem
+from services.account_tree import rebuild_account_closure
+from services.journal_posting import post_journal_entries
+
+
+def load_accounts(db: Session, accounts: int, prefix: str):
+    table = Account.__table__
+    account_ids = db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        [{"name": f"{prefix} {index}", "code": f"{prefix}-{index}", "type": "asset", "balance": 0} for index in range(accounts)],
+    ).scalars().all()
+    rebuild_account_closure(db)
+    db.commit()
+    return account_ids
+
+
+def settlement(account_ids, items: int):
+    """Entries of two debits and two credits; credits split the total unevenly."""
+    now = datetime.utcnow()
+    entries = []
+    for index in range(items // 4):
+        amounts = [Decimal(random.randint(1, 1_000_000)) / 100 for _ in range(2)]
+        debit_accounts, credit_accounts = random.sample(account_ids, 2), random.sample(account_ids, 2)
+        entries.append({
+            "date": now,
+            "reference": f"settlement-{index}",
+            "items": [
+                {"account_id": debit_accounts[0], "debit": amounts[0]},
+                {"account_id": debit_accounts[1], "debit": amounts[1]},
+                {"account_id": credit_accounts[0], "credit": amounts[0] + amounts[1] - amounts[0] / 2},
+                {"account_id": credit_accounts[1], "credit": amounts[0] / 2},
+            ],
+        })
+    return entries
+
+
+def expected_balances(entries):
+    balances = defaultdict(Decimal)
+    for entry in entries:
+        for item in entry["items"]:
+            balances[item["account_id"]] += item.get("debit", 0) - item.get("credit", 0)
+    return balances
+
+
+def post_orm(db: Session, entries) -> int:
+    """The straightforward way: one entry at a time, balances updated per item."""
+    for entry in entries:
+        debit = sum((item.get("debit", Decimal(0)) for item in entry["items"]), Decimal(0))
+        credit = sum((item.get("credit", Decimal(0)) for item in entry["items"]), Decimal(0))
+        if debit != credit:
+            continue
+        journal = JournalEntry(date=entry["date"], reference=entry["reference"], status="posted", total_debit=debit, total_credit=credit)
+        db.add(journal)
+        for item in entry["items"]:
+            account = db.get(Account, item["account_id"])
+            account.balance = (account.balance or 0) + item.get("debit", 0) - item.get("credit", 0)
+            journal.items.append(JournalItem(account_id=item["account_id"], debit=item.get("debit", 0), credit=item.get("credit", 0)))
+        db.commit()
+    return len(entries)
+
+
+def check(db: Session, account_ids, entries) -> int:
+    expected = expected_balances(entries)
+    actual = dict(db.execute(select(Account.id, Account.balance).where(Account.id.in_(account_ids))).all())
+    return sum(actual[account_id] != expected.get(account_id, 0) for account_id in account_ids)
+
+
+def bench(db: Session, args):
+    mismatches = 0
+    for mode in ("orm", "batched"):
+        items = args.orm_items if mode == "orm" else args.items
+        account_ids = load_accounts(db, args.accounts, f"{mode}-{uuid.uuid4().hex[:8]}")
+        entries = settlement(account_ids, items)
+        started = time.perf_counter()
+        if mode == "orm":
+            post_orm(db, entries)
+        else:
+            report = post_journal_entries(db, entries, args.chunk_items)
+            if report["failed"]:
+                print(f"rejected entries: {report['failed']}")
+        elapsed = time.perf_counter() - started
+        wrong = check(db, account_ids, entries)
+        mismatches += wrong
+        print(f"{mode:<8} {len(entries) * 4} items in {elapsed:.2f}s  {len(entries) * 4 / elapsed:,.0f} items/s  mismatched balances: {wrong}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--orm-items", type=int, default=10_000)
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--chunk-items", type=int, default=10_000)
+    args = parser.parse_args()
+    with Session(get_engine()) as db:
+        sys.exit(1 if bench(db, args) else 0)
+
+
+if __name__ == "__main__":
+    main()
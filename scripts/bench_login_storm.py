@@ -0,0 +1,101 @@
+"""Login storm benchmark: login throughput and latency of unrelated endpoints.
+
+Fires concurrent `/api/auth/login` calls while a second set of clients
+keeps requesting a cheap endpoint, then reports login throughput, how
+many logins were shed with 503, and the p50/p99 of the unrelated
+endpoint. Run it against a live server before and after a change:
+
+    python scripts/bench_login_storm.py --base-url http://localhost:8000 \
+        --email bench@example.com --password secret --signup --duration 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_worker(client, args, deadline, latencies, statuses):
+    payload = {"email": args.email, "password": args.password}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/auth/login", json=payload)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError:
+            statuses["error"] += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def probe_worker(client, path, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError:
+            statuses["error"] += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def report(name, latencies, statuses, elapsed):
+    print(
+        f"{name:<10}{len(latencies):>8}{len(latencies) / elapsed:>10.1f}"
+        f"{statistics.median(latencies) if latencies else 0.0:>10.1f}"
+        f"{percentile(latencies, 99):>10.1f}  {dict(statuses)}"
+    )
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.logins + args.probes)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if args.signup:
+            await client.post("/api/auth/signup", json={"email": args.email, "password": args.password})
+
+        login_latencies, probe_latencies = [], []
+        login_statuses, probe_statuses = Counter(), Counter()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *[login_worker(client, args, deadline, login_latencies, login_statuses) for _ in range(args.logins)],
+            *[
+                probe_worker(client, args.probe_path, deadline, probe_latencies, probe_statuses)
+                for _ in range(args.probes)
+            ],
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"{'':<10}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+    report("login", login_latencies, login_statuses, elapsed)
+    report("probe", probe_latencies, probe_statuses, elapsed)
+    print(f"successful logins: {login_statuses[200] / elapsed:.1f}/s over {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--signup", action="store_true", help="Create the benchmark user first")
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent login clients")
+    parser.add_argument("--probes", type=int, default=5, help="Concurrent clients on --probe-path")
+    parser.add_argument("--probe-path", default="/api/health/health")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
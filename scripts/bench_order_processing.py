@@ -0,0 +1,119 @@
+"""Order processing throughput: one task per order vs. claimed batches.
+
+Loads pending orders (three lines each, stock for all of them) into the
+database from DATABASE_URL (use a scratch database), then processes one
+set the way `tasks.process_order` does (a session and transaction per
+order) and another set the way `tasks.process_pending_orders` does:
+
+    python scripts/bench_order_processing.py --orders 5000 --batch-size 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from db.session import SessionLocal
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.associations import channel_warehouses
+from models.channel import Channel
+from models.order import Order, OrderLine
+from models.products import ProductVariant
+from models.stock import StockLevel, Warehouse
+from services.order_processing import PENDING_STATUS, process_orders
+
+
+def load(session_factory, orders: int, prefix: str):
+    """A channel, two warehouses, 20 variants and `orders` pending orders."""
+    with session_factory() as db:
+        channel = Channel(
+            name=f"{prefix} channel", slug=f"{prefix}-channel", currency_code="USD",
+            default_country="US", delete_expired_orders_after=timedelta(days=60),
+        )
+        db.add(channel)
+        db.flush()
+        warehouse_ids = db.execute(
+            insert(Warehouse.__table__).returning(Warehouse.__table__.c.id),
+            [{"name": f"{prefix} wh {index}", "code": f"{prefix}-wh-{index}"} for index in range(2)],
+        ).scalars().all()
+        db.execute(insert(channel_warehouses), [
+            {"channel_id": channel.id, "warehouse_id": warehouse_id, "sort_order": index}
+            for index, warehouse_id in enumerate(warehouse_ids)
+        ])
+        variant_ids = db.execute(
+            insert(ProductVariant.__table__).returning(ProductVariant.__table__.c.id),
+            [{"sku": f"{prefix}-{index}", "name": f"{prefix} variant {index}"} for index in range(20)],
+        ).scalars().all()
+        db.execute(insert(StockLevel.__table__), [
+            {"product_variant_id": variant_id, "warehouse_id": warehouse_id, "quantity": orders * 10, "reserved": 0}
+            for variant_id in variant_ids
+            for warehouse_id in warehouse_ids
+        ])
+        order_ids = db.execute(
+            insert(Order.__table__).returning(Order.__table__.c.id, sort_by_parameter_order=True),
+            [{"channel_id": channel.id, "status": PENDING_STATUS} for _ in range(orders)],
+        ).scalars().all()
+        db.execute(insert(OrderLine.__table__), [
+            {
+                "order_id": order_id,
+                "product_variant_id": variant_id,
+                "quantity": random.randint(1, 3),
+                "quantity_fulfilled": 0,
+                "unit_price_net_amount": "10.00",
+                "unit_price_gross_amount": "12.00",
+            }
+            for order_id in order_ids
+            for variant_id in random.sample(variant_ids, 3)
+        ])
+        db.commit()
+        return order_ids
+
+
+def run_single(session_factory, order_ids) -> int:
+    processed = 0
+    for order_id in order_ids:
+        with session_factory() as db:
+            processed += process_orders(db, limit=1, order_ids=[order_id])["processed"]
+            db.commit()
+    return processed
+
+
+def run_batched(session_factory, order_ids, batch_size: int) -> int:
+    processed = 0
+    with session_factory() as db:
+        for start in range(0, len(order_ids), batch_size):
+            # Restricted to this run's orders; the task claims any pending ones
+            processed += process_orders(db, limit=batch_size, order_ids=order_ids[start:start + batch_size])["processed"]
+            db.commit()
+    return processed
+
+
+def bench(session_factory, args):
+    for mode in ("single", "batched"):
+        order_ids = load(session_factory, args.orders, f"{mode}-{uuid.uuid4().hex[:8]}")
+        started = time.perf_counter()
+        if mode == "single":
+            processed = run_single(session_factory, order_ids)
+        else:
+            processed = run_batched(session_factory, order_ids, args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:<8} {processed} orders in {elapsed:.2f}s  {processed / elapsed:,.0f} orders/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    bench(SessionLocal, args)
+
+
+if __name__ == "__main__":
+    main()
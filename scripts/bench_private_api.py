@@ -0,0 +1,114 @@
+"""Concurrent mixed-traffic latency benchmark for the private routers.
+
+Run it against a live server once on the previous build and once on the
+current one to compare latency percentiles, e.g.:
+
+    python scripts/bench_private_api.py --base-url http://localhost:8000 \
+        --token "$ACCESS_TOKEN" --concurrency 50 --requests 5000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_traffic_mix(customer_ids):
+    """Weighted mix of read-heavy calls with a slow `search` count sprinkled in."""
+    mix = [
+        ("list_products", "GET", "/api/products/?page=1&size=20", 30),
+        ("search_products", "GET", "/api/products/?search=a&size=50", 10),
+        ("list_categories", "GET", "/api/categories/?size=20", 20),
+        ("list_customers", "GET", "/api/customers/?size=20", 20),
+        ("search_customers", "GET", "/api/customers/?search=a&size=50", 10),
+        ("health", "GET", "/api/health/health", 5),
+    ]
+    if customer_ids:
+        mix.append(("get_customer", "GET", "/api/customers/{customer_id}", 5))
+    return mix
+
+
+async def worker(client, queue, mix, weights, customer_ids, results, errors):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        name, method, path, _ = random.choices(mix, weights=weights)[0]
+        if "{customer_id}" in path:
+            path = path.format(customer_id=random.choice(customer_ids))
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path)
+            if response.status_code >= 500:
+                errors[name] += 1
+        except httpx.HTTPError:
+            errors[name] += 1
+        results[name].append((time.perf_counter() - started) * 1000)
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    customer_ids = [int(value) for value in args.customer_ids.split(",") if value]
+    mix = build_traffic_mix(customer_ids)
+    weights = [entry[3] for entry in mix]
+
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+
+    results = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, queue, mix, weights, customer_ids, results, errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    print(f"{'endpoint':<20}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    all_samples = []
+    for name in sorted(results):
+        samples = results[name]
+        all_samples.extend(samples)
+        print(
+            f"{name:<20}{len(samples):>8}{errors[name]:>8}"
+            f"{statistics.median(samples):>10.1f}"
+            f"{percentile(samples, 95):>10.1f}{percentile(samples, 99):>10.1f}"
+        )
+    print(
+        f"{'overall':<20}{len(all_samples):>8}{sum(errors.values()):>8}"
+        f"{statistics.median(all_samples):>10.1f}"
+        f"{percentile(all_samples, 95):>10.1f}{percentile(all_samples, 99):>10.1f}"
+    )
+    print(f"throughput: {len(all_samples) / elapsed:.1f} req/s over {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", default="", help="Bearer token for the customers API")
+    parser.add_argument("--customer-ids", default="", help="Comma separated ids for get_customer")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
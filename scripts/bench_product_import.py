@@ -0,0 +1,84 @@
+"""Bulk product import throughput benchmark.
+
+Streams a synthetic supplier catalog to `/api/products/import` and prints
+the rows/second reported by the server alongside the client-side wall
+clock. SKUs get a per-run prefix so the script can be rerun against the
+same database:
+
+    python scripts/bench_product_import.py --base-url http://localhost:8000 \
+        --rows 50000 --category-id 1 --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import time
+import uuid
+
+import httpx
+
+
+def generate_rows(args, prefix: str):
+    for index in range(args.rows):
+        yield {
+            "name": f"{prefix} product {index}",
+            "sku": f"{prefix}-{index:07d}",
+            "category_id": args.category_id,
+            "status": "available",
+            "price_amount": f"{(index % 500) + 0.99:.2f}",
+            "quantity": index % 40,
+        }
+
+
+def encode(rows, format: str):
+    """Yield the request body in pieces so large catalogs aren't built in memory."""
+    if format == "ndjson":
+        for row in rows:
+            yield (json.dumps(row) + "\n").encode()
+        return
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--category-id", type=int, default=1)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    prefix = uuid.uuid4().hex[:8]
+    content_type = "text/csv" if args.format == "csv" else "application/x-ndjson"
+    started = time.perf_counter()
+    response = httpx.post(
+        f"{args.base_url}/api/products/import",
+        params={"format": args.format},
+        content=encode(generate_rows(args, prefix), args.format),
+        headers={"Content-Type": content_type},
+        timeout=args.timeout,
+    )
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    result = response.json()
+
+    print(f"rows: {result['total_rows']}  imported: {result['imported']}  failed: {result['failed']}")
+    print(f"server: {result['rows_per_second']:.1f} rows/s over {result['elapsed_seconds']:.1f}s")
+    print(f"client: {args.rows / elapsed:.1f} rows/s over {elapsed:.1f}s")
+    for error in result["errors"][:10]:
+        print(f"  row {error['row']}: {error['message']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Tax rate resolution: lazy relationships per line vs. the compiled table.
+
+Loads a channel with a tax configuration and country exceptions, tax
+classes with per-country rates and products spread over product types
+and categories into the database from DATABASE_URL (use a scratch
+database), then resolves the same lines by walking the ORM relationships
+of each line and through `services.tax_rates.resolve_rates`:
+
+    python scripts/bench_tax_rates.py --lines 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from db.engines import get_engine
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.categories import Category
+from models.channel import Channel
+from models.products import Product, ProductType
+from models.tax import TaxClass, TaxClassCountryRate, TaxConfiguration, TaxConfigurationPerCountry
+from services.tax_rates import TaxLine, resolve_rates, tax_rate_cache
+
+COUNTRIES = ["US", "DE", "FR", "GB", "PL", "IT", "ES", "NL"]
+
+
+def load(db: Session, products: int, prefix: str):
+    """One channel, five tax classes and `products` products; returns (channel id, product ids)."""
+    channel = Channel(
+        name=f"{prefix} channel", slug=f"{prefix}-channel", currency_code="USD",
+        default_country="US", delete_expired_orders_after=timedelta(days=60),
+    )
+    db.add(channel)
+    db.flush()
+    configuration = TaxConfiguration(channel_id=channel.id, charge_taxes=True, prices_entered_with_tax=True)
+    db.add(configuration)
+    db.flush()
+    db.add_all([
+        TaxConfigurationPerCountry(tax_configuration_id=configuration.id, country="GB", charge_taxes=False),
+        TaxConfigurationPerCountry(tax_configuration_id=configuration.id, country="DE", tax_calculation_strategy="FLAT_RATES"),
+    ])
+    class_ids = db.execute(
+        insert(TaxClass.__table__).returning(TaxClass.__table__.c.id),
+        [{"name": f"{prefix} class {index}"} for index in range(5)],
+    ).scalars().all()
+    db.execute(insert(TaxClassCountryRate.__table__), [
+        {"tax_class_id": class_id, "country": country, "rate": Decimal(random.randint(0, 2500)) / 10000}
+        for class_id in class_ids
+        for country in COUNTRIES
+        if random.random() < 0.8
+    ])
+    type_ids = db.execute(
+        insert(ProductType.__table__).returning(ProductType.__table__.c.id),
+        [{"name": f"{prefix} type {index}", "slug": f"{prefix}-type-{index}", "tax_class_id": random.choice([None, *class_ids])} for index in range(10)],
+    ).scalars().all()
+    category_ids = db.execute(
+        insert(Category.__table__).returning(Category.__table__.c.id),
+        [{"name": f"{prefix} category {index}", "tax_class_id": random.choice(class_ids)} for index in range(10)],
+    ).scalars().all()
+    product_ids = db.execute(
+        insert(Product.__table__).returning(Product.__table__.c.id),
+        [
+            {
+                "name": f"{prefix} product {index}",
+                "product_type_id": random.choice(type_ids),
+                "category_id": random.choice(category_ids),
+                "tax_class_id": random.choice([None, None, *class_ids]),
+            }
+            for index in range(products)
+        ],
+    ).scalars().all()
+    db.commit()
+    return channel.id, product_ids
+
+
+def resolve_lazily(db: Session, line: TaxLine) -> Decimal:
+    """The straightforward way, following relationships for every line."""
+    channel = db.get(Channel, line.channel_id)
+    configuration = channel.tax_configuration
+    charge_taxes = configuration.charge_taxes if configuration else True
+    for exception in (configuration.country_exceptions if configuration else []):
+        if exception.country == line.country and exception.charge_taxes is not None:
+            charge_taxes = exception.charge_taxes
+    if not charge_taxes:
+        return Decimal(0)
+    product = db.get(Product, line.product_id)
+    tax_class = product.tax_class or (product.product_type and product.product_type.tax_class) or (product.category and product.category.tax_class)
+    rates = db.scalars(select(TaxClassCountryRate).where(TaxClassCountryRate.country == line.country)).all()
+    by_class = {rate.tax_class_id: rate.rate for rate in rates}
+    return by_class.get(tax_class.id if tax_class else None, by_class.get(None, Decimal(0)))
+
+
+def timed(label: str, action):
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26}{elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def bench(db: Session, args):
+    channel_id, product_ids = load(db, args.products, uuid.uuid4().hex[:8])
+    lines = [TaxLine(channel_id, random.choice(COUNTRIES), random.choice(product_ids)) for _ in range(args.lines)]
+
+    def lazy():
+        results = []
+        for line in lines:
+            # A fresh identity map per line, as in one request per line
+            db.expunge_all()
+            results.append(resolve_lazily(db, line))
+        return results
+
+    expected = timed(f"lazy, {len(lines)} lines", lazy)
+    tax_rate_cache.invalidate()
+    timed("resolve_rates, cold", lambda: resolve_rates(db, lines))
+    resolved = timed("resolve_rates, warm", lambda: resolve_rates(db, lines))
+    mismatches = sum(result.rate != rate for result, rate in zip(resolved, expected))
+    print(f"mismatched rates: {mismatches}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=500)
+    args = parser.parse_args()
+    with Session(get_engine()) as db:
+        sys.exit(1 if bench(db, args) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Concurrency check for order numbering.
+
+Creates orders from several processes with several threads each, all at
+once, against the database from DATABASE_URL, then checks that every
+order got a number, no number was handed out twice, and each thread saw
+strictly increasing numbers:
+
+    python scripts/check_order_numbers.py --processes 4 --threads 8 --orders 100
+    python scripts/check_order_numbers.py --sequential
+
+--sequential takes numbers one at a time, as channels with
+use_sequential_order_numbers do, instead of from per-process blocks.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from db.engines import registry
+from db.session import SessionLocal
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from models.order import Order
+from services.order_numbers import order_number_allocator
+
+
+def create_orders(count: int, sequential: bool, tag: str):
+    """Create `count` orders one transaction at a time; returns their numbers."""
+    numbers, duplicates = [], 0
+    for _ in range(count):
+        db = SessionLocal()
+        try:
+            number = order_number_allocator.next_number(db, sequential)
+            db.execute(insert(Order.__table__).values(number=number, tracking_client_id=tag))
+            db.commit()
+            numbers.append(number)
+        except IntegrityError:
+            db.rollback()
+            duplicates += 1
+        finally:
+            db.close()
+    return numbers, duplicates
+
+
+def run_process(args):
+    threads, count, sequential, tag = args
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(lambda _: create_orders(count, sequential, tag), range(threads)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=100, help="orders per thread")
+    parser.add_argument("--sequential", action="store_true")
+    args = parser.parse_args()
+
+    tag = f"numbers-{os.getpid()}-{int(time.time())}"
+    registry.dispose(close=True)
+    context = multiprocessing.get_context("fork")
+    started = time.perf_counter()
+    with context.Pool(args.processes, initializer=registry.dispose, initargs=(False,)) as pool:
+        per_process = pool.map(run_process, [(args.threads, args.orders, args.sequential, tag)] * args.processes)
+    elapsed = time.perf_counter() - started
+
+    per_thread = [result for process in per_process for result in process]
+    numbers = [number for thread_numbers, _ in per_thread for number in thread_numbers]
+    duplicates = sum(duplicate_count for _, duplicate_count in per_thread)
+    expected = args.processes * args.threads * args.orders
+    out_of_order = sum(
+        any(later <= earlier for earlier, later in zip(thread_numbers, thread_numbers[1:]))
+        for thread_numbers, _ in per_thread
+    )
+    with SessionLocal() as db:
+        stored = db.scalar(select(func.count(func.distinct(Order.number))).where(Order.tracking_client_id == tag))
+
+    print(f"orders: {len(numbers)}/{expected} in {elapsed:.1f}s ({len(numbers) / elapsed:.0f}/s)")
+    print(f"duplicate numbers rejected: {duplicates}  distinct stored: {stored}")
+    print(f"threads with non-increasing numbers: {out_of_order}")
+    if numbers:
+        print(f"range {min(numbers)}..{max(numbers)}, {max(numbers) - min(numbers) + 1 - len(numbers)} skipped")
+    ok = len(numbers) == expected and not duplicates and stored == expected and not out_of_order
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
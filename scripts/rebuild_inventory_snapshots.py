@@ -0,0 +1,57 @@
+"""Verify or rebuild inventory snapshots from the stock_movements ledger.
+
+Each snapshot is compared with a replay of the ledger up to its
+last_movement_id, which catches movements whose transaction committed
+after their id range had been snapshotted:
+
+    python scripts/rebuild_inventory_snapshots.py --verify
+    python scripts/rebuild_inventory_snapshots.py --since 2026-01-01
+
+--verify only reports drift and exits non-zero when there is any;
+without it, the snapshots from --since on (all by default) are
+rewritten in a single transaction.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.session import SessionLocal
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from services.inventory_snapshots import rebuild_inventory_snapshots, verify_inventory_snapshots
+from services.stock_levels import STOCK_REBUILD_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="report drift without changing anything")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only snapshots taken at or after this time (UTC)")
+    parser.add_argument("--batch-size", type=int, default=STOCK_REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+    since = args.since.replace(tzinfo=timezone.utc) if args.since and args.since.tzinfo is None else args.since
+
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_inventory_snapshots(db, since, args.batch_size)
+            db.rollback()
+            for mismatch in mismatches:
+                print(
+                    f"snapshot {mismatch['snapshot_id']} ({mismatch['taken_at'].isoformat()}) "
+                    f"variant {mismatch['product_variant_id']} warehouse {mismatch['warehouse_id']}: "
+                    f"expected {mismatch['expected']}, found {mismatch['actual']}"
+                )
+            print(f"{len(mismatches)} snapshot line(s) out of sync")
+            sys.exit(1 if mismatches else 0)
+        rebuilt = rebuild_inventory_snapshots(db, since, args.batch_size)
+        db.commit()
+        print(f"Rebuilt {rebuilt} snapshot(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
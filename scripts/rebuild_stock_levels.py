@@ -0,0 +1,50 @@
+"""Verify or rebuild the stock_levels projection from the stock_movements ledger.
+
+The ledger is replayed in id ranges of --batch-size movements, so the
+replay never holds more than one batch of aggregates in the database:
+
+    python scripts/rebuild_stock_levels.py --verify
+    python scripts/rebuild_stock_levels.py --batch-size 100000
+
+--verify only reports drift and exits non-zero when there is any;
+without it, drifted quantities are overwritten in a single transaction.
+"""
+import argparse
+import os
+import sys
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.session import SessionLocal
+import models.attribute  # noqa: F401  resolves Product relationships at mapper setup
+from services.stock_levels import STOCK_REBUILD_BATCH_SIZE, rebuild_stock_levels, verify_stock_levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="report drift without changing anything")
+    parser.add_argument("--batch-size", type=int, default=STOCK_REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_stock_levels(db, args.batch_size)
+            db.rollback()
+            for mismatch in mismatches:
+                print(
+                    f"variant {mismatch['product_variant_id']} warehouse {mismatch['warehouse_id']}: "
+                    f"expected {mismatch['expected']}, found {mismatch['actual']}"
+                )
+            print(f"{len(mismatches)} stock level(s) out of sync")
+            sys.exit(1 if mismatches else 0)
+        corrected = rebuild_stock_levels(db, args.batch_size)
+        db.commit()
+        print(f"Corrected {corrected} stock level(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,10 @@ import sys
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.config import settings
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from db.session import SessionLocal
 from scripts.seed_data import seed_database
 
 def main():
-    engine = create_engine(settings.DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
     
     try:
@@ -0,0 +1,221 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from db.invalidation import invalidate_on_commit, mark_changed
+from models.account import Account, JournalEntry, JournalItem, account_closure
+
+ACCOUNT_TOTALS_CACHE_TTL_SECONDS = 300
+ACCOUNT_TOTALS_CACHE_MAX_ENTRIES = 20000
+
+closure = account_closure.c
+
+
+def subtree_query(account_id: int):
+    """Ids of `account_id` and every account below it."""
+    return select(closure.descendant_id).where(closure.ancestor_id == account_id)
+
+
+def ancestors_query(account_ids: Iterable[int]):
+    """Ids of the given accounts and every account above them."""
+    return select(closure.ancestor_id).where(closure.descendant_id.in_(list(account_ids))).distinct()
+
+
+def subtree_balances_query(account_ids: Iterable[int]):
+    """Balance of each account plus all its descendants, in one aggregate."""
+    return (
+        select(closure.ancestor_id, func.coalesce(func.sum(Account.balance), 0))
+        .join(Account, Account.id == closure.descendant_id)
+        .where(closure.ancestor_id.in_(list(account_ids)))
+        .group_by(closure.ancestor_id)
+    )
+
+
+def rebuild_account_closure(db: Session) -> None:
+    """Recompute the whole closure table from parent_id (backfills, bulk loads)."""
+    tree = (
+        select(Account.id.label("ancestor_id"), Account.id.label("descendant_id"), literal(0).label("depth"))
+        .cte("tree", recursive=True)
+    )
+    child = aliased(Account)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1).join(child, child.parent_id == tree.c.descendant_id)
+    )
+    db.execute(delete(account_closure))
+    db.execute(insert(account_closure).from_select(["ancestor_id", "descendant_id", "depth"], select(tree)))
+
+
+def _link(connection, account_id: int, parent_id) -> None:
+    """Closure rows for a new leaf: itself, plus its parent's ancestors."""
+    connection.execute(insert(account_closure), [{"ancestor_id": account_id, "descendant_id": account_id, "depth": 0}])
+    if parent_id is not None:
+        connection.execute(insert(account_closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.ancestor_id, literal(account_id), closure.depth + 1).where(closure.descendant_id == parent_id),
+        ))
+
+
+def _move(connection, account_id: int, parent_id) -> None:
+    """Re-hang the subtree of `account_id` under `parent_id`."""
+    subtree = select(closure.descendant_id).where(closure.ancestor_id == account_id)
+    if parent_id is not None and connection.scalar(
+        select(func.count()).select_from(account_closure)
+        .where(closure.ancestor_id == account_id, closure.descendant_id == parent_id)
+    ):
+        raise ValueError("An account cannot be moved under itself or its descendants")
+    # Drop the links from the old ancestors into the subtree
+    connection.execute(delete(account_closure).where(
+        closure.descendant_id.in_(subtree),
+        closure.ancestor_id.notin_(subtree),
+    ))
+    if parent_id is not None:
+        above, below = account_closure.alias("above"), account_closure.alias("below")
+        connection.execute(insert(account_closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+            .select_from(above.join(below, true()))
+            .where(above.c.descendant_id == parent_id, below.c.ancestor_id == account_id),
+        ))
+
+
+class AccountTotalsCache:
+    """Subtree balance per account id.
+
+    Every account carries a version bumped when its own subtree total
+    changes (a posting to it or below it, a balance edit, a move); a
+    version mismatch drops the entry. Like the permission cache, other
+    processes only see a change once their entry expires.
+    """
+
+    def __init__(self, ttl: float = ACCOUNT_TOTALS_CACHE_TTL_SECONDS, max_entries: int = ACCOUNT_TOTALS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, int, Decimal]] = {}
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, account_ids: Iterable[int]) -> Dict[int, int]:
+        """Stamp to pass to `set()`, taken before reading the database."""
+        with self._lock:
+            return {account_id: self._versions.get(account_id, 0) for account_id in account_ids}
+
+    def get_many(self, account_ids: Iterable[int]) -> Dict[int, Decimal]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for account_id in account_ids:
+                entry = self._entries.get(account_id)
+                if entry is None:
+                    continue
+                expires_at, version, total = entry
+                if expires_at < now or version != self._versions.get(account_id, 0):
+                    del self._entries[account_id]
+                    continue
+                found[account_id] = total
+        return found
+
+    def set_many(self, totals: Dict[int, Decimal], versions: Dict[int, int]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if len(self._entries) + len(totals) > self.max_entries:
+                self._entries.clear()
+            for account_id, total in totals.items():
+                self._entries[account_id] = (expires_at, versions[account_id], total)
+
+    def invalidate(self, account_ids: Iterable[int]) -> None:
+        with self._lock:
+            for account_id in account_ids:
+                self._versions[account_id] = self._versions.get(account_id, 0) + 1
+
+
+account_totals_cache = AccountTotalsCache()
+
+
+def invalidate_account_totals(db: Session, account_ids: Iterable[int]) -> None:
+    """Drop cached totals of `account_ids` and all their ancestors; call
+    after Core-level writes to balances that bypass the ORM."""
+    account_totals_cache.invalidate(db.scalars(ancestors_query(account_ids)).all())
+
+
+def get_subtree_balances(db: Session, account_ids: List[int]) -> Dict[int, Decimal]:
+    """Balance of each account including everything below it."""
+    totals = account_totals_cache.get_many(account_ids)
+    missing = [account_id for account_id in account_ids if account_id not in totals]
+    if missing:
+        versions = account_totals_cache.versions(missing)
+        fresh = {account_id: Decimal(0) for account_id in missing}
+        fresh.update(db.execute(subtree_balances_query(missing)).all())
+        account_totals_cache.set_many(fresh, versions)
+        totals.update(fresh)
+    return totals
+
+
+async def get_subtree_balances_async(db: AsyncSession, account_ids: List[int]) -> Dict[int, Decimal]:
+    """`get_subtree_balances` for async sessions."""
+    totals = account_totals_cache.get_many(account_ids)
+    missing = [account_id for account_id in account_ids if account_id not in totals]
+    if missing:
+        versions = account_totals_cache.versions(missing)
+        fresh = {account_id: Decimal(0) for account_id in missing}
+        fresh.update((await db.execute(subtree_balances_query(missing))).all())
+        account_totals_cache.set_many(fresh, versions)
+        totals.update(fresh)
+    return totals
+
+
+def _touched_accounts(session) -> Set[int]:
+    """Accounts whose own balance may have changed in this flush."""
+    touched, entry_ids = set(), set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, JournalItem) and instance.account_id is not None:
+            touched.add(instance.account_id)
+        elif isinstance(instance, JournalEntry) and instance.id is not None and inspect(instance).attrs.status.history.has_changes():
+            entry_ids.add(instance.id)
+        elif isinstance(instance, Account) and instance.id is not None:
+            touched.add(instance.id)
+    if entry_ids:
+        touched.update(session.connection().scalars(
+            select(JournalItem.account_id).where(JournalItem.entry_id.in_(entry_ids))
+        ))
+    touched.discard(None)
+    return touched
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_account_tree(session, flush_context):
+    new_accounts = [instance for instance in session.new if isinstance(instance, Account)]
+    moved = [
+        instance for instance in session.dirty
+        if isinstance(instance, Account) and inspect(instance).attrs.parent_id.history.has_changes()
+    ]
+    touched = _touched_accounts(session)
+    if not new_accounts and not moved and not touched:
+        return
+    connection = session.connection()
+    # Totals above the old position of moved accounts change too
+    stale = set(connection.scalars(ancestors_query(touched))) if touched else set()
+
+    # Parents before children when a whole branch is added at once
+    pending = {account.id: account for account in new_accounts}
+    while pending:
+        ready = [account for account in pending.values() if account.parent_id not in pending]
+        if not ready:
+            raise ValueError(f"New accounts {sorted(pending)} form a parent cycle")
+        for account in ready:
+            _link(connection, account.id, account.parent_id)
+            del pending[account.id]
+    for account in moved:
+        _move(connection, account.id, account.parent_id)
+
+    placed = [account.id for account in (*new_accounts, *moved)]
+    if placed:
+        stale.update(connection.scalars(ancestors_query(placed)))
+    mark_changed(session, 'account_totals_stale', stale)
+
+
+invalidate_on_commit('account_totals_stale', account_totals_cache.invalidate)
@@ -0,0 +1,253 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from db.upsert import upsert_insert
+from models.associations import channel_warehouses
+from models.channel import Channel
+from models.stock import Allocation, StockLevel
+
+PRIORITIZE_SORTING_ORDER = "PRIORITIZE_SORTING_ORDER"
+PRIORITIZE_HIGH_STOCK = "PRIORITIZE_HIGH_STOCK"
+ALLOCATION_STRATEGIES = (PRIORITIZE_SORTING_ORDER, PRIORITIZE_HIGH_STOCK)
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, shortages: List[dict]):
+        self.shortages = shortages
+        super().__init__(
+            ", ".join(f"variant {item['product_variant_id']}: {item['missing']} missing" for item in shortages)
+        )
+
+
+@dataclass(frozen=True)
+class AllocationLine:
+    order_id: int
+    order_line_id: int
+    product_variant_id: int
+    quantity: Decimal
+
+
+@dataclass
+class AllocationResult:
+    allocations: List[dict] = field(default_factory=list)
+    # order_id -> shortages; these orders got no allocations at all
+    failed_orders: Dict[int, List[dict]] = field(default_factory=dict)
+
+
+def _stock_query(variant_ids, warehouse_ids, skip_locked: bool):
+    # Rows are locked in id order so allocators that wait on each other
+    # always queue up the same way instead of deadlocking.
+    return (
+        select(StockLevel.id, StockLevel.product_variant_id, StockLevel.warehouse_id, StockLevel.available)
+        .where(
+            StockLevel.product_variant_id.in_(variant_ids),
+            StockLevel.warehouse_id.in_(warehouse_ids),
+            StockLevel.available > 0,
+        )
+        .order_by(StockLevel.id)
+        .with_for_update(skip_locked=skip_locked)
+    )
+
+
+def _load_channel(db: Session, channel_id: int):
+    strategy = db.scalar(select(Channel.allocation_strategy).where(Channel.id == channel_id))
+    strategy = strategy or PRIORITIZE_SORTING_ORDER
+    if strategy not in ALLOCATION_STRATEGIES:
+        raise ValueError(f"Unsupported allocation strategy '{strategy}'")
+    ranks = dict(db.execute(
+        select(channel_warehouses.c.warehouse_id, channel_warehouses.c.sort_order)
+        .where(channel_warehouses.c.channel_id == channel_id)
+    ).all())
+    return strategy, ranks
+
+
+def _shortfall(stocks: List[dict], lines: Sequence[AllocationLine]) -> List[int]:
+    available = defaultdict(Decimal)
+    for stock in stocks:
+        available[stock["product_variant_id"]] += stock["available"]
+    demand = defaultdict(Decimal)
+    for line in lines:
+        demand[line.product_variant_id] += Decimal(line.quantity)
+    return [variant_id for variant_id, quantity in demand.items() if available[variant_id] < quantity]
+
+
+def _lock_stocks(db: Session, lines: Sequence[AllocationLine], warehouse_ids, skip_locked: bool) -> List[dict]:
+    """Lock and return the candidate stock rows for `lines`.
+
+    With `skip_locked`, rows held by concurrent checkouts are skipped so
+    they don't queue behind each other. If that leaves a variant short,
+    the skipped rows may still hold its stock: the fast attempt is undone
+    (releasing its locks) and all candidates are locked again, waiting
+    this time, so a busy row never reads as "out of stock".
+    """
+    variant_ids = sorted({line.product_variant_id for line in lines})
+    if not skip_locked or db.get_bind().dialect.name != "postgresql":
+        return [dict(row._mapping) for row in db.execute(_stock_query(variant_ids, warehouse_ids, skip_locked=False))]
+
+    attempt = db.begin_nested()
+    stocks = [dict(row._mapping) for row in db.execute(_stock_query(variant_ids, warehouse_ids, skip_locked=True))]
+    if not _shortfall(stocks, lines):
+        attempt.commit()
+        return stocks
+    attempt.rollback()
+    return [dict(row._mapping) for row in db.execute(_stock_query(variant_ids, warehouse_ids, skip_locked=False))]
+
+
+def plan_allocations(strategy: str, ranks: Dict[int, int], stocks: List[dict], lines: Sequence[AllocationLine]) -> AllocationResult:
+    """Spread line quantities over stock rows; orders are all-or-nothing.
+
+    PRIORITIZE_SORTING_ORDER drains warehouses in the channel's sort
+    order; PRIORITIZE_HIGH_STOCK starts with the warehouse holding the
+    most available stock for the variant.
+    """
+    if strategy == PRIORITIZE_HIGH_STOCK:
+        sort_key = lambda stock: (-stock["available"], ranks[stock["warehouse_id"]], stock["id"])
+    else:
+        sort_key = lambda stock: (ranks[stock["warehouse_id"]], stock["id"])
+    candidates = defaultdict(list)
+    for stock in sorted(stocks, key=sort_key):
+        candidates[stock["product_variant_id"]].append(stock)
+
+    lines_by_order = defaultdict(list)
+    for line in lines:
+        lines_by_order[line.order_id].append(line)
+
+    result = AllocationResult()
+    used: Dict[int, Decimal] = defaultdict(Decimal)
+    for order_id, order_lines in lines_by_order.items():
+        taken: Dict[int, Decimal] = defaultdict(Decimal)
+        allocations, shortages = [], []
+        for line in order_lines:
+            remaining = Decimal(line.quantity)
+            for stock in candidates[line.product_variant_id]:
+                if not remaining:
+                    break
+                free = stock["available"] - used[stock["id"]] - taken[stock["id"]]
+                quantity = min(remaining, free)
+                if quantity <= 0:
+                    continue
+                taken[stock["id"]] += quantity
+                remaining -= quantity
+                allocations.append({
+                    "order_line_id": line.order_line_id,
+                    "stock_level_id": stock["id"],
+                    "quantity_allocated": quantity,
+                })
+            if remaining:
+                shortages.append({
+                    "order_line_id": line.order_line_id,
+                    "product_variant_id": line.product_variant_id,
+                    "missing": remaining,
+                })
+        if shortages:
+            result.failed_orders[order_id] = shortages
+            continue
+        for stock_id, quantity in taken.items():
+            used[stock_id] += quantity
+        result.allocations += allocations
+    return result
+
+
+def _write_allocations(db: Session, allocations: List[dict]) -> None:
+    reserved = defaultdict(Decimal)
+    for allocation in allocations:
+        reserved[allocation["stock_level_id"]] += allocation["quantity_allocated"]
+    levels = StockLevel.__table__
+    db.execute(
+        update(levels)
+        .where(levels.c.id == bindparam("stock_level_id"))
+        .values(reserved=levels.c.reserved + bindparam("delta", type_=levels.c.reserved.type), updated_at=func.now()),
+        [{"stock_level_id": stock_id, "delta": quantity} for stock_id, quantity in sorted(reserved.items())],
+    )
+    table = Allocation.__table__
+    statement = upsert_insert(table, db.get_bind().dialect.name)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.order_line_id, table.c.stock_level_id],
+        set_={
+            "quantity_allocated": table.c.quantity_allocated + statement.excluded.quantity_allocated,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement, allocations)
+
+
+def allocate_lines(
+    db: Session,
+    channel_id: int,
+    lines: Sequence[AllocationLine],
+    skip_locked: bool = True,
+) -> AllocationResult:
+    """Allocate order lines of one channel across its warehouses in one pass.
+
+    Candidate stock rows of every line are locked with a single query,
+    the quantities are planned in memory, and reservations are written
+    with one executemany UPDATE and one INSERT. Orders that can't be
+    fully allocated are reported in `failed_orders` and reserve nothing.
+    Runs in the caller's transaction; commit to keep the reservations.
+    """
+    strategy, ranks = _load_channel(db, channel_id)
+    lines = [line for line in lines if line.quantity > 0]
+    if not lines or not ranks:
+        return plan_allocations(strategy, ranks, [], lines)
+    stocks = _lock_stocks(db, lines, sorted(ranks), skip_locked)
+    result = plan_allocations(strategy, ranks, stocks, lines)
+    if result.allocations:
+        _write_allocations(db, result.allocations)
+    return result
+
+
+def allocate_order(db: Session, order, skip_locked: bool = True) -> List[dict]:
+    """Allocate what is still unallocated on every line of `order`.
+
+    Raises InsufficientStockError if any line is short.
+    """
+    allocated = dict(db.execute(
+        select(Allocation.order_line_id, func.sum(Allocation.quantity_allocated))
+        .where(Allocation.order_line_id.in_([line.id for line in order.lines]))
+        .group_by(Allocation.order_line_id)
+    ).all())
+    lines = [
+        AllocationLine(
+            order.id,
+            line.id,
+            line.product_variant_id,
+            Decimal(line.quantity - line.quantity_fulfilled) - allocated.get(line.id, 0),
+        )
+        for line in order.lines
+        if line.product_variant_id is not None
+    ]
+    result = allocate_lines(db, order.channel_id, lines, skip_locked)
+    if order.id in result.failed_orders:
+        raise InsufficientStockError(result.failed_orders[order.id])
+    return result.allocations
+
+
+def deallocate_lines(db: Session, order_line_ids: Sequence[int]) -> int:
+    """Release the reservations of `order_line_ids`; returns the rows freed."""
+    rows = db.execute(
+        select(Allocation.id, Allocation.stock_level_id, Allocation.quantity_allocated)
+        .where(Allocation.order_line_id.in_(order_line_ids))
+    ).all()
+    if not rows:
+        return 0
+    released: Dict[int, Decimal] = defaultdict(Decimal)
+    for _, stock_level_id, quantity in rows:
+        released[stock_level_id] += quantity
+    # Same lock order as allocation
+    db.execute(
+        select(StockLevel.id).where(StockLevel.id.in_(sorted(released))).order_by(StockLevel.id).with_for_update()
+    )
+    levels = StockLevel.__table__
+    db.execute(
+        update(levels)
+        .where(levels.c.id == bindparam("stock_level_id"))
+        .values(reserved=levels.c.reserved - bindparam("delta", type_=levels.c.reserved.type), updated_at=func.now()),
+        [{"stock_level_id": stock_id, "delta": quantity} for stock_id, quantity in sorted(released.items())],
+    )
+    db.execute(delete(Allocation).where(Allocation.id.in_([row.id for row in rows])))
+    return len(rows)
@@ -0,0 +1,147 @@
+import threading
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, func, inspect, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from db.invalidation import invalidate_on_commit, mark_changed
+from models.categories import Category
+from schemas.categories import CategoryTreeNode
+
+_tree_adapter = TypeAdapter(List[CategoryTreeNode])
+
+
+def child_path(parent_path: Optional[str], category_id: int) -> str:
+    return f"{parent_path or ''}{category_id}/"
+
+
+def subtree_ids_query(path: str):
+    """Ids of the category with `path` and everything below it (one
+    index range scan on idx_category_path)."""
+    return select(Category.id).where(Category.path.startswith(path))
+
+
+def tree_stamp_query():
+    """Changes whenever a category is added, removed or updated."""
+    return select(func.count(Category.id), func.max(Category.updated_at))
+
+
+def build_tree(rows) -> List[dict]:
+    """Nested nodes from (id, name, slug, parent_id, path) rows, siblings by name."""
+    nodes = {
+        category_id: {"id": category_id, "name": name, "slug": slug, "parent_id": parent_id, "path": path, "children": []}
+        for category_id, name, slug, parent_id, path in rows
+    }
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        (parent["children"] if parent else roots).append(node)
+    for node in (*nodes.values(), {"children": roots}):
+        node["children"].sort(key=lambda child: (child["name"] or "", child["id"]))
+    return roots
+
+
+class CategoryTreeCache:
+    """The full category tree as serialized JSON.
+
+    Rebuilt only when its version changes: a local version bumped when
+    this process commits a category change, plus the count and latest
+    `updated_at` of the table so other processes' changes are seen on
+    the next request.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._entry: Optional[Tuple[tuple, bytes]] = None
+        self._lock = threading.Lock()
+
+    def version(self, stamp) -> tuple:
+        with self._lock:
+            return (self._version, *stamp)
+
+    def get(self, version: tuple) -> Optional[bytes]:
+        with self._lock:
+            if self._entry is not None and self._entry[0] == version:
+                return self._entry[1]
+            return None
+
+    def set(self, version: tuple, tree: bytes) -> None:
+        with self._lock:
+            if version[0] == self._version:
+                self._entry = (version, tree)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entry = None
+
+
+category_tree_cache = CategoryTreeCache()
+
+
+async def get_category_tree_json(db: AsyncSession) -> bytes:
+    version = category_tree_cache.version(tuple((await db.execute(tree_stamp_query())).one()))
+    tree = category_tree_cache.get(version)
+    if tree is None:
+        rows = await db.execute(select(Category.id, Category.name, Category.slug, Category.parent_id, Category.path))
+        tree = _tree_adapter.dump_json(_tree_adapter.validate_python(build_tree(rows)))
+        category_tree_cache.set(version, tree)
+    return tree
+
+
+def _path_of(connection, category_id: Optional[int]) -> Optional[str]:
+    if category_id is None:
+        return None
+    return connection.scalar(select(Category.path).where(Category.id == category_id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_category_paths(session, flush_context):
+    new = [instance for instance in session.new if isinstance(instance, Category)]
+    moved = [
+        instance for instance in session.dirty
+        if isinstance(instance, Category) and inspect(instance).attrs.parent_id.history.has_changes()
+    ]
+    if any(isinstance(instance, Category) for instance in (*session.new, *session.dirty, *session.deleted)):
+        mark_changed(session, 'category_tree_changed', {True})
+    if not new and not moved:
+        return
+    connection = session.connection()
+    categories = Category.__table__
+
+    # Parents before children when a whole branch is added at once
+    paths, pending = {}, {category.id: category for category in new}
+    while pending:
+        ready = [category for category in pending.values() if category.parent_id not in pending]
+        if not ready:
+            raise ValueError(f"New categories {sorted(pending)} form a parent cycle")
+        for category in ready:
+            parent_path = paths.get(category.parent_id) or _path_of(connection, category.parent_id)
+            paths[category.id] = child_path(parent_path, category.id)
+            connection.execute(update(categories).where(categories.c.id == category.id).values(path=paths[category.id]))
+            set_committed_value(category, 'path', paths[category.id])
+            del pending[category.id]
+
+    for category in moved:
+        old_path = _path_of(connection, category.id)
+        parent_path = _path_of(connection, category.parent_id)
+        if parent_path is not None and parent_path.startswith(old_path):
+            raise ValueError("A category cannot be moved under itself or its descendants")
+        new_path = child_path(parent_path, category.id)
+        connection.execute(
+            update(categories)
+            .where(categories.c.path.startswith(old_path))
+            .values(path=literal(new_path).concat(func.substr(categories.c.path, len(old_path) + 1)), updated_at=func.now())
+        )
+        # Loaded descendants now hold stale paths
+        for instance in session.identity_map.values():
+            loaded_path = inspect(instance).dict.get('path') if isinstance(instance, Category) else None
+            if instance is not category and loaded_path and loaded_path.startswith(old_path):
+                session.expire(instance, ['path'])
+        set_committed_value(category, 'path', new_path)
+
+
+invalidate_on_commit('category_tree_changed', lambda changed: category_tree_cache.invalidate())
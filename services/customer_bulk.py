@@ -0,0 +1,194 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import String, bindparam, cast, func, literal, select, union_all, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.counting import invalidate_counts
+from db.upsert import upsert_insert
+from models.address import Address
+from models.customer import Customer
+from schemas.customers import CustomerBulkCreate, CustomerBulkRequest, CustomerBulkUpdate
+from utils.helpers import normalize_email, normalize_phone
+
+CUSTOMER_BULK_CHUNK_SIZE = 500
+
+# Schema fields whose column has a different name
+_COLUMN_NAMES = {"phone": "phone_number"}
+
+BulkItem = Tuple[str, int, Union[CustomerBulkCreate, CustomerBulkUpdate]]
+
+
+def _column_values(item, fields) -> dict:
+    """Column values for the fields the client sent, plus derived search keys."""
+    values = {}
+    for field in sorted(fields):
+        values[_COLUMN_NAMES.get(field, field)] = getattr(item, field)
+    # Core statements skip the model's @validates hooks
+    if "phone" in fields:
+        values["phone_normalized"] = normalize_phone(item.phone)
+    if "email" in fields:
+        values["email_normalized"] = normalize_email(item.email)
+    return values
+
+
+def _lookup_query(address_ids: List[int], customer_ids: List[int], tax_ids: List[str]):
+    """Referenced addresses, updated customers and upsert keys of a chunk in one round trip."""
+    return union_all(
+        select(literal("address"), cast(Address.id, String), Address.id).where(Address.id.in_(address_ids)),
+        select(literal("id"), cast(Customer.id, String), Customer.id).where(Customer.id.in_(customer_ids)),
+        select(literal("tax_id"), Customer.tax_id, Customer.id).where(Customer.tax_id.in_(tax_ids)),
+    )
+
+
+class CustomerBulkWriter:
+    """Apply bulk customer creates/updates, one transaction per chunk.
+
+    Each chunk validates every referenced address, updated id and tax_id
+    with a single lookup query, then writes creates with
+    INSERT ... ON CONFLICT (tax_id) DO UPDATE and updates with one
+    executemany UPDATE keyed on id per set of changed fields. Invalid
+    items are reported and skipped; if the database still rejects a
+    chunk (e.g. a concurrent writer took a tax_id), that chunk's items
+    are reported as failed and the other chunks stay committed.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: int, chunk_size: int = CUSTOMER_BULK_CHUNK_SIZE):
+        self.db = db
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.results: Dict[Tuple[str, int], dict] = {}
+
+    def _result(self, item: BulkItem, status: str, customer_id: Optional[int] = None, error: Optional[str] = None):
+        operation, index, _ = item
+        self.results[(operation, index)] = {
+            "operation": operation,
+            "index": index,
+            "status": status,
+            "id": customer_id,
+            "error": error,
+        }
+
+    async def run(self, request: CustomerBulkRequest) -> dict:
+        items: List[BulkItem] = [("create", index, item) for index, item in enumerate(request.creates)]
+        items += [("update", index, item) for index, item in enumerate(request.updates)]
+        for start in range(0, len(items), self.chunk_size):
+            await self._apply_chunk(items[start:start + self.chunk_size])
+        if items:
+            invalidate_counts(Customer.__tablename__)
+
+        results = [self.results[(operation, index)] for operation, index, _ in items]
+        return {
+            "created": sum(result["status"] == "created" for result in results),
+            "updated": sum(result["status"] == "updated" for result in results),
+            "failed": sum(result["status"] == "error" for result in results),
+            "results": results,
+        }
+
+    async def _lookup(self, chunk: List[BulkItem]) -> Dict[str, Dict[str, int]]:
+        address_ids, customer_ids, tax_ids = set(), set(), set()
+        for operation, _, item in chunk:
+            address_ids.update(filter(None, (item.billing_address_id, item.shipping_address_id)))
+            if item.tax_id:
+                tax_ids.add(item.tax_id)
+            if operation == "update":
+                customer_ids.add(item.id)
+        found: Dict[str, Dict[str, int]] = defaultdict(dict)
+        result = await self.db.execute(_lookup_query(list(address_ids), list(customer_ids), list(tax_ids)))
+        for kind, key, row_id in result:
+            found[kind][key] = row_id
+        return found
+
+    def _validate(self, item: BulkItem, found, claimed_tax_ids: set) -> Optional[str]:
+        operation, _, fields = item
+        for label, address_id in (("Billing", fields.billing_address_id), ("Shipping", fields.shipping_address_id)):
+            if address_id and str(address_id) not in found["address"]:
+                return f"{label} address {address_id} not found"
+        if operation == "update" and str(fields.id) not in found["id"]:
+            return "Customer not found"
+        if fields.tax_id:
+            if fields.tax_id in claimed_tax_ids:
+                return f"Duplicate tax_id '{fields.tax_id}' in request"
+            owner = found["tax_id"].get(fields.tax_id)
+            if operation == "update" and owner is not None and owner != fields.id:
+                return f"tax_id '{fields.tax_id}' belongs to customer {owner}"
+            claimed_tax_ids.add(fields.tax_id)
+        return None
+
+    async def _apply_chunk(self, chunk: List[BulkItem]) -> None:
+        found = await self._lookup(chunk)
+        claimed_tax_ids = set()
+        creates, updates = defaultdict(list), defaultdict(list)
+        for item in chunk:
+            error = self._validate(item, found, claimed_tax_ids)
+            if error:
+                self._result(item, "error", error=error)
+                continue
+            operation, _, fields = item
+            sent = frozenset(fields.model_fields_set - {"id"})
+            (creates if operation == "create" else updates)[sent].append(item)
+
+        written = [item for group in (*creates.values(), *updates.values()) for item in group]
+        if not written:
+            return
+        try:
+            for sent, group in creates.items():
+                await self._write_creates(sent, group, found)
+            for sent, group in updates.items():
+                await self._write_updates(sent, group)
+            await self.db.commit()
+        except DBAPIError as e:
+            # A constraint race or a value the database refused; the whole
+            # chunk was rolled back, so report every item written in it
+            await self.db.rollback()
+            for item in written:
+                self._result(item, "error", error=f"Chunk rejected by the database: {str(e.orig)}")
+
+    async def _write_creates(self, sent: frozenset, group: List[BulkItem], found) -> None:
+        customers = Customer.__table__
+        rows = [
+            {
+                **_column_values(fields, sent),
+                "created_by": self.user_id,
+                "updated_by": self.user_id,
+                "assigned_user_id": self.user_id,
+            }
+            for _, _, fields in group
+        ]
+        statement = upsert_insert(customers, self.db.get_bind().dialect.name)
+        # On a tax_id match only the sent columns change; ownership stays
+        updated_columns = {column: statement.excluded[column] for column in _column_values(group[0][2], sent)}
+        updated_columns["updated_by"] = statement.excluded.updated_by
+        updated_columns["updated_at"] = func.now()
+        statement = statement.on_conflict_do_update(
+            index_elements=[customers.c.tax_id], set_=updated_columns
+        ).returning(customers.c.id, sort_by_parameter_order=True)
+        ids = (await self.db.execute(statement, rows)).scalars().all()
+        for item, customer_id in zip(group, ids):
+            existed = item[2].tax_id is not None and item[2].tax_id in found["tax_id"]
+            self._result(item, "updated" if existed else "created", customer_id)
+
+    async def _write_updates(self, sent: frozenset, group: List[BulkItem]) -> None:
+        customers = Customer.__table__
+        columns = list(_column_values(group[0][2], sent))
+        # Parameter names must not collide with column names, or they
+        # would be picked up as extra SET targets.
+        statement = (
+            update(customers)
+            .where(customers.c.id == bindparam("customer_id"))
+            .values({
+                **{column: bindparam(f"new_{column}", type_=customers.c[column].type) for column in columns},
+                "updated_by": self.user_id,
+            })
+        )
+        params = [
+            {
+                "customer_id": fields.id,
+                **{f"new_{column}": value for column, value in _column_values(fields, sent).items()},
+            }
+            for _, _, fields in group
+        ]
+        await self.db.execute(statement, params)
+        for item in group:
+            self._result(item, "updated", item[2].id)
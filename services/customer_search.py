@@ -0,0 +1,66 @@
+from sqlalchemy import func, or_
+from sqlalchemy.sql import Select
+
+from models.customer import Customer
+from utils.helpers import normalize_email, normalize_phone
+
+# Trigram indexes can't help with fewer than three characters
+MIN_TRIGRAM_SEARCH_LENGTH = 3
+
+
+def legacy_search_filter(search: str):
+    """Leading-wildcard ILIKE over the raw columns (sequential scan)."""
+    return or_(
+        Customer.customer_name.ilike(f"%{search}%"),
+        Customer.email.ilike(f"%{search}%"),
+        Customer.phone_number.ilike(f"%{search}%"),
+        Customer.tax_id.ilike(f"%{search}%")
+    )
+
+
+def apply_customer_search(query: Select, search: str, dialect_name: str):
+    """Filter `query` by `search` and return `(query, rank)`.
+
+    On PostgreSQL every branch is a substring match on a pg_trgm GIN
+    indexed column, so the planner combines them with a BitmapOr instead
+    of scanning the table. Email and phone are matched on their
+    normalized forms, so "+1 (555) 010" finds "15550102030"; terms with
+    fewer than three digits fall back to ILIKE on the raw phone. `rank` is
+    the best trigram similarity across the matched columns, or None for
+    terms shorter than three characters.
+
+    Other dialects (SQLite in tests) use the original ILIKE filter and
+    return no rank.
+    """
+    if dialect_name != "postgresql":
+        return query.where(legacy_search_filter(search)), None
+
+    term = search.strip()
+    email_term = normalize_email(term) or term
+    phone_term = normalize_phone(term)
+
+    conditions = [
+        Customer.customer_name.ilike(f"%{term}%"),
+        Customer.email_normalized.like(f"%{email_term}%"),
+        Customer.tax_id.ilike(f"%{term}%"),
+    ]
+    similarities = [
+        func.similarity(Customer.customer_name, term),
+        func.similarity(Customer.email_normalized, email_term),
+        func.similarity(Customer.tax_id, term),
+    ]
+    if phone_term and len(phone_term) >= MIN_TRIGRAM_SEARCH_LENGTH:
+        conditions.append(Customer.phone_normalized.like(f"%{phone_term}%"))
+        similarities.append(func.similarity(Customer.phone_normalized, phone_term))
+    elif phone_term:
+        # Too short for the trigram index; keep the legacy match so short
+        # digit searches still find phones (scans, like the old filter)
+        conditions.append(Customer.phone_number.ilike(f"%{term}%"))
+
+    if len(term) < MIN_TRIGRAM_SEARCH_LENGTH:
+        # Nearly every row matches and no similarity is meaningful;
+        # ranking would score and sort them all
+        return query.where(or_(*conditions)), None
+    # similarity() of a NULL column is NULL; greatest() skips NULLs
+    rank = func.greatest(*similarities)
+    return query.where(or_(*conditions)), rank
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import AsyncIterator, List
+
+from sqlalchemy.sql import Select
+
+from db.connection import open_routed_session
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _export_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_csv(columns: List[str], rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(columns: List[str], rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, (_export_value(value) for value in row)))) + "\n"
+        for row in rows
+    ).encode()
+
+
+async def stream_export(
+    query: Select,
+    format: str,
+    use_writer: bool,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Encode the rows of `query` batch by batch for a StreamingResponse.
+
+    Rows are read through a server-side cursor (`stream_results` with
+    `yield_per`), so at most one batch is held in memory whatever the
+    result size. The generator opens its own session: a request-scoped
+    one could be closed before the response body has been sent.
+    """
+    columns = [column.key for column in query.selected_columns]
+    first = True
+    async with open_routed_session(use_writer) as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            if format == "csv":
+                yield _encode_csv(columns, rows, header=first)
+            else:
+                yield _encode_ndjson(columns, rows)
+            first = False
+    if first and format == "csv":
+        yield _encode_csv(columns, [], header=True)
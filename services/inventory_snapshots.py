@@ -0,0 +1,215 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.stock import InventorySnapshot, StockMovement, inventory_snapshot_lines
+from services.stock_levels import STOCK_REBUILD_BATCH_SIZE, movement_delta, replay_ledger
+
+# Snapshots stop this far in the past so transactions still writing
+# movements with an older created_at have committed by then.
+INVENTORY_SNAPSHOT_SETTLE_SECONDS = 300
+
+SnapshotKey = Tuple[int, int]
+
+
+def movement_totals_query(
+    after_id: int,
+    until_id: Optional[int] = None,
+    until: Optional[datetime] = None,
+    warehouse_ids: Optional[List[int]] = None,
+    variant_ids: Optional[List[int]] = None,
+):
+    """Net movement per (variant, warehouse) over movement ids in
+    (after_id, until_id], optionally only those created at or before
+    `until`. An id range on the primary key, so it reads only the
+    movements recorded since `after_id`."""
+    query = (
+        select(StockMovement.product_variant_id, StockMovement.warehouse_id, func.sum(movement_delta))
+        .where(
+            StockMovement.id > after_id,
+            StockMovement.product_variant_id.isnot(None),
+            StockMovement.warehouse_id.isnot(None),
+        )
+        .group_by(StockMovement.product_variant_id, StockMovement.warehouse_id)
+    )
+    if until_id is not None:
+        query = query.where(StockMovement.id <= until_id)
+    if until is not None:
+        query = query.where(StockMovement.created_at <= until)
+    if warehouse_ids:
+        query = query.where(StockMovement.warehouse_id.in_(warehouse_ids))
+    if variant_ids:
+        query = query.where(StockMovement.product_variant_id.in_(variant_ids))
+    return query
+
+
+def last_movement_id_query(until: datetime):
+    """Id of the last movement created at or before `until` (walks
+    idx_stock_movement_created_at backwards, one row)."""
+    return (
+        select(StockMovement.id)
+        .where(StockMovement.created_at <= until)
+        .order_by(StockMovement.created_at.desc(), StockMovement.id.desc())
+        .limit(1)
+    )
+
+
+def snapshot_lines_query(
+    snapshot_id: int,
+    warehouse_ids: Optional[List[int]] = None,
+    variant_ids: Optional[List[int]] = None,
+):
+    lines = inventory_snapshot_lines.c
+    query = select(lines.product_variant_id, lines.warehouse_id, lines.quantity).where(lines.snapshot_id == snapshot_id)
+    if warehouse_ids:
+        query = query.where(lines.warehouse_id.in_(warehouse_ids))
+    if variant_ids:
+        query = query.where(lines.product_variant_id.in_(variant_ids))
+    return query
+
+
+def latest_snapshot_query(at: datetime):
+    return (
+        select(InventorySnapshot)
+        .where(InventorySnapshot.taken_at <= at)
+        .order_by(InventorySnapshot.taken_at.desc())
+        .limit(1)
+    )
+
+
+def _accumulate(totals: Dict[SnapshotKey, Decimal], rows) -> None:
+    for variant_id, warehouse_id, quantity in rows:
+        totals[(variant_id, warehouse_id)] += Decimal(quantity or 0)
+
+
+def _snapshot_lines(totals: Dict[SnapshotKey, Decimal]) -> List[dict]:
+    return [
+        {"product_variant_id": variant_id, "warehouse_id": warehouse_id, "quantity": quantity}
+        for (variant_id, warehouse_id), quantity in sorted(totals.items())
+        if quantity
+    ]
+
+
+def _chained_totals(db: Session, previous: Optional[InventorySnapshot], until_id: int) -> Dict[SnapshotKey, Decimal]:
+    """The previous snapshot plus the movements with ids after it, up to `until_id`."""
+    totals: Dict[SnapshotKey, Decimal] = defaultdict(Decimal)
+    if previous is not None:
+        _accumulate(totals, db.execute(snapshot_lines_query(previous.id)))
+    _accumulate(totals, db.execute(movement_totals_query(previous.last_movement_id if previous else 0, until_id)))
+    return totals
+
+
+def _write_lines(db: Session, snapshot: InventorySnapshot, lines: List[dict]) -> None:
+    snapshot.line_count = len(lines)
+    db.flush()
+    if lines:
+        db.execute(insert(inventory_snapshot_lines), [{"snapshot_id": snapshot.id, **line} for line in lines])
+
+
+def take_inventory_snapshot(db: Session, taken_at: Optional[datetime] = None) -> InventorySnapshot:
+    """Write a snapshot as of `taken_at` (default: now minus the settle delay).
+
+    Snapshots chain on movement ids, not on created_at windows: each one
+    is the previous snapshot plus the movements with ids in
+    (previous.last_movement_id, last_movement_id], so every movement is
+    counted by exactly one step whatever its created_at. A movement whose
+    transaction was still open when its id range was read is missed;
+    `verify_inventory_snapshots` finds that and `rebuild_inventory_snapshots`
+    repairs it. Runs in the caller's transaction.
+    """
+    if taken_at is None:
+        taken_at = datetime.now(timezone.utc) - timedelta(seconds=INVENTORY_SNAPSHOT_SETTLE_SECONDS)
+    previous = db.scalars(latest_snapshot_query(taken_at)).first()
+    if previous is not None and previous.taken_at == taken_at:
+        return previous
+
+    last_movement_id = max(
+        db.scalar(last_movement_id_query(taken_at)) or 0,
+        previous.last_movement_id if previous else 0,
+    )
+    lines = _snapshot_lines(_chained_totals(db, previous, last_movement_id))
+    snapshot = InventorySnapshot(taken_at=taken_at, last_movement_id=last_movement_id)
+    db.add(snapshot)
+    _write_lines(db, snapshot, lines)
+    return snapshot
+
+
+def _snapshots_query(since: Optional[datetime] = None):
+    query = select(InventorySnapshot).order_by(InventorySnapshot.taken_at)
+    if since is not None:
+        query = query.where(InventorySnapshot.taken_at >= since)
+    return query
+
+
+def verify_inventory_snapshots(
+    db: Session, since: Optional[datetime] = None, batch_size: int = STOCK_REBUILD_BATCH_SIZE
+) -> List[dict]:
+    """Compare each snapshot with a ledger replay up to its last movement
+    id; returns the mismatching lines. Costs a full replay per snapshot."""
+    mismatches = []
+    for snapshot in db.scalars(_snapshots_query(since)).all():
+        expected = replay_ledger(db, batch_size, until_id=snapshot.last_movement_id)
+        actual: Dict[SnapshotKey, Decimal] = defaultdict(Decimal)
+        _accumulate(actual, db.execute(snapshot_lines_query(snapshot.id)))
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key, Decimal(0)) != actual.get(key, Decimal(0)):
+                mismatches.append({
+                    "snapshot_id": snapshot.id,
+                    "taken_at": snapshot.taken_at,
+                    "product_variant_id": key[0],
+                    "warehouse_id": key[1],
+                    "expected": expected.get(key, Decimal(0)),
+                    "actual": actual.get(key, Decimal(0)),
+                })
+    return mismatches
+
+
+def rebuild_inventory_snapshots(
+    db: Session, since: Optional[datetime] = None, batch_size: int = STOCK_REBUILD_BATCH_SIZE
+) -> int:
+    """Rewrite the lines of every snapshot taken at or after `since` (all
+    of them by default): the first from a ledger replay, each later one
+    chained from the one before. Returns the number of snapshots
+    rewritten; runs in the caller's transaction."""
+    snapshots = db.scalars(_snapshots_query(since)).all()
+    previous = None
+    for index, snapshot in enumerate(snapshots):
+        if index == 0:
+            totals = replay_ledger(db, batch_size, until_id=snapshot.last_movement_id)
+        else:
+            totals = _chained_totals(db, previous, snapshot.last_movement_id)
+        db.execute(delete(inventory_snapshot_lines).where(inventory_snapshot_lines.c.snapshot_id == snapshot.id))
+        _write_lines(db, snapshot, _snapshot_lines(totals))
+        previous = snapshot
+    return len(snapshots)
+
+
+async def get_inventory_as_of(
+    db: AsyncSession,
+    at: datetime,
+    warehouse_ids: Optional[List[int]] = None,
+    variant_ids: Optional[List[int]] = None,
+) -> dict:
+    """Stock on hand per variant and warehouse at `at`.
+
+    Starts from the latest snapshot taken at or before `at` and adds
+    the movements with ids after its last one that were created by `at`;
+    with no such snapshot the whole ledger up to `at` is summed.
+    """
+    snapshot = (await db.scalars(latest_snapshot_query(at))).first()
+    totals: Dict[SnapshotKey, Decimal] = defaultdict(Decimal)
+    if snapshot is not None:
+        _accumulate(totals, await db.execute(snapshot_lines_query(snapshot.id, warehouse_ids, variant_ids)))
+    _accumulate(totals, await db.execute(movement_totals_query(
+        snapshot.last_movement_id if snapshot else 0, None, at, warehouse_ids, variant_ids
+    )))
+    return {
+        "at": at,
+        "snapshot_at": snapshot.taken_at if snapshot else None,
+        "items": _snapshot_lines(totals),
+    }
@@ -0,0 +1,297 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, Numeric, bindparam, column, func, insert, select, update, values
+from sqlalchemy.orm import Session
+
+from db.invalidation import mark_changed
+from models.account import Account, JournalEntry, JournalItem
+from services.account_tree import ancestors_query
+from services.ledger_periods import entry_date, open_period_start
+
+JOURNAL_POSTING_CHUNK_ITEMS = 10000
+JOURNAL_MAX_REPORTED_ERRORS = 1000
+
+# Amounts are handled as integers at the scale of the amount columns
+AMOUNT_SCALE = JournalItem.__table__.c.debit.type.scale
+_AMOUNT_TYPE = Numeric(precision=18, scale=AMOUNT_SCALE)
+
+
+def to_units(value) -> int:
+    """Integer amount at AMOUNT_SCALE; rejects finer precision."""
+    if value is None:
+        return 0
+    try:
+        scaled = Decimal(value).scaleb(AMOUNT_SCALE)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Invalid amount {value!r}")
+    units = int(scaled)
+    if units != scaled:
+        raise ValueError(f"Amount {value} has more than {AMOUNT_SCALE} decimal places")
+    return units
+
+
+def from_units(units: int) -> Decimal:
+    return Decimal(units).scaleb(-AMOUNT_SCALE)
+
+
+def _validate(entry: dict, closed_before: Optional[datetime] = None) -> Tuple[Optional[str], Optional[datetime], List[tuple]]:
+    """The entry's date and items as (account_id, debit_units,
+    credit_units, description), or an error message."""
+    entry_at = entry_date(entry.get("date"))
+    if entry_at is None:
+        return "Entry needs a date or datetime", None, []
+    if closed_before is not None and entry_at < closed_before:
+        return f"Period closed: entries must be dated on or after {closed_before.date()}", None, []
+    items = entry.get("items") or []
+    if len(items) < 2:
+        return "An entry needs at least two items", None, []
+    converted, debit, credit = [], 0, 0
+    for index, item in enumerate(items):
+        try:
+            item_debit, item_credit = to_units(item.get("debit")), to_units(item.get("credit"))
+        except ValueError as e:
+            return f"Item {index}: {str(e)}", None, []
+        if item_debit < 0 or item_credit < 0:
+            return f"Item {index}: amounts must not be negative", None, []
+        if item_debit and item_credit:
+            return f"Item {index}: debit and credit on the same item", None, []
+        debit += item_debit
+        credit += item_credit
+        converted.append((item.get("account_id"), item_debit, item_credit, item.get("description")))
+    if debit != credit:
+        return f"Unbalanced entry: debit {from_units(debit)} != credit {from_units(credit)}", None, []
+    if not debit:
+        return "Entry total is zero", None, []
+    return None, entry_at, converted
+
+
+def apply_balance_deltas(db: Session, deltas: Dict[int, int]) -> None:
+    """Add the net change in units to each account's balance in one statement."""
+    accounts = Account.__table__
+    # Ascending ids: concurrent posters lock accounts in the same order
+    rows = [(account_id, from_units(delta)) for account_id, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        changes = values(column("id", Integer), column("delta", _AMOUNT_TYPE), name="changes").data(rows)
+        db.execute(
+            update(accounts)
+            .where(accounts.c.id == changes.c.id)
+            .values(balance=func.coalesce(accounts.c.balance, 0) + changes.c.delta, updated_at=func.now())
+        )
+        return
+    # SQLite cannot name VALUES columns in FROM; one executemany instead
+    db.execute(
+        update(accounts)
+        .where(accounts.c.id == bindparam("account_id"))
+        .values(
+            balance=func.coalesce(accounts.c.balance, 0) + bindparam("delta", type_=_AMOUNT_TYPE),
+            updated_at=func.now(),
+        ),
+        [{"account_id": account_id, "delta": delta} for account_id, delta in rows],
+    )
+
+
+class JournalPoster:
+    """Validate and post journal entries in bounded transactions.
+
+    Amounts are checked as integers, so balancing a 200k item batch is
+    integer additions. Each chunk of about `chunk_items` items costs one
+    account lookup, one multi-row INSERT per table and a single UPDATE
+    that adds the net change of every touched account to its balance
+    (debits increase it, credits decrease it). Rejected entries are
+    reported and skipped; chunks already posted stay committed.
+    """
+
+    def __init__(self, db: Session, chunk_items: int = JOURNAL_POSTING_CHUNK_ITEMS):
+        self.db = db
+        self.chunk_items = chunk_items
+        self.total_entries = 0
+        self.posted_entries = 0
+        self.posted_items = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        # Cached reports treat earlier months as final
+        self.closed_before = open_period_start()
+
+    def _reject(self, index: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < JOURNAL_MAX_REPORTED_ERRORS:
+            self.errors.append({"entry": index, "message": message})
+
+    def run(self, entries: Iterable[dict]) -> dict:
+        started = time.perf_counter()
+        chunk, chunk_items = [], 0
+        for entry in entries:
+            index = self.total_entries
+            self.total_entries += 1
+            error, entry_at, items = _validate(entry, self.closed_before)
+            if error:
+                self._reject(index, error)
+                continue
+            chunk.append((index, {**entry, "date": entry_at}, items))
+            chunk_items += len(items)
+            if chunk_items >= self.chunk_items:
+                self._post_chunk(chunk)
+                chunk, chunk_items = [], 0
+        if chunk:
+            self._post_chunk(chunk)
+        elapsed = time.perf_counter() - started
+        return {
+            "total_entries": self.total_entries,
+            "posted_entries": self.posted_entries,
+            "posted_items": self.posted_items,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["entry"]),
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _post_chunk(self, chunk: List[tuple]) -> None:
+        account_ids = {item[0] for _, _, items in chunk for item in items}
+        postable = set(self.db.scalars(
+            select(Account.id).where(Account.id.in_(account_ids), Account.is_group.isnot(True))
+        ))
+        valid = []
+        for index, entry, items in chunk:
+            missing = next((item[0] for item in items if item[0] not in postable), None)
+            if missing is not None:
+                self._reject(index, f"Account {missing} does not exist or is a group account")
+            else:
+                valid.append((index, entry, items))
+        if not valid:
+            # Nothing was written, so nothing to roll back; a rollback here
+            # would also throw away unrelated work pending in the session
+            return
+
+        deltas: Dict[int, int] = defaultdict(int)
+        for _, _, items in valid:
+            for account_id, debit, credit, _ in items:
+                deltas[account_id] += debit - credit
+        try:
+            self._insert(valid)
+            apply_balance_deltas(self.db, deltas)
+            mark_changed(self.db, 'account_totals_stale', self.db.scalars(ancestors_query(deltas)))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.posted_entries += len(valid)
+        self.posted_items += sum(len(items) for _, _, items in valid)
+
+    def _insert(self, valid: List[tuple]) -> None:
+        entries = JournalEntry.__table__
+        entry_ids = self.db.execute(
+            insert(entries).returning(entries.c.id, sort_by_parameter_order=True),
+            [
+                {
+                    "date": entry["date"],
+                    "reference": entry.get("reference"),
+                    "status": "posted",
+                    "total_debit": from_units(sum(item[1] for item in items)),
+                    "total_credit": from_units(sum(item[2] for item in items)),
+                }
+                for _, entry, items in valid
+            ],
+        ).scalars().all()
+        self.db.execute(
+            insert(JournalItem.__table__),
+            [
+                {
+                    "entry_id": entry_id,
+                    "account_id": account_id,
+                    "debit": from_units(debit),
+                    "credit": from_units(credit),
+                    "description": description,
+                }
+                for entry_id, (_, _, items) in zip(entry_ids, valid)
+                for account_id, debit, credit, description in items
+            ],
+        )
+
+
+def post_journal_entries(db: Session, entries: Iterable[dict], chunk_items: int = JOURNAL_POSTING_CHUNK_ITEMS) -> dict:
+    """Post `entries` ({"date", "reference", "items": [{"account_id",
+    "debit", "credit", "description"}]}); see JournalPoster."""
+    return JournalPoster(db, chunk_items).run(entries)
+
+
+def post_draft_entries(db: Session, entry_ids: List[int]) -> dict:
+    """Post existing draft entries in one transaction.
+
+    Totals are summed in the database per entry. Every requested id that
+    isn't posted is returned under "errors": missing and non-draft
+    entries, drafts dated in a closed period, drafts without items,
+    unbalanced ones and ones with items on group or missing accounts.
+    """
+    items = JournalItem.__table__
+    entries = JournalEntry.__table__
+    closed_before = open_period_start()
+    requested = db.execute(
+        select(entries.c.id, entries.c.date, entries.c.status)
+        .where(entries.c.id.in_(entry_ids))
+        .order_by(entries.c.id)
+        .with_for_update()
+    ).all()
+    found = {entry_id: (entry_at, status) for entry_id, entry_at, status in requested}
+    errors, draft_ids = [], []
+    for entry_id in sorted(set(entry_ids)):
+        entry_at, status = found.get(entry_id, (None, None))
+        if entry_id not in found:
+            errors.append({"entry": entry_id, "message": "Entry does not exist"})
+        elif status != "draft":
+            errors.append({"entry": entry_id, "message": f"Entry is {status or 'without a status'}, not a draft"})
+        elif entry_at < closed_before:
+            errors.append({"entry": entry_id, "message": f"Period closed: entries must be dated on or after {closed_before.date()}"})
+        else:
+            draft_ids.append(entry_id)
+    totals = db.execute(
+        select(
+            items.c.entry_id,
+            func.coalesce(func.sum(items.c.debit), 0),
+            func.coalesce(func.sum(items.c.credit), 0),
+            func.count(),
+            func.count(Account.id),
+        )
+        .outerjoin(Account, (Account.id == items.c.account_id) & Account.is_group.isnot(True))
+        .where(items.c.entry_id.in_(draft_ids))
+        .group_by(items.c.entry_id)
+    ).all()
+    # Drafts without items have no totals row
+    with_items = {row[0] for row in totals}
+    errors += [{"entry": entry_id, "message": "Entry has no items"} for entry_id in draft_ids if entry_id not in with_items]
+    balanced, updates = [], []
+    for entry_id, debit, credit, item_count, postable in totals:
+        debit, credit = to_units(debit), to_units(credit)
+        if postable != item_count:
+            errors.append({"entry": entry_id, "message": "Items on group or missing accounts"})
+        elif debit != credit or not debit:
+            errors.append({"entry": entry_id, "message": f"Unbalanced entry: debit {from_units(debit)} != credit {from_units(credit)}"})
+        else:
+            balanced.append(entry_id)
+            updates.append({"entry_id": entry_id, "new_total": from_units(debit)})
+    if balanced:
+        db.execute(
+            update(entries)
+            .where(entries.c.id == bindparam("entry_id"))
+            .values(
+                status="posted",
+                total_debit=bindparam("new_total", type_=_AMOUNT_TYPE),
+                total_credit=bindparam("new_total", type_=_AMOUNT_TYPE),
+                updated_at=func.now(),
+            ),
+            updates,
+        )
+        deltas = db.execute(
+            select(items.c.account_id, func.sum(func.coalesce(items.c.debit, 0) - func.coalesce(items.c.credit, 0)))
+            .where(items.c.entry_id.in_(balanced))
+            .group_by(items.c.account_id)
+        ).all()
+        deltas = {account_id: to_units(delta) for account_id, delta in deltas}
+        apply_balance_deltas(db, deltas)
+        stale = db.scalars(ancestors_query(deltas)).all()
+        mark_changed(db, 'account_totals_stale', stale)
+    return {"posted": balanced, "errors": sorted(errors, key=lambda error: error["entry"])}
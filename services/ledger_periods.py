@@ -0,0 +1,28 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from core.config import settings
+
+
+def month_start(at: datetime) -> datetime:
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def entry_date(value) -> Optional[datetime]:
+    """`value` as the naive UTC datetime stored in JournalEntry.date; None
+    when it isn't a date. Plain dates mean midnight."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return None
+
+
+def open_period_start(now: Optional[datetime] = None) -> datetime:
+    """Start of the earliest month still open for posting (naive UTC);
+    every month before it is closed."""
+    now = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+    start = month_start(now)
+    if now < start + timedelta(days=settings.LEDGER_PERIOD_CLOSE_DAYS):
+        return month_start(start - timedelta(days=1))
+    return start
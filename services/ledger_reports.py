@@ -0,0 +1,275 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.account import Account, JournalEntry, JournalItem
+from services.ledger_periods import entry_date, month_start, open_period_start
+
+Totals = Dict[int, Tuple[Decimal, Decimal]]
+
+
+def next_month(start: datetime) -> datetime:
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def split_periods(date_from: datetime, date_to: datetime, closed_before: datetime):
+    """Whole closed months inside [date_from, date_to), and the remaining
+    ranges (a partial first month, the open period) to compute live."""
+    months = []
+    cursor = date_from if date_from == month_start(date_from) else next_month(month_start(date_from))
+    while next_month(cursor) <= min(date_to, closed_before):
+        months.append(cursor)
+        cursor = next_month(cursor)
+    if not months:
+        return [], [(date_from, date_to)] if date_from < date_to else []
+    live = []
+    if date_from < months[0]:
+        live.append((date_from, months[0]))
+    if cursor < date_to:
+        live.append((cursor, date_to))
+    return months, live
+
+
+def period_totals_query(ranges: List[Tuple[datetime, datetime]], account_id: Optional[int] = None):
+    """Debit and credit per account over posted entries dated in `ranges`."""
+    query = (
+        select(
+            JournalItem.account_id,
+            func.coalesce(func.sum(JournalItem.debit), 0),
+            func.coalesce(func.sum(JournalItem.credit), 0),
+        )
+        .join(JournalEntry, JournalEntry.id == JournalItem.entry_id)
+        .where(
+            JournalEntry.status == "posted",
+            or_(*((JournalEntry.date >= start) & (JournalEntry.date < end) for start, end in ranges)),
+        )
+        .group_by(JournalItem.account_id)
+    )
+    if account_id is not None:
+        query = query.where(JournalItem.account_id == account_id)
+    return query
+
+
+def ledger_lines_query(account_id: int, date_from: datetime, date_to: datetime, opening: Decimal):
+    """Items of one account in date order with a running balance."""
+    net = func.coalesce(JournalItem.debit, 0) - func.coalesce(JournalItem.credit, 0)
+    order = (JournalEntry.date, JournalEntry.id, JournalItem.id)
+    return (
+        select(
+            JournalEntry.id,
+            JournalItem.id,
+            JournalEntry.date,
+            JournalEntry.reference,
+            JournalItem.description,
+            func.coalesce(JournalItem.debit, 0),
+            func.coalesce(JournalItem.credit, 0),
+            (opening + func.sum(net).over(order_by=order)),
+        )
+        .join(JournalEntry, JournalEntry.id == JournalItem.entry_id)
+        .where(
+            JournalItem.account_id == account_id,
+            JournalEntry.status == "posted",
+            JournalEntry.date >= date_from,
+            JournalEntry.date < date_to,
+        )
+        .order_by(*order)
+    )
+
+
+class ClosedPeriodCache:
+    """Debit and credit per account for each closed month.
+
+    Closed months no longer take postings (the posting service rejects
+    them, and so does a flush touching a posted entry in one), so an
+    entry never goes stale; the least recently used months are dropped
+    beyond `max_periods`.
+    """
+
+    def __init__(self, max_periods: Optional[int] = None):
+        self.max_periods = max_periods or settings.LEDGER_PERIOD_CACHE_MAX_PERIODS
+        self._periods: "OrderedDict[datetime, Totals]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, month: datetime) -> Optional[Totals]:
+        with self._lock:
+            totals = self._periods.get(month)
+            if totals is not None:
+                self._periods.move_to_end(month)
+            return totals
+
+    def set(self, month: datetime, totals: Totals) -> None:
+        with self._lock:
+            self._periods[month] = totals
+            self._periods.move_to_end(month)
+            while len(self._periods) > self.max_periods:
+                self._periods.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._periods.clear()
+
+
+closed_period_cache = ClosedPeriodCache()
+
+
+def _attribute_values(instance, name: str) -> list:
+    """Current and previously committed values of an attribute."""
+    history = inspect(instance).attrs[name].load_history()
+    return [*history.added, *history.unchanged, *history.deleted]
+
+
+def _in_closed_period(entry: JournalEntry, closed_before: datetime) -> bool:
+    """Whether `entry` is, or was, a posted entry dated in a closed month."""
+    if "posted" not in _attribute_values(entry, "status"):
+        return False
+    return any(
+        entry_at is not None and entry_at < closed_before
+        for entry_at in map(entry_date, _attribute_values(entry, "date"))
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _reject_closed_period_writes(session, flush_context, instances):
+    """ORM writes to posted entries, or their items, in a closed month
+    would leave `closed_period_cache` stale. Core writes go through the
+    posting service, which checks the period itself."""
+    entries, entry_ids = set(), set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, JournalEntry):
+            entries.add(instance)
+        elif isinstance(instance, JournalItem):
+            # Only an entry already loaded or assigned; ids cover the rest
+            history = inspect(instance).attrs.entry.history
+            entries.update(entry for entry in (*history.added, *history.unchanged, *history.deleted) if entry is not None)
+            entry_ids.update(entry_id for entry_id in _attribute_values(instance, "entry_id") if entry_id is not None)
+    if not entries and not entry_ids:
+        return
+    closed_before = open_period_start()
+    closed = any(_in_closed_period(entry, closed_before) for entry in entries)
+    if not closed and entry_ids:
+        with session.no_autoflush:
+            closed = session.scalar(
+                select(JournalEntry.id).where(
+                    JournalEntry.id.in_(entry_ids),
+                    JournalEntry.status == "posted",
+                    JournalEntry.date < closed_before,
+                ).limit(1)
+            ) is not None
+    if closed:
+        raise ValueError(f"Period closed: posted entries must be dated on or after {closed_before.date()}")
+
+
+async def _first_posting_date(db: AsyncSession) -> Optional[datetime]:
+    return await db.scalar(select(func.min(JournalEntry.date)).where(JournalEntry.status == "posted"))
+
+
+async def get_period_totals(
+    db: AsyncSession,
+    date_from: Optional[datetime],
+    date_to: datetime,
+    account_id: Optional[int] = None,
+) -> Totals:
+    """Debit and credit per account over [date_from, date_to); closed
+    months come from the cache, the rest is one grouped aggregate."""
+    if date_from is None:
+        date_from = await _first_posting_date(db)
+        if date_from is None:
+            return {}
+        date_from = month_start(date_from)
+    months, live = split_periods(date_from, date_to, open_period_start())
+    totals: Dict[int, List[Decimal]] = {}
+
+    def add(rows):
+        for row_account_id, debit, credit in rows:
+            current = totals.setdefault(row_account_id, [Decimal(0), Decimal(0)])
+            current[0] += debit
+            current[1] += credit
+
+    for month in months:
+        cached = closed_period_cache.get(month)
+        if cached is None:
+            rows = (await db.execute(period_totals_query([(month, next_month(month))]))).all()
+            cached = {row_account_id: (debit, credit) for row_account_id, debit, credit in rows}
+            closed_period_cache.set(month, cached)
+        if account_id is not None:
+            add([(account_id, *cached[account_id])] if account_id in cached else [])
+        else:
+            add((row_account_id, debit, credit) for row_account_id, (debit, credit) in cached.items())
+    if live:
+        add((await db.execute(period_totals_query(live, account_id))).all())
+    return {row_account_id: (debit, credit) for row_account_id, (debit, credit) in totals.items()}
+
+
+async def get_trial_balance(db: AsyncSession, date_from: Optional[datetime], date_to: datetime) -> dict:
+    totals = await get_period_totals(db, date_from, date_to)
+    accounts = (await db.execute(
+        select(Account.id, Account.code, Account.name, Account.type).where(Account.id.in_(list(totals)))
+    )).all() if totals else []
+    lines = []
+    for account_id, code, name, account_type in sorted(accounts, key=lambda account: (account.code or "", account.id)):
+        debit, credit = totals[account_id]
+        lines.append({
+            "account_id": account_id,
+            "code": code,
+            "name": name,
+            "type": account_type,
+            "debit": debit,
+            "credit": credit,
+            "balance": debit - credit,
+        })
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "lines": lines,
+        "total_debit": sum((line["debit"] for line in lines), Decimal(0)),
+        "total_credit": sum((line["credit"] for line in lines), Decimal(0)),
+    }
+
+
+async def get_account_ledger(
+    db: AsyncSession,
+    account_id: int,
+    date_from: datetime,
+    date_to: datetime,
+    limit: int,
+    offset: int = 0,
+) -> dict:
+    """Opening balance at `date_from`, the account's items in the range
+    with running balances, and the closing balance at `date_to`."""
+    before = await get_period_totals(db, None, date_from, account_id)
+    opening_debit, opening_credit = before.get(account_id, (Decimal(0), Decimal(0)))
+    opening = opening_debit - opening_credit
+    during = await get_period_totals(db, date_from, date_to, account_id)
+    debit, credit = during.get(account_id, (Decimal(0), Decimal(0)))
+    rows = (await db.execute(
+        ledger_lines_query(account_id, date_from, date_to, opening).limit(limit).offset(offset)
+    )).all()
+    return {
+        "account_id": account_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "opening_balance": opening,
+        "debit": debit,
+        "credit": credit,
+        "closing_balance": opening + debit - credit,
+        "lines": [
+            {
+                "entry_id": entry_id,
+                "item_id": item_id,
+                "date": date,
+                "reference": reference,
+                "description": description,
+                "debit": item_debit,
+                "credit": item_credit,
+                "balance": balance,
+            }
+            for entry_id, item_id, date, reference, description, item_debit, item_credit, balance in rows
+        ],
+    }
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm import Session
+
+from models.channel import Channel
+from models.order import Order, OrderLine
+from services.allocation import deallocate_lines
+
+ORDER_CLEANUP_CHUNK_SIZE = 500
+# Chunks per run; the gap until beat runs the task again is the pause
+# that lets replicas, autovacuum and other writers catch up
+ORDER_CLEANUP_MAX_CHUNKS = 20
+
+EXPIRABLE_STATUS = "UNCONFIRMED"
+EXPIRED_STATUS = "EXPIRED"
+
+
+def _as_column_time(column: InstrumentedAttribute, moment: datetime) -> datetime:
+    """`moment` (aware) in the form `column` stores: aware for timestamptz
+    columns, naive UTC for plain timestamps."""
+    if column.type.timezone:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _run_chunks(
+    db: Session,
+    select_ids: Callable[[int], object],
+    apply: Callable[[List[int]], None],
+    chunk_size: int,
+    budget: List[int],
+) -> int:
+    """Walk matching ids in keyset order, one short transaction per chunk.
+
+    `budget` is a one-item list shared across calls so a run stops after
+    a bounded number of chunks and returns; the next scheduled run picks
+    up where this one left off.
+    """
+    processed, last_id = 0, 0
+    while budget[0] > 0:
+        ids = db.scalars(select_ids(last_id).order_by(Order.id).limit(chunk_size)).all()
+        if not ids:
+            db.rollback()
+            break
+        apply(ids)
+        db.commit()
+        budget[0] -= 1
+        processed += len(ids)
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+    return processed
+
+
+def expire_orders(
+    db: Session,
+    chunk_size: int = ORDER_CLEANUP_CHUNK_SIZE,
+    max_chunks: int = ORDER_CLEANUP_MAX_CHUNKS,
+    now: Optional[datetime] = None,
+) -> Dict[int, int]:
+    """Expire unpaid unconfirmed orders older than their channel's
+    `expire_orders_after` (minutes) and release their stock.
+
+    Returns the number of expired orders per channel.
+    """
+    now = now or datetime.now(timezone.utc)
+    budget = [max_chunks]
+    channels = db.execute(
+        select(Channel.id, Channel.expire_orders_after).where(Channel.expire_orders_after > 0).order_by(Channel.id)
+    ).all()
+    db.rollback()
+    report = {}
+    for channel_id, minutes in channels:
+        cutoff = _as_column_time(Order.created_at, now - timedelta(minutes=minutes))
+
+        def select_ids(last_id, channel_id=channel_id, cutoff=cutoff):
+            return (
+                select(Order.id)
+                .where(
+                    Order.channel_id == channel_id,
+                    Order.status == EXPIRABLE_STATUS,
+                    Order.id > last_id,
+                    Order.charge_status == "NONE",
+                    Order.created_at < cutoff,
+                )
+                # Orders being processed right now are left for the next run
+                .with_for_update(skip_locked=True)
+            )
+
+        def apply(ids):
+            line_ids = db.scalars(select(OrderLine.id).where(OrderLine.order_id.in_(ids))).all()
+            if line_ids:
+                deallocate_lines(db, line_ids)
+            db.execute(
+                update(Order)
+                .where(Order.id.in_(ids))
+                .values(status=EXPIRED_STATUS, expired_at=_as_column_time(Order.expired_at, now))
+                .execution_options(synchronize_session=False)
+            )
+
+        report[channel_id] = _run_chunks(db, select_ids, apply, chunk_size, budget)
+    return report
+
+
+def delete_expired_orders(
+    db: Session,
+    chunk_size: int = ORDER_CLEANUP_CHUNK_SIZE,
+    max_chunks: int = ORDER_CLEANUP_MAX_CHUNKS,
+    now: Optional[datetime] = None,
+) -> Dict[int, int]:
+    """Delete orders expired longer ago than their channel's
+    `delete_expired_orders_after`; lines go with them (ON DELETE CASCADE).
+
+    Returns the number of deleted orders per channel.
+    """
+    now = now or datetime.now(timezone.utc)
+    budget = [max_chunks]
+    channels = db.execute(
+        select(Channel.id, Channel.delete_expired_orders_after)
+        .where(Channel.delete_expired_orders_after.isnot(None))
+        .order_by(Channel.id)
+    ).all()
+    db.rollback()
+    report = {}
+    for channel_id, retention in channels:
+        cutoff = _as_column_time(Order.expired_at, now - retention)
+
+        def select_ids(last_id, channel_id=channel_id, cutoff=cutoff):
+            return (
+                select(Order.id)
+                .where(
+                    Order.channel_id == channel_id,
+                    Order.status == EXPIRED_STATUS,
+                    Order.id > last_id,
+                    Order.expired_at < cutoff,
+                )
+                .with_for_update(skip_locked=True)
+            )
+
+        def apply(ids):
+            db.execute(delete(Order).where(Order.id.in_(ids)).execution_options(synchronize_session=False))
+
+        report[channel_id] = _run_chunks(db, select_ids, apply, chunk_size, budget)
+    return report
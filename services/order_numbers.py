@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import deque
+from typing import List
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.order import Order, order_number_counter, order_number_sequence
+
+ORDER_NUMBER_BLOCK_SIZE = 50
+
+
+class OrderNumberAllocator:
+    """Hand out Order.number values from blocks reserved per process.
+
+    On PostgreSQL a block is `block_size` nextval() calls on
+    order_number_seq in one round trip; sequences never roll back or
+    block, so concurrent checkouts don't wait on each other. Elsewhere
+    (SQLite in tests) a single-row counter table is bumped in its own
+    transaction. Numbers are unique but, across processes, not in
+    creation order; channels that need that take one number at a time
+    (`sequential=True`). Numbers of rolled back orders are skipped.
+    """
+
+    def __init__(self, block_size: int = ORDER_NUMBER_BLOCK_SIZE):
+        self.block_size = block_size
+        self.reset()
+        # A forked worker must not reuse its parent's block
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._numbers = deque()
+
+    def _reserve(self, db: Session, count: int) -> List[int]:
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql":
+            return sorted(db.scalars(
+                select(order_number_sequence.next_value()).select_from(func.generate_series(1, count))
+            ))
+        # Committed on its own so a rolled back order can't hand the
+        # block out twice. Call before writing on SQLite, which only has
+        # one writer at a time.
+        counter = order_number_counter.c
+        while True:
+            try:
+                with bind.engine.begin() as conn:
+                    last = conn.scalar(
+                        update(order_number_counter)
+                        .where(counter.id == 1)
+                        .values(last_value=counter.last_value + count)
+                        .returning(counter.last_value)
+                    )
+                    if last is None:
+                        last = (conn.scalar(select(func.max(Order.number))) or 0) + count
+                        conn.execute(insert(order_number_counter).values(id=1, last_value=last))
+                return list(range(last - count + 1, last + 1))
+            except IntegrityError:
+                # Another process seeded the counter first; bump it instead
+                continue
+
+    def prefetch(self, db: Session, count: int) -> None:
+        """Reserve blocks until at least `count` numbers are on hand.
+
+        The counter fallback reserves in a transaction of its own, which
+        SQLite can't start while the caller's transaction is writing;
+        callers that take numbers after their writes prefetch them first.
+        """
+        with self._lock:
+            while len(self._numbers) < count:
+                self._numbers.extend(self._reserve(db, self.block_size))
+
+    def next_number(self, db: Session, sequential: bool = False) -> int:
+        if sequential:
+            return self._reserve(db, 1)[0]
+        with self._lock:
+            if not self._numbers:
+                self._numbers.extend(self._reserve(db, self.block_size))
+            return self._numbers.popleft()
+
+
+order_number_allocator = OrderNumberAllocator()
+
+
+def next_order_number(db: Session, channel=None) -> int:
+    """Number for a new order of `channel`.
+
+    Channels with `use_sequential_order_numbers` get strictly increasing
+    numbers; the rest come from this process's current block.
+    """
+    sequential = bool(channel is not None and channel.use_sequential_order_numbers)
+    return order_number_allocator.next_number(db, sequential)
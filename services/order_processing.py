@@ -0,0 +1,209 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, exists, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.channel import Channel
+from models.order import Order, OrderLine
+from services.allocation import AllocationLine, allocate_lines
+from services.order_numbers import order_number_allocator
+
+logger = logging.getLogger(__name__)
+
+ORDER_PROCESSING_BATCH_SIZE = 200
+# Failed orders are retried after 1, 2, 4, ... minutes, at most this often
+ORDER_PROCESSING_RETRY_SECONDS = 60
+ORDER_PROCESSING_MAX_ATTEMPTS = 6
+
+PENDING_STATUS = "UNCONFIRMED"
+CONFIRMED_STATUS = "UNFULFILLED"
+
+
+def pending_orders_query(limit: int, order_ids: Optional[Sequence[int]] = None, now: Optional[datetime] = None):
+    """Claim unprocessed orders; rows claimed by another worker are skipped.
+
+    Only orders that have lines, belong to a channel confirming new
+    orders automatically and are not waiting out a retry delay are
+    claimed; orders of other channels wait for staff to confirm them.
+    """
+    now = now or datetime.now(timezone.utc)
+    query = (
+        select(
+            Order.id,
+            Order.number,
+            Order.channel_id,
+            Order.processing_attempts,
+            Order.shipping_price_net_amount,
+            Order.shipping_price_gross_amount,
+        )
+        .where(
+            Order.status == PENDING_STATUS,
+            Order.processed_at.is_(None),
+            Order.processing_attempts < ORDER_PROCESSING_MAX_ATTEMPTS,
+            or_(Order.next_attempt_at.is_(None), Order.next_attempt_at <= now),
+            exists().where(OrderLine.order_id == Order.id),
+            exists().where(Channel.id == Order.channel_id, Channel.automatically_confirm_all_new_orders.isnot(False)),
+        )
+        .order_by(Order.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=Order)
+    )
+    if order_ids is not None:
+        query = query.where(Order.id.in_(order_ids))
+    return query
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Wait before the next try after `attempts` failed ones."""
+    return timedelta(seconds=ORDER_PROCESSING_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def _validate(lines: List[dict]) -> Optional[str]:
+    for line in lines:
+        if line["product_variant_id"] is None:
+            return f"Line {line['id']} has no product variant"
+        if line["quantity"] <= 0:
+            return f"Line {line['id']} has a non-positive quantity"
+    return None
+
+
+def _totals(order, lines: List[dict]) -> Dict[str, Decimal]:
+    net = sum((Decimal(line["unit_price_net_amount"] or 0) * line["quantity"] for line in lines), Decimal(0))
+    gross = sum((Decimal(line["unit_price_gross_amount"] or 0) * line["quantity"] for line in lines), Decimal(0))
+    return {
+        "total_net_amount": net + (order.shipping_price_net_amount or 0),
+        "total_gross_amount": gross + (order.shipping_price_gross_amount or 0),
+    }
+
+
+def process_orders(db: Session, limit: int = ORDER_PROCESSING_BATCH_SIZE, order_ids: Optional[Sequence[int]] = None) -> dict:
+    """Validate, allocate, total and confirm up to `limit` pending orders.
+
+    The orders are claimed with one SELECT ... FOR UPDATE SKIP LOCKED,
+    their lines and channels are loaded with one query each, stock is
+    allocated per channel in a single pass, and the orders are written
+    back with one executemany UPDATE per outcome. Confirmed orders get
+    their number and `processed_at`. Orders that fail validation or
+    can't be fully allocated stay pending with `processing_error`; their
+    `processing_attempts` goes up and `next_attempt_at` is pushed back
+    (see `retry_delay`). Orders reaching ORDER_PROCESSING_MAX_ATTEMPTS
+    are no longer retried (no `next_attempt_at`), counted as
+    "exhausted" and logged as an error for staff to look at. Runs in
+    the caller's transaction.
+    """
+    now = datetime.now(timezone.utc)
+    orders = db.execute(pending_orders_query(limit, order_ids, now)).all()
+    if not orders:
+        return {"processed": 0, "confirmed": 0, "failed": 0, "exhausted": 0}
+    order_ids = [order.id for order in orders]
+
+    lines_by_order: Dict[int, List[dict]] = defaultdict(list)
+    for line in db.execute(
+        select(
+            OrderLine.id,
+            OrderLine.order_id,
+            OrderLine.product_variant_id,
+            OrderLine.quantity,
+            OrderLine.quantity_fulfilled,
+            OrderLine.unit_price_net_amount,
+            OrderLine.unit_price_gross_amount,
+        )
+        .where(OrderLine.order_id.in_(order_ids))
+        .order_by(OrderLine.id)
+    ):
+        lines_by_order[line.order_id].append(dict(line._mapping))
+    sequential_channels = set(db.scalars(
+        select(Channel.id).where(
+            Channel.id.in_({order.channel_id for order in orders}),
+            Channel.use_sequential_order_numbers.is_(True),
+        )
+    ))
+
+    errors: Dict[int, str] = {}
+    to_allocate: Dict[int, List[AllocationLine]] = defaultdict(list)
+    for order in orders:
+        error = _validate(lines_by_order[order.id])
+        if error:
+            errors[order.id] = error
+            continue
+        to_allocate[order.channel_id] += [
+            AllocationLine(order.id, line["id"], line["product_variant_id"], Decimal(line["quantity"] - line["quantity_fulfilled"]))
+            for line in lines_by_order[order.id]
+        ]
+
+    # Block numbers are reserved before the first write (see
+    # OrderNumberAllocator.prefetch) but only handed to orders that pass
+    # allocation, so retried orders don't burn numbers. Sequential
+    # channels take theirs from order_number_seq once allocated.
+    order_number_allocator.prefetch(db, sum(
+        1 for order in orders
+        if order.id not in errors and order.number is None and order.channel_id not in sequential_channels
+    ))
+
+    for channel_id, lines in to_allocate.items():
+        result = allocate_lines(db, channel_id, lines)
+        for order_id, shortages in result.failed_orders.items():
+            errors[order_id] = "Insufficient stock: " + ", ".join(
+                f"variant {item['product_variant_id']} missing {item['missing']}" for item in shortages
+            )
+
+    numbers = {
+        order.id: order.number or order_number_allocator.next_number(db, order.channel_id in sequential_channels)
+        for order in orders
+        if order.id not in errors
+    }
+
+    confirmed, failed, exhausted = [], [], []
+    for order in orders:
+        totals = {f"new_{name}": value for name, value in _totals(order, lines_by_order[order.id]).items()}
+        error = errors.get(order.id)
+        if error is None:
+            confirmed.append({
+                "order_id": order.id,
+                "new_number": numbers[order.id],
+                "new_status": CONFIRMED_STATUS,
+                "new_processed_at": now,
+                "new_processing_error": None,
+                "new_next_attempt_at": None,
+                **totals,
+            })
+        else:
+            attempts = order.processing_attempts + 1
+            if attempts >= ORDER_PROCESSING_MAX_ATTEMPTS:
+                exhausted.append(order.id)
+            failed.append({
+                "order_id": order.id,
+                "new_processing_error": error[:255],
+                "new_processing_attempts": attempts,
+                "new_next_attempt_at": None if attempts >= ORDER_PROCESSING_MAX_ATTEMPTS else now + retry_delay(attempts),
+                **totals,
+            })
+    for rows in (confirmed, failed):
+        if rows:
+            _write_orders(db, rows)
+    if exhausted:
+        logger.error(
+            f"Orders {exhausted} failed processing {ORDER_PROCESSING_MAX_ATTEMPTS} times "
+            f"and need staff attention: {[errors[order_id] for order_id in exhausted]}"
+        )
+    return {
+        "processed": len(orders),
+        "confirmed": len(confirmed),
+        "failed": len(failed),
+        "exhausted": len(exhausted),
+    }
+
+
+def _write_orders(db: Session, rows: List[dict]) -> None:
+    orders_table = Order.__table__
+    columns = [key[len("new_"):] for key in rows[0] if key.startswith("new_")]
+    db.execute(
+        update(orders_table)
+        .where(orders_table.c.id == bindparam("order_id"))
+        .values({column: bindparam(f"new_{column}", type_=orders_table.c[column].type) for column in columns}),
+        rows,
+    )
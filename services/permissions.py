@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.invalidation import invalidate_on_commit
+from models.associations import group_permissions
+from models.group import Group
+from models.permission import ContentType, Permission
+from models.users import User, user_groups, user_user_permissions
+
+PERMISSION_CACHE_TTL_SECONDS = 60
+PERMISSION_CACHE_MAX_ENTRIES = 4096
+
+
+def permission_codename(app_label: str, codename: str) -> str:
+    return f"{app_label}.{codename}"
+
+
+def _permission_columns():
+    return select(ContentType.app_label, Permission.codename).join(
+        ContentType, ContentType.id == Permission.content_type_id
+    )
+
+
+def user_permissions_query(user_id: int):
+    return (
+        _permission_columns()
+        .join(user_user_permissions, user_user_permissions.c.permission_id == Permission.id)
+        .where(user_user_permissions.c.user_id == user_id)
+    )
+
+
+def group_permissions_query(user_id: int):
+    return (
+        _permission_columns()
+        .join(group_permissions, group_permissions.c.permission_id == Permission.id)
+        .join(user_groups, user_groups.c.group_id == group_permissions.c.group_id)
+        .where(user_groups.c.user_id == user_id)
+    )
+
+
+def all_permissions_query(user_id: int):
+    """Direct and group permissions of `user_id` in a single round trip."""
+    return union(user_permissions_query(user_id), group_permissions_query(user_id))
+
+
+def codenames(rows) -> FrozenSet[str]:
+    return frozenset(permission_codename(app_label, codename) for app_label, codename in rows)
+
+
+class PermissionCache:
+    """Compiled permission sets per user id.
+
+    Entries carry two version stamps: a global one bumped when any group,
+    permission or content type commits a change, and a per-user one
+    bumped when the user's own row or memberships change. A stamp
+    mismatch drops the entry at once.
+    """
+
+    def __init__(self, ttl: float = PERMISSION_CACHE_TTL_SECONDS, max_entries: int = PERMISSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._global_version = 0
+        self._user_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, user_id: int) -> Tuple[int, int]:
+        """Stamp to pass to `set()`, taken before reading the database."""
+        with self._lock:
+            return self._global_version, self._user_versions.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[FrozenSet[str]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, versions, permissions = entry
+            current = (self._global_version, self._user_versions.get(user_id, 0))
+            if expires_at < time.monotonic() or versions != current:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return permissions
+
+    def set(self, user_id: int, permissions: FrozenSet[str], versions: Tuple[int, int]) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, versions, permissions)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._global_version += 1
+
+    def invalidate_users(self, *user_ids: int) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+
+permission_cache = PermissionCache()
+
+
+def invalidate_permissions(*user_ids: int) -> None:
+    """Drop cached permission sets; call after Core-level writes to the
+    permission tables. Without `user_ids` every user is invalidated."""
+    if user_ids:
+        permission_cache.invalidate_users(*user_ids)
+    else:
+        permission_cache.invalidate_all()
+
+
+def get_user_permissions(db: Session, user_id: int) -> FrozenSet[str]:
+    """Effective permission codenames (`app_label.codename`) of `user_id`."""
+    permissions = permission_cache.get(user_id)
+    if permissions is None:
+        versions = permission_cache.versions(user_id)
+        permissions = codenames(db.execute(all_permissions_query(user_id)))
+        permission_cache.set(user_id, permissions, versions)
+    return permissions
+
+
+async def get_user_permissions_async(db: AsyncSession, user_id: int) -> FrozenSet[str]:
+    """`get_user_permissions` for async sessions."""
+    permissions = permission_cache.get(user_id)
+    if permissions is None:
+        versions = permission_cache.versions(user_id)
+        permissions = codenames(await db.execute(all_permissions_query(user_id)))
+        permission_cache.set(user_id, permissions, versions)
+    return permissions
+
+
+def _changed_instances(session):
+    return (*session.new, *session.dirty, *session.deleted)
+
+
+def _changed_grants(session):
+    """`{True}` when a flush touched a group, permission or content type."""
+    if any(isinstance(instance, (Group, Permission, ContentType)) for instance in _changed_instances(session)):
+        return {True}
+    return ()
+
+
+def _changed_user_ids(session):
+    return {
+        instance.id for instance in _changed_instances(session)
+        if isinstance(instance, User) and instance.id is not None
+    }
+
+
+invalidate_on_commit('permission_cache_global', lambda changed: permission_cache.invalidate_all(), _changed_grants)
+invalidate_on_commit('permission_cache_users', lambda user_ids: permission_cache.invalidate_users(*user_ids), _changed_user_ids)
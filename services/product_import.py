@@ -0,0 +1,249 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import String, cast, insert, literal, select, union_all
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.counting import invalidate_counts
+from models.categories import Category
+from models.products import Product, ProductVariant
+from models.stock import StockLevel, StockMovement, Warehouse
+from schemas.products import ProductImportError, ProductImportRow
+from services.stock_levels import apply_stock_movements
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decoded lines of a byte stream, without holding more than one chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[dict], Optional[str]]]:
+    async for line in _iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "Each line must be a JSON object"
+            continue
+        yield record, None
+
+
+async def _iter_csv(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[dict], Optional[str]]]:
+    header = None
+    buffered = ""
+    async for line in _iter_lines(stream):
+        # A quoted field may span lines; wait until the quotes balance
+        buffered = f"{buffered}\n{line}" if buffered else line
+        if buffered.count('"') % 2:
+            continue
+        record, buffered = buffered, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not given" so optional fields fall back to defaults
+        yield {name: value for name, value in zip(header, values) if value != ""}, None
+    if buffered:
+        yield None, "Unterminated quoted field"
+
+
+def iter_records(stream: AsyncIterator[bytes], format: str):
+    return _iter_csv(stream) if format == "csv" else _iter_ndjson(stream)
+
+
+def _conflicts_query(names: List[str], skus: List[str], category_ids: List[int], warehouse_ids: List[int]):
+    """Existing names and SKUs, and referenced categories and warehouses
+    that do exist, for a whole chunk in one round trip."""
+    return union_all(
+        select(literal("name"), Product.name).where(Product.name.in_(names)),
+        select(literal("sku"), ProductVariant.sku).where(ProductVariant.sku.in_(skus)),
+        select(literal("category_id"), cast(Category.id, String)).where(Category.id.in_(category_ids)),
+        select(literal("warehouse_id"), cast(Warehouse.id, String)).where(Warehouse.id.in_(warehouse_ids)),
+    )
+
+
+class ProductImporter:
+    """Validate and insert product rows chunk by chunk.
+
+    Each chunk costs one conflict query and one multi-row
+    INSERT ... RETURNING per table, and is committed on its own, so a
+    bad row only rejects itself and a failed chunk doesn't undo the
+    chunks before it.
+    """
+
+    def __init__(self, db: AsyncSession, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.total_rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ProductImportError] = []
+
+    def _reject(self, row: int, message: str, field: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(ProductImportError(row=row, field=field, message=message))
+
+    async def run(self, records) -> dict:
+        started = time.perf_counter()
+        chunk: List[Tuple[int, ProductImportRow]] = []
+        async for record, error in records:
+            self.total_rows += 1
+            if error is not None:
+                self._reject(self.total_rows, error)
+                continue
+            try:
+                chunk.append((self.total_rows, ProductImportRow(**record)))
+            except ValidationError as e:
+                detail = e.errors()[0]
+                self._reject(self.total_rows, detail["msg"], ".".join(str(part) for part in detail["loc"]))
+                continue
+            if len(chunk) >= self.chunk_size:
+                await self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk)
+
+        if self.imported:
+            invalidate_counts(
+                Product.__tablename__, ProductVariant.__tablename__,
+                StockMovement.__tablename__, StockLevel.__tablename__,
+            )
+        elapsed = time.perf_counter() - started
+        self.errors.sort(key=lambda error: error.row)
+        return {
+            "total_rows": self.total_rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.imported / elapsed, 1) if elapsed else 0.0,
+        }
+
+    async def _import_chunk(self, chunk: List[Tuple[int, ProductImportRow]]) -> None:
+        # Duplicates inside the chunk: first occurrence wins
+        seen_names, seen_skus, unique_rows = set(), set(), []
+        for row_number, row in chunk:
+            if row.name in seen_names:
+                self._reject(row_number, f"Duplicate name '{row.name}' in upload", "name")
+            elif row.sku in seen_skus:
+                self._reject(row_number, f"Duplicate SKU '{row.sku}' in upload", "sku")
+            else:
+                seen_names.add(row.name)
+                seen_skus.add(row.sku)
+                unique_rows.append((row_number, row))
+        if not unique_rows:
+            return
+
+        existing: Dict[str, set] = {"name": set(), "sku": set(), "category_id": set(), "warehouse_id": set()}
+        result = await self.db.execute(_conflicts_query(
+            list(seen_names),
+            list(seen_skus),
+            list({row.category_id for _, row in unique_rows}),
+            list({row.warehouse_id for _, row in unique_rows if row.warehouse_id is not None}),
+        ))
+        for kind, value in result:
+            existing[kind].add(value)
+
+        rows = []
+        for row_number, row in unique_rows:
+            if row.name in existing["name"]:
+                self._reject(row_number, f"Product with name '{row.name}' already exists", "name")
+            elif row.sku in existing["sku"]:
+                self._reject(row_number, f"Product variant with SKU '{row.sku}' already exists", "sku")
+            elif str(row.category_id) not in existing["category_id"]:
+                self._reject(row_number, f"Category {row.category_id} does not exist", "category_id")
+            elif row.quantity and row.warehouse_id is None:
+                self._reject(row_number, "A warehouse is required with an initial quantity", "warehouse_id")
+            elif row.warehouse_id is not None and str(row.warehouse_id) not in existing["warehouse_id"]:
+                self._reject(row_number, f"Warehouse {row.warehouse_id} does not exist", "warehouse_id")
+            else:
+                rows.append((row_number, row))
+        if not rows:
+            return
+
+        try:
+            await self._insert(rows)
+            await self.db.commit()
+        except DBAPIError as e:
+            # Lost a race with a concurrent writer, or a value the database
+            # refused (too long, out of range); report the whole chunk
+            await self.db.rollback()
+            for row_number, _ in rows:
+                self._reject(row_number, f"Chunk rejected by the database: {str(e.orig)}")
+            return
+        self.imported += len(rows)
+
+    async def _insert(self, rows: List[Tuple[int, ProductImportRow]]) -> None:
+        products = Product.__table__
+        variants = ProductVariant.__table__
+
+        product_ids = {
+            name: product_id
+            for product_id, name in await self.db.execute(
+                insert(products).returning(products.c.id, products.c.name),
+                [
+                    {
+                        "name": row.name,
+                        "status": row.status.value if row.status else None,
+                        "category_id": row.category_id,
+                        "search_index_dirty": True,
+                    }
+                    for _, row in rows
+                ],
+            )
+        }
+        variant_ids = {
+            sku: variant_id
+            for variant_id, sku in await self.db.execute(
+                insert(variants).returning(variants.c.id, variants.c.sku),
+                [
+                    {
+                        "sku": row.sku,
+                        "name": row.name,
+                        "product_id": product_ids[row.name],
+                        "price_amount": row.price_amount,
+                    }
+                    for _, row in rows
+                ],
+            )
+        }
+        movements = [
+            {
+                "product_variant_id": variant_ids[row.sku],
+                "warehouse_id": row.warehouse_id,
+                "quantity": row.quantity,
+                "type": "in" if row.quantity else "none",
+                "reference": "import",
+            }
+            for _, row in rows
+        ]
+        await self.db.execute(insert(StockMovement.__table__), movements)
+        await apply_stock_movements(self.db, movements)
@@ -0,0 +1,156 @@
+from collections import defaultdict
+from typing import Iterable, List
+
+from sqlalchemy import Text, bindparam, event, func, inspect, literal_column, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.attribute import AssignedProductAttributeValue, AttributeValue
+from models.products import Product, ProductVariant
+
+# "simple" keeps SKUs and brand names intact instead of stemming them
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+SEARCH_INDEX_BATCH_SIZE = 500
+
+
+def search_query(search: str):
+    """tsquery for user input; accepts quotes, `or` and `-term` like a search box."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, search)
+
+
+def _join(values: Iterable[str]) -> str:
+    return " ".join(value for value in values if value)
+
+
+def _weighted(param: str, weight: str):
+    document = func.coalesce(bindparam(param, type_=Text), "")
+    return func.setweight(func.to_tsvector(SEARCH_CONFIG, document), literal_column(f"'{weight}'"))
+
+
+def prepare_search_documents(db: Session, product_ids: List[int]) -> List[dict]:
+    """Collect the searchable text of `product_ids` with one query per source."""
+    products = db.execute(
+        select(Product.id, Product.name, Product.description_plaintext)
+        .where(Product.id.in_(product_ids))
+    ).all()
+
+    skus = defaultdict(list)
+    for product_id, sku in db.execute(
+        select(ProductVariant.product_id, ProductVariant.sku)
+        .where(ProductVariant.product_id.in_(product_ids), ProductVariant.sku.isnot(None))
+    ):
+        skus[product_id].append(sku)
+
+    attribute_values = defaultdict(list)
+    for product_id, value in db.execute(
+        select(AssignedProductAttributeValue.product_id, AttributeValue.name)
+        .join(AttributeValue, AttributeValue.id == AssignedProductAttributeValue.value_id)
+        .where(AssignedProductAttributeValue.product_id.in_(product_ids))
+    ):
+        attribute_values[product_id].append(value)
+
+    documents = []
+    for product_id, name, description in products:
+        # Keys must not collide with products column names, or the UPDATE
+        # would pick them up as extra SET targets.
+        parts = {
+            "name_text": name or "",
+            "sku_text": _join(skus[product_id]),
+            "attribute_text": _join(attribute_values[product_id]),
+            "description_text": description or "",
+        }
+        documents.append({
+            "product_id": product_id,
+            "document": _join(parts.values()).lower(),
+            **parts,
+        })
+    return documents
+
+
+def update_products_search_vector(db: Session, product_ids: List[int]) -> int:
+    """Rebuild search_document/search_vector for `product_ids` and clear their dirty flag.
+
+    The weighted vector ranks name (A) over SKUs (B), attribute values (C)
+    and description (D). All rows are written with one executemany UPDATE.
+    """
+    if not product_ids:
+        return 0
+    documents = prepare_search_documents(db, product_ids)
+    if not documents:
+        return 0
+
+    products = Product.__table__
+    values = {
+        "search_document": bindparam("document"),
+        "search_index_dirty": False,
+        # Reindexing isn't an edit; keep updated_at (and its sort order) as is
+        "updated_at": products.c.updated_at,
+    }
+    if db.get_bind().dialect.name == "postgresql":
+        values["search_vector"] = (
+            _weighted("name_text", "A")
+            .op("||")(_weighted("sku_text", "B"))
+            .op("||")(_weighted("attribute_text", "C"))
+            .op("||")(_weighted("description_text", "D"))
+        )
+    statement = update(products).where(products.c.id == bindparam("product_id")).values(values)
+    db.execute(statement, documents)
+    return len(documents)
+
+
+def update_dirty_products_search_vector(db: Session, batch_size: int = SEARCH_INDEX_BATCH_SIZE) -> int:
+    """Claim one batch of dirty products and reindex them.
+
+    Rows are locked with SKIP LOCKED so several workers can drain the
+    queue in parallel without picking the same products.
+    """
+    product_ids = db.scalars(
+        select(Product.id)
+        .where(Product.search_index_dirty.is_(True))
+        .order_by(Product.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    return update_products_search_vector(db, list(product_ids))
+
+
+def _values(instance, name: str) -> list:
+    """Current and previous values of an attribute in this flush."""
+    history = inspect(instance).attrs[name].history
+    return [*history.added, *history.unchanged, *history.deleted]
+
+
+def _changed(instance, *names: str) -> bool:
+    state = inspect(instance)
+    return state.was_deleted or any(state.attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_products_dirty(session, flush_context):
+    """Flag products whose searchable text changed through the ORM, so
+    the reindex task picks them up; Core writes set the flag themselves."""
+    product_ids, value_ids = set(), set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Product):
+            if instance in session.new or _changed(instance, "name", "description_plaintext"):
+                product_ids.add(instance.id)
+        elif isinstance(instance, ProductVariant):
+            if instance in session.new or _changed(instance, "sku", "product_id"):
+                product_ids.update(_values(instance, "product_id"))
+        elif isinstance(instance, AssignedProductAttributeValue):
+            if instance in session.new or _changed(instance, "value_id", "product_id"):
+                product_ids.update(_values(instance, "product_id"))
+        elif isinstance(instance, AttributeValue) and instance not in session.new and _changed(instance, "name"):
+            value_ids.add(instance.id)
+    product_ids.discard(None)
+    if not product_ids and not value_ids:
+        return
+    products = Product.__table__
+    assigned = (
+        select(AssignedProductAttributeValue.product_id)
+        .where(AssignedProductAttributeValue.value_id.in_(value_ids))
+    )
+    session.connection().execute(
+        update(products)
+        .where(or_(products.c.id.in_(product_ids), products.c.id.in_(assigned)))
+        .values(search_index_dirty=True, updated_at=products.c.updated_at)
+    )
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.upsert import upsert_insert
+from models.stock import StockLevel, StockMovement
+
+STOCK_REBUILD_BATCH_SIZE = 50000
+
+StockKey = Tuple[int, int]
+
+# Signed effect of a movement on on-hand stock. "out" removes stock;
+# "in" adds it, and transfers/adjustments are recorded as signed
+# quantities (a transfer is a negative row at the source warehouse and
+# a positive one at the destination).
+movement_delta = case(
+    (StockMovement.type == "out", -func.coalesce(StockMovement.quantity, 0)),
+    else_=func.coalesce(StockMovement.quantity, 0),
+)
+
+
+def _delta(movement_type, quantity) -> Decimal:
+    if quantity is None:
+        return Decimal(0)
+    return -Decimal(quantity) if movement_type == "out" else Decimal(quantity)
+
+
+def aggregate_deltas(movements: Iterable[dict]) -> Dict[StockKey, Decimal]:
+    """Net quantity change per (variant, warehouse) for movement dicts.
+
+    Movements without a variant or warehouse aren't stock at a location
+    and stay out of the projection.
+    """
+    deltas: Dict[StockKey, Decimal] = defaultdict(Decimal)
+    for movement in movements:
+        variant_id, warehouse_id = movement.get("product_variant_id"), movement.get("warehouse_id")
+        if variant_id is None or warehouse_id is None:
+            continue
+        deltas[(variant_id, warehouse_id)] += _delta(movement.get("type"), movement.get("quantity"))
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def stock_level_upsert(dialect_name: str, deltas: Dict[StockKey, Decimal]):
+    """Statement and parameters that add `deltas` to the stock levels.
+
+    Keys are sorted so concurrent transactions lock stock rows in the
+    same order and can't deadlock on each other.
+    """
+    levels = StockLevel.__table__
+    statement = upsert_insert(levels, dialect_name)
+    statement = statement.on_conflict_do_update(
+        index_elements=[levels.c.product_variant_id, levels.c.warehouse_id],
+        set_={"quantity": levels.c.quantity + statement.excluded.quantity, "updated_at": func.now()},
+    )
+    params = [
+        {"product_variant_id": variant_id, "warehouse_id": warehouse_id, "quantity": delta, "reserved": 0}
+        for (variant_id, warehouse_id), delta in sorted(deltas.items())
+    ]
+    return statement, params
+
+
+async def apply_stock_movements(db: AsyncSession, movements: List[dict]) -> None:
+    """Project movements inserted with Core statements (bulk paths).
+
+    ORM inserts are projected automatically at flush; Core inserts
+    bypass the ORM and must call this in the same transaction.
+    """
+    deltas = aggregate_deltas(movements)
+    if deltas:
+        statement, params = stock_level_upsert(db.get_bind().dialect.name, deltas)
+        await db.execute(statement, params)
+
+
+@event.listens_for(Session, 'after_flush')
+def _project_new_movements(session, flush_context):
+    deltas = aggregate_deltas(
+        {
+            "product_variant_id": instance.product_variant_id,
+            "warehouse_id": instance.warehouse_id,
+            "type": instance.type,
+            "quantity": instance.quantity,
+        }
+        for instance in session.new
+        if isinstance(instance, StockMovement)
+    )
+    if deltas:
+        connection = session.connection()
+        statement, params = stock_level_upsert(connection.dialect.name, deltas)
+        connection.execute(statement, params)
+
+
+def replay_ledger(
+    db: Session, batch_size: int = STOCK_REBUILD_BATCH_SIZE, until_id: Optional[int] = None
+) -> Dict[StockKey, Decimal]:
+    """Expected on-hand quantities, summed from the ledger one id range at a
+    time; only movements up to `until_id` when given."""
+    totals: Dict[StockKey, Decimal] = defaultdict(Decimal)
+    max_id = until_id if until_id is not None else db.scalar(select(func.max(StockMovement.id))) or 0
+    for start in range(0, max_id, batch_size):
+        rows = db.execute(
+            select(StockMovement.product_variant_id, StockMovement.warehouse_id, func.sum(movement_delta))
+            .where(
+                StockMovement.id > start,
+                StockMovement.id <= min(start + batch_size, max_id),
+                StockMovement.product_variant_id.isnot(None),
+                StockMovement.warehouse_id.isnot(None),
+            )
+            .group_by(StockMovement.product_variant_id, StockMovement.warehouse_id)
+        )
+        for variant_id, warehouse_id, delta in rows:
+            totals[(variant_id, warehouse_id)] += Decimal(delta or 0)
+    return totals
+
+
+def _lock_stock_levels(db: Session) -> None:
+    # Movement inserts update stock_levels before they commit, so holding
+    # this lock keeps the ledger still while it is replayed. Reads go on.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stock_levels IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def verify_stock_levels(db: Session, batch_size: int = STOCK_REBUILD_BATCH_SIZE) -> List[dict]:
+    """Compare the projection with a full ledger replay; returns the mismatches."""
+    _lock_stock_levels(db)
+    expected = replay_ledger(db, batch_size)
+    actual = {
+        (variant_id, warehouse_id): quantity
+        for variant_id, warehouse_id, quantity in db.execute(
+            select(StockLevel.product_variant_id, StockLevel.warehouse_id, StockLevel.quantity)
+        )
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        expected_quantity = expected.get(key, Decimal(0))
+        actual_quantity = actual.get(key)
+        if actual_quantity is None and not expected_quantity:
+            continue
+        if actual_quantity is None or Decimal(actual_quantity) != expected_quantity:
+            mismatches.append({
+                "product_variant_id": key[0],
+                "warehouse_id": key[1],
+                "expected": expected_quantity,
+                "actual": actual_quantity,
+            })
+    return mismatches
+
+
+def rebuild_stock_levels(db: Session, batch_size: int = STOCK_REBUILD_BATCH_SIZE) -> int:
+    """Overwrite projected quantities that drifted from the ledger; `reserved` is kept.
+
+    Runs in the caller's transaction; commit to apply. Returns the
+    number of corrected rows.
+    """
+    mismatches = verify_stock_levels(db, batch_size)
+    if not mismatches:
+        return 0
+    levels = StockLevel.__table__
+    statement = upsert_insert(levels, db.get_bind().dialect.name)
+    statement = statement.on_conflict_do_update(
+        index_elements=[levels.c.product_variant_id, levels.c.warehouse_id],
+        set_={"quantity": statement.excluded.quantity, "updated_at": func.now()},
+    )
+    db.execute(statement, [
+        {
+            "product_variant_id": mismatch["product_variant_id"],
+            "warehouse_id": mismatch["warehouse_id"],
+            "quantity": mismatch["expected"],
+            "reserved": 0,
+        }
+        for mismatch in mismatches
+    ])
+    return len(mismatches)
@@ -0,0 +1,256 @@
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.invalidation import invalidate_on_commit
+from models.categories import Category
+from models.channel import Channel
+from models.products import Product, ProductType
+from models.tax import TaxClass, TaxClassCountryRate, TaxConfiguration, TaxConfigurationPerCountry
+
+TAX_RATES_CACHE_TTL_SECONDS = 300
+
+TAX_MODELS = (Channel, TaxClass, TaxClassCountryRate, TaxConfiguration, TaxConfigurationPerCountry)
+
+# TaxConfiguration column defaults, for channels without a configuration
+_DEFAULT_CONFIGURATION = {
+    "charge_taxes": True,
+    "tax_calculation_strategy": None,
+    "display_gross_prices": True,
+    "prices_entered_with_tax": True,
+    "tax_app_id": None,
+}
+
+
+@dataclass(frozen=True)
+class TaxLine:
+    channel_id: int
+    # Destination country; the channel's default country when missing
+    country: Optional[str] = None
+    product_id: Optional[int] = None
+    # Skips the product -> product type -> category lookup when given
+    tax_class_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ResolvedRate:
+    rate: Decimal
+    country: Optional[str]
+    tax_class_id: Optional[int]
+    charge_taxes: bool
+    prices_entered_with_tax: bool
+    display_gross_prices: bool
+    tax_calculation_strategy: Optional[str]
+    tax_app_id: Optional[str]
+
+
+def product_tax_classes_query(product_ids: Sequence[int]):
+    """Tax class per product: its own, else its product type's, else its category's."""
+    return (
+        select(Product.id, func.coalesce(Product.tax_class_id, ProductType.tax_class_id, Category.tax_class_id))
+        .outerjoin(ProductType, ProductType.id == Product.product_type_id)
+        .outerjoin(Category, Category.id == Product.category_id)
+        .where(Product.id.in_(list(product_ids)))
+    )
+
+
+def _tax_tables_queries():
+    """Everything the compiled table is built from, one query per table."""
+    return (
+        select(Channel.id, Channel.default_country),
+        select(
+            TaxConfiguration.id, TaxConfiguration.channel_id, TaxConfiguration.charge_taxes,
+            TaxConfiguration.tax_calculation_strategy, TaxConfiguration.display_gross_prices,
+            TaxConfiguration.prices_entered_with_tax, TaxConfiguration.tax_app_id,
+        ),
+        select(
+            TaxConfigurationPerCountry.tax_configuration_id, TaxConfigurationPerCountry.country,
+            TaxConfigurationPerCountry.charge_taxes, TaxConfigurationPerCountry.tax_calculation_strategy,
+            TaxConfigurationPerCountry.display_gross_prices, TaxConfigurationPerCountry.tax_app_id,
+        ),
+        select(TaxClassCountryRate.country, TaxClassCountryRate.tax_class_id, TaxClassCountryRate.rate),
+    )
+
+
+def tax_stamp_query():
+    """Changes whenever a row of a tax table (or a channel) is added,
+    removed or updated."""
+    return select(*(
+        stamp
+        for model in TAX_MODELS
+        for stamp in (
+            select(func.count(model.id)).scalar_subquery(),
+            select(func.max(model.updated_at)).scalar_subquery(),
+        )
+    ))
+
+
+class TaxRateTable:
+    """Tax settings and rate per (channel, country, tax class), compiled
+    from one pass over the tax tables; keys are resolved on first use."""
+
+    def __init__(self, channels, configurations, exceptions, rates):
+        self.default_countries = {channel_id: country for channel_id, country in channels}
+        self.configurations = {}
+        configuration_channels = {}
+        for configuration_id, channel_id, charge_taxes, strategy, display_gross_prices, prices_entered_with_tax, tax_app_id in configurations:
+            configuration_channels[configuration_id] = channel_id
+            self.configurations[channel_id] = {
+                "charge_taxes": charge_taxes,
+                "tax_calculation_strategy": strategy,
+                "display_gross_prices": display_gross_prices,
+                "prices_entered_with_tax": prices_entered_with_tax,
+                "tax_app_id": tax_app_id,
+            }
+        self.exceptions = {
+            (configuration_channels.get(configuration_id), (country or "").upper()): {
+                "charge_taxes": charge_taxes,
+                "tax_calculation_strategy": strategy,
+                "display_gross_prices": display_gross_prices,
+                "tax_app_id": tax_app_id,
+            }
+            for configuration_id, country, charge_taxes, strategy, display_gross_prices, tax_app_id in exceptions
+        }
+        # A NULL tax class is the country's default rate
+        self.rates = {((country or "").upper(), tax_class_id): rate for country, tax_class_id, rate in rates}
+        self._resolved: Dict[Tuple[int, Optional[str], Optional[int]], ResolvedRate] = {}
+
+    def resolve(self, channel_id: int, country: Optional[str], tax_class_id: Optional[int]) -> ResolvedRate:
+        country = (country or self.default_countries.get(channel_id) or "").upper() or None
+        key = (channel_id, country, tax_class_id)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            settings = dict(_DEFAULT_CONFIGURATION)
+            for overrides in (self.configurations.get(channel_id, {}), self.exceptions.get((channel_id, country), {})):
+                # NULL columns keep the channel's (or the default) value
+                settings.update((name, value) for name, value in overrides.items() if value is not None)
+            rate = Decimal(0)
+            if settings["charge_taxes"] and country:
+                rate = self.rates.get((country, tax_class_id))
+                if rate is None:
+                    rate = self.rates.get((country, None), Decimal(0))
+            resolved = ResolvedRate(rate=rate, country=country, tax_class_id=tax_class_id, **settings)
+            # Plain dict writes are atomic; racing threads compute the same value
+            self._resolved[key] = resolved
+        return resolved
+
+
+class TaxRateCache:
+    """The compiled TaxRateTable of this process.
+
+    Rebuilt only when its version changes: a local version bumped when
+    this process commits a change to any tax table (or a channel), plus
+    the row counts and latest `updated_at` of those tables so other
+    processes' changes are seen on the next request. The TTL catches
+    what the stamp can't see, such as an update committed with an older
+    `updated_at` than the latest one.
+    """
+
+    def __init__(self, ttl: float = TAX_RATES_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._version = 0
+        self._entry: Optional[Tuple[float, tuple, TaxRateTable]] = None
+        self._lock = threading.Lock()
+
+    def version(self, stamp) -> tuple:
+        """Version to pass to `get()` and `set()`, from a `tax_stamp_query` row."""
+        with self._lock:
+            return (self._version, *stamp)
+
+    def get(self, version: tuple) -> Optional[TaxRateTable]:
+        with self._lock:
+            if self._entry is None:
+                return None
+            expires_at, entry_version, table = self._entry
+            if expires_at < time.monotonic() or entry_version != version:
+                self._entry = None
+                return None
+            return table
+
+    def set(self, table: TaxRateTable, version: tuple) -> None:
+        with self._lock:
+            # A commit that landed while the table was read wins
+            if version[0] == self._version:
+                self._entry = (time.monotonic() + self.ttl, version, table)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entry = None
+
+
+tax_rate_cache = TaxRateCache()
+
+
+def invalidate_tax_rates() -> None:
+    """Drop the compiled table; call after Core-level writes to the tax tables."""
+    tax_rate_cache.invalidate()
+
+
+def get_tax_rate_table(db: Session) -> TaxRateTable:
+    version = tax_rate_cache.version(tuple(db.execute(tax_stamp_query()).one()))
+    table = tax_rate_cache.get(version)
+    if table is None:
+        table = TaxRateTable(*(db.execute(query).all() for query in _tax_tables_queries()))
+        tax_rate_cache.set(table, version)
+    return table
+
+
+async def get_tax_rate_table_async(db: AsyncSession) -> TaxRateTable:
+    """`get_tax_rate_table` for async sessions."""
+    version = tax_rate_cache.version(tuple((await db.execute(tax_stamp_query())).one()))
+    table = tax_rate_cache.get(version)
+    if table is None:
+        table = TaxRateTable(*[(await db.execute(query)).all() for query in _tax_tables_queries()])
+        tax_rate_cache.set(table, version)
+    return table
+
+
+def _missing_products(lines: Sequence[TaxLine]) -> List[int]:
+    return list({line.product_id for line in lines if line.tax_class_id is None and line.product_id is not None})
+
+
+def _resolve(table: TaxRateTable, lines: Sequence[TaxLine], product_classes: Dict[int, Optional[int]]) -> List[ResolvedRate]:
+    return [
+        table.resolve(
+            line.channel_id,
+            line.country,
+            line.tax_class_id if line.tax_class_id is not None else product_classes.get(line.product_id),
+        )
+        for line in lines
+    ]
+
+
+def resolve_rates(db: Session, lines: Sequence[TaxLine]) -> List[ResolvedRate]:
+    """Tax rate and settings for each line, in order.
+
+    Costs the stamp query plus at most one query for the product tax
+    classes of the batch; everything else comes from the compiled table.
+    """
+    table = get_tax_rate_table(db)
+    product_ids = _missing_products(lines)
+    product_classes = dict(db.execute(product_tax_classes_query(product_ids)).all()) if product_ids else {}
+    return _resolve(table, lines, product_classes)
+
+
+async def resolve_rates_async(db: AsyncSession, lines: Sequence[TaxLine]) -> List[ResolvedRate]:
+    """`resolve_rates` for async sessions."""
+    table = await get_tax_rate_table_async(db)
+    product_ids = _missing_products(lines)
+    product_classes = dict((await db.execute(product_tax_classes_query(product_ids))).all()) if product_ids else {}
+    return _resolve(table, lines, product_classes)
+
+
+def _tax_changes(session):
+    if any(isinstance(instance, TAX_MODELS) for instance in (*session.new, *session.dirty, *session.deleted)):
+        return {True}
+    return ()
+
+
+invalidate_on_commit('tax_rates_changed', lambda changed: tax_rate_cache.invalidate(), _tax_changes)
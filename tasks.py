@@ -1,6 +1,12 @@
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
+from db.session import SessionLocal
+from services.inventory_snapshots import take_inventory_snapshot
+from services.order_cleanup import delete_expired_orders, expire_orders
+from services.order_processing import ORDER_PROCESSING_BATCH_SIZE, process_orders
+from services.product_search import SEARCH_INDEX_BATCH_SIZE, update_dirty_products_search_vector
+
 logger = get_task_logger(__name__)
 
 @shared_task(bind=True)
@@ -10,6 +16,99 @@ def example(self):
 
 @shared_task(bind=True)
 def process_order(self, order_id):
-    logger.info(f'Processing order {order_id}')
-    # Add your order processing logic here
-    return f'Order {order_id} processed'
\ No newline at end of file
+    """Validate, allocate, total and confirm one pending order."""
+    db = SessionLocal()
+    try:
+        result = process_orders(db, limit=1, order_ids=[order_id])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Processed order {order_id}: {result}')
+    return result
+
+@shared_task(bind=True)
+def process_pending_orders(self, batch_size=ORDER_PROCESSING_BATCH_SIZE, max_batches=20):
+    """Process pending orders in claimed batches, one transaction per batch."""
+    db = SessionLocal()
+    totals = {"processed": 0, "confirmed": 0, "failed": 0, "exhausted": 0}
+    try:
+        for _ in range(max_batches):
+            result = process_orders(db, limit=batch_size)
+            db.commit()
+            for key in totals:
+                totals[key] += result[key]
+            if result["processed"] < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Processed pending orders: {totals}')
+    return totals
+
+@shared_task(bind=True)
+def update_products_search_vector(self, batch_size=SEARCH_INDEX_BATCH_SIZE, max_batches=20):
+    """Reindex products flagged with search_index_dirty, one batch per transaction."""
+    db = SessionLocal()
+    total = 0
+    try:
+        for _ in range(max_batches):
+            updated = update_dirty_products_search_vector(db, batch_size)
+            db.commit()
+            total += updated
+            if updated < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Reindexed {total} products')
+    return total
+
+@shared_task(bind=True)
+def take_inventory_snapshots(self):
+    """Snapshot stock on hand per variant and warehouse for as-of queries."""
+    db = SessionLocal()
+    try:
+        snapshot = take_inventory_snapshot(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Inventory snapshot at {snapshot.taken_at.isoformat()}: {snapshot.line_count} lines')
+    return snapshot.line_count
+
+@shared_task(bind=True)
+def expire_unpaid_orders(self):
+    """Expire abandoned unconfirmed orders per channel.expire_orders_after."""
+    db = SessionLocal()
+    try:
+        report = expire_orders(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Expired {sum(report.values())} orders: {report}')
+    return report
+
+@shared_task(bind=True)
+def purge_expired_orders(self):
+    """Delete expired orders per channel.delete_expired_orders_after."""
+    db = SessionLocal()
+    try:
+        report = delete_expired_orders(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f'Deleted {sum(report.values())} expired orders: {report}')
+    return report
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import select
+
+from models.account import Account, account_closure
+from services.account_tree import ancestors_query
+
+
+def closure(db):
+    return set(db.execute(select(account_closure.c.ancestor_id, account_closure.c.descendant_id, account_closure.c.depth)))
+
+
+def test_branch_added_in_one_flush(db):
+    assets = Account(id=1, name="Assets", is_group=True)
+    db.add_all([Account(id=3, name="Cash", parent_id=2), Account(id=2, name="Current", parent_id=1, is_group=True), assets])
+    db.commit()
+    assert closure(db) == {(1, 1, 0), (2, 2, 0), (3, 3, 0), (1, 2, 1), (2, 3, 1), (1, 3, 2)}
+    assert set(db.scalars(ancestors_query([3]))) == {1, 2, 3}
+
+
+def test_move_keeps_the_subtree_and_rejects_cycles(db):
+    db.add_all([Account(id=1, name="Assets"), Account(id=2, name="Current", parent_id=1), Account(id=3, name="Cash", parent_id=2), Account(id=4, name="Other")])
+    db.commit()
+    db.get(Account, 2).parent_id = 4
+    db.commit()
+    assert closure(db) == {(1, 1, 0), (2, 2, 0), (3, 3, 0), (4, 4, 0), (4, 2, 1), (2, 3, 1), (4, 3, 2)}
+
+    db.get(Account, 4).parent_id = 3
+    with pytest.raises(ValueError):
+        db.flush()
+
+
+@pytest.mark.parametrize("accounts", [
+    [(1, 1)],
+    [(1, 2), (2, 1)],
+    [(1, 3), (2, 1), (3, 2), (4, None)],
+])
+def test_new_accounts_in_a_parent_cycle_are_rejected(db, accounts):
+    db.add_all([Account(id=account_id, name=f"Account {account_id}", parent_id=parent_id) for account_id, parent_id in accounts])
+    with pytest.raises(ValueError, match="parent cycle"):
+        db.flush()
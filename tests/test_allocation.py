@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from services.allocation import PRIORITIZE_HIGH_STOCK, PRIORITIZE_SORTING_ORDER, AllocationLine, plan_allocations
+
+# Warehouse 1 comes first in the channel's sort order, warehouse 2 holds more
+RANKS = {1: 0, 2: 1}
+
+
+def stock(stock_id, warehouse_id, available, variant_id=100):
+    return {"id": stock_id, "warehouse_id": warehouse_id, "product_variant_id": variant_id, "available": Decimal(available)}
+
+
+def line(order_id, line_id, quantity, variant_id=100):
+    return AllocationLine(order_id, line_id, variant_id, Decimal(quantity))
+
+
+def allocated(result):
+    return [(item["order_line_id"], item["stock_level_id"], item["quantity_allocated"]) for item in result.allocations]
+
+
+STOCKS = [stock(11, 1, 3), stock(12, 2, 8)]
+
+
+def test_sorting_order_drains_warehouses_in_rank_order():
+    result = plan_allocations(PRIORITIZE_SORTING_ORDER, RANKS, STOCKS, [line(1, 1, 5)])
+    assert allocated(result) == [(1, 11, 3), (1, 12, 2)]
+    assert result.failed_orders == {}
+
+
+def test_high_stock_starts_with_the_fullest_warehouse():
+    result = plan_allocations(PRIORITIZE_HIGH_STOCK, RANKS, STOCKS, [line(1, 1, 5)])
+    assert allocated(result) == [(1, 12, 5)]
+
+
+def test_high_stock_ties_fall_back_to_rank():
+    stocks = [stock(12, 2, 4), stock(11, 1, 4)]
+    assert allocated(plan_allocations(PRIORITIZE_HIGH_STOCK, RANKS, stocks, [line(1, 1, 2)])) == [(1, 11, 2)]
+
+
+def test_orders_are_all_or_nothing():
+    lines = [
+        line(1, 1, 2),
+        line(1, 2, 1, variant_id=200),  # no stock for variant 200
+        line(2, 3, 10),
+    ]
+    result = plan_allocations(PRIORITIZE_SORTING_ORDER, RANKS, STOCKS, lines)
+    # Order 1 fails as a whole, so order 2 can use all 11 units
+    assert allocated(result) == [(3, 11, 3), (3, 12, 7)]
+    assert result.failed_orders == {
+        1: [{"order_line_id": 2, "product_variant_id": 200, "missing": Decimal(1)}],
+    }
+
+
+def test_orders_compete_for_the_same_stock_in_sequence():
+    lines = [line(1, 1, 6), line(2, 2, 6), line(3, 3, 5)]
+    result = plan_allocations(PRIORITIZE_SORTING_ORDER, RANKS, STOCKS, lines)
+    assert allocated(result) == [(1, 11, 3), (1, 12, 3), (3, 12, 5)]
+    assert result.failed_orders == {2: [{"order_line_id": 2, "product_variant_id": 100, "missing": Decimal(1)}]}
+
+
+def test_lines_of_one_order_share_stock():
+    result = plan_allocations(PRIORITIZE_SORTING_ORDER, RANKS, STOCKS, [line(1, 1, 7), line(1, 2, 4)])
+    assert allocated(result) == [(1, 11, 3), (1, 12, 4), (2, 12, 4)]
+    result = plan_allocations(PRIORITIZE_SORTING_ORDER, RANKS, STOCKS, [line(1, 1, 7), line(1, 2, 5)])
+    assert result.allocations == []
+    assert result.failed_orders[1][0]["missing"] == Decimal(1)
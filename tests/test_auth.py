@@ -0,0 +1,41 @@
+import pytest
+
+from core.security import pwd_context
+
+
+def _bcrypt_works():
+    # passlib 1.7 can't drive bcrypt >= 4.1
+    try:
+        pwd_context.hash("probe")
+    except (ValueError, AttributeError):
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not _bcrypt_works(), reason="passlib cannot use the installed bcrypt")
+
+
+def signup(client, email="ada@example.com", password="correct horse"):
+    return client.post(
+        "/api/auth/signup",
+        json={"email": email, "first_name": "Ada", "last_name": "Lovelace", "password": password},
+    )
+
+
+def test_signup_then_login(client):
+    assert signup(client).status_code == 201
+    response = client.post("/api/auth/login", json={"email": "ada@example.com", "password": "correct horse"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+def test_login_rejects_unknown_user_and_wrong_password(client):
+    signup(client)
+    for email, password in (("nobody@example.com", "correct horse"), ("ada@example.com", "wrong")):
+        response = client.post("/api/auth/login", json={"email": email, "password": password})
+        assert response.status_code == 401
+
+
+def test_signup_rejects_a_taken_email(client):
+    signup(client)
+    assert signup(client).status_code == 400
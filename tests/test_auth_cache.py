@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from jose import jwt
+from sqlalchemy import delete
+
+import core.auth_cache
+from core.auth_cache import PrincipalCache, TokenCache, principal_cache, token_cache
+from core.security import ALGORITHM, SECRET_KEY, TokenData, get_current_active_user, get_current_user
+from models.users import User
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="ada@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+async def current_user(async_db, email="ada@example.com"):
+    return await get_current_active_user(current_user=TokenData(username=email), db=async_db)
+
+
+@pytest.mark.anyio
+async def test_principals_are_served_from_the_cache(db, user, async_db):
+    principal = await current_user(async_db)
+    assert principal.id == user.id and principal.email == user.email
+
+    # A Core delete bypasses the ORM events, so only the cache still knows the user
+    db.execute(delete(User))
+    db.commit()
+    assert await current_user(async_db) == principal
+
+
+@pytest.mark.anyio
+async def test_an_invalidation_during_the_read_keeps_the_stale_row_out():
+    cache = PrincipalCache()
+    generation = cache.generation()
+    cache.invalidate("ada@example.com")
+    await cache.set("ada@example.com", object(), generation)
+    assert await cache.get("ada@example.com") is None
+
+
+@pytest.mark.anyio
+async def test_committed_user_changes_invalidate_the_principal(db, user, async_db):
+    assert (await current_user(async_db)).is_superuser is False
+    user.is_superuser = True
+    db.commit()
+    assert (await current_user(async_db)).is_superuser is True
+
+
+@pytest.mark.anyio
+async def test_email_changes_retire_the_old_subject(db, user, async_db):
+    await current_user(async_db)
+    user.email = "lovelace@example.com"
+    db.commit()
+    assert await principal_cache.get("ada@example.com") is None
+
+
+@pytest.mark.anyio
+async def test_rolled_back_changes_keep_the_principal(db, user, async_db):
+    principal = await current_user(async_db)
+    user.is_superuser = True
+    db.flush()
+    db.rollback()
+    assert await principal_cache.get("ada@example.com") == principal
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.auth_cache.time, "time", clock)
+    return clock
+
+
+def test_tokens_expire_at_their_exp(clock):
+    cache = TokenCache(max_entries=8)
+    cache.set("token", "ada", expires_at=clock.now + 60)
+    clock.now += 59
+    assert cache.get("token") == "ada"
+    clock.now += 1
+    assert cache.get("token") is None
+
+
+def test_expired_tokens_are_not_stored(clock):
+    cache = TokenCache(max_entries=8)
+    cache.set("token", "ada", expires_at=clock.now)
+    assert cache.get("token") is None
+
+
+def test_token_cache_is_bounded_lru(clock):
+    cache = TokenCache(max_entries=2)
+    for token in ("a", "b"):
+        cache.set(token, token, expires_at=clock.now + 60)
+    cache.get("a")
+    cache.set("c", "c", expires_at=clock.now + 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+
+
+@pytest.mark.anyio
+async def test_verified_tokens_are_cached_until_exp(clock):
+    token_cache.clear()
+    token = jwt.encode({"sub": "ada@example.com", "exp": int(clock.now) + 60}, SECRET_KEY, algorithm=ALGORITHM)
+    first = await get_current_user(token)
+    assert await get_current_user(token) is first
+    clock.now += 61
+    assert token_cache.get(token) is None
+    token_cache.clear()
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import select
+
+from models.categories import Category
+from services.category_tree import subtree_ids_query
+
+
+def test_branch_added_in_one_flush_and_moved(db):
+    db.add_all([Category(id=3, name="Mugs", parent_id=2), Category(id=2, name="Kitchen", parent_id=1), Category(id=1, name="Home"), Category(id=4, name="Gifts")])
+    db.commit()
+    assert dict(db.execute(select(Category.id, Category.path)).all()) == {1: "1/", 2: "1/2/", 3: "1/2/3/", 4: "4/"}
+
+    db.get(Category, 2).parent_id = 4
+    db.commit()
+    assert dict(db.execute(select(Category.id, Category.path)).all()) == {1: "1/", 2: "4/2/", 3: "4/2/3/", 4: "4/"}
+    assert set(db.scalars(subtree_ids_query("4/"))) == {2, 3, 4}
+
+    db.get(Category, 4).parent_id = 3
+    with pytest.raises(ValueError):
+        db.flush()
+
+
+@pytest.mark.parametrize("categories", [
+    [(1, 1)],
+    [(1, 2), (2, 1)],
+    [(1, 3), (2, 1), (3, 2), (4, None)],
+])
+def test_new_categories_in_a_parent_cycle_are_rejected(db, categories):
+    db.add_all([Category(id=category_id, name=f"Category {category_id}", parent_id=parent_id) for category_id, parent_id in categories])
+    with pytest.raises(ValueError, match="parent cycle"):
+        db.flush()
+
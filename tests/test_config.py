@@ -0,0 +1,36 @@
+import pytest
+
+from core.config import Settings
+
+
+def settings_for(database_url, replica_url=None):
+    return Settings(
+        DATABASE_URL=database_url,
+        REPLICA_URL=replica_url,
+        ASYNC_DATABASE_URL=None,
+        REDIS_URL="redis://localhost:6379/0",
+        KAFKA_BROKER="localhost:9092",
+    )
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://app:secret@db:5432/shop", "postgresql+asyncpg://app:secret@db:5432/shop"),
+    ("postgresql+psycopg2://app:secret@db/shop", "postgresql+asyncpg://app:secret@db/shop"),
+    ("postgresql://app:p%40ss@db/shop?sslmode=require", "postgresql+asyncpg://app:p%40ss@db/shop?sslmode=require"),
+])
+def test_async_database_url_uses_asyncpg(url, expected):
+    settings = settings_for(url, replica_url=url)
+    assert settings.async_database_url == expected
+    assert settings.async_replica_url == expected
+
+
+def test_async_database_url_override_wins():
+    settings = settings_for("postgresql://app@db/shop")
+    settings.ASYNC_DATABASE_URL = "sqlite+aiosqlite:///test.db"
+    assert settings.async_database_url == "sqlite+aiosqlite:///test.db"
+    assert settings.async_replica_url is None
+
+
+def test_non_postgres_database_url_is_rejected():
+    with pytest.raises(ValueError):
+        settings_for("mysql://app@db/shop")
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import select
+
+from db.counting import CountCache, TotalMode, count_cache, count_total
+from models.categories import Category
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_count_cache():
+    count_cache._entries.clear()
+    yield
+    count_cache._entries.clear()
+
+
+def add_categories(db, *names):
+    db.add_all([Category(name=name) for name in names])
+    db.commit()
+
+
+async def total(async_db, total_mode, search=None):
+    query = select(Category)
+    if search:
+        query = query.where(Category.name.ilike(f"%{search}%"))
+    return await count_total(async_db, query, table="categories", filters={"search": search}, total_mode=total_mode)
+
+
+async def test_exact_count(db, async_db):
+    add_categories(db, "phones", "laptops", "phone cases")
+    assert await total(async_db, TotalMode.EXACT) == 3
+    assert await total(async_db, TotalMode.EXACT, search="phone") == 2
+
+
+async def test_estimate_falls_back_to_exact_off_postgres(db, async_db):
+    add_categories(db, "phones", "laptops")
+    assert await total(async_db, TotalMode.ESTIMATE) == 2
+    assert await total(async_db, TotalMode.ESTIMATE, search="lap") == 1
+
+
+async def test_cached_count_until_a_commit_touches_the_table(db, engine, async_db):
+    add_categories(db, "phones")
+    assert await total(async_db, TotalMode.CACHED) == 1
+
+    # A Core insert bypasses the session events: the cached total stays
+    with engine.begin() as connection:
+        connection.execute(Category.__table__.insert().values(name="laptops"))
+    assert await total(async_db, TotalMode.CACHED) == 1
+    assert await total(async_db, TotalMode.EXACT) == 2
+
+    # An ORM commit on the table drops it
+    add_categories(db, "tablets")
+    assert await total(async_db, TotalMode.CACHED) == 3
+
+
+async def test_cached_counts_are_per_filter(db, async_db):
+    add_categories(db, "phones", "laptops")
+    assert await total(async_db, TotalMode.CACHED, search="phone") == 1
+    assert await total(async_db, TotalMode.CACHED) == 2
+
+
+def test_make_key_skips_empty_filters_and_keeps_values_verbatim():
+    assert CountCache.make_key("products", {"search": " Phone ", "status": None, "category_id": 3}) == (
+        "products", (("category_id", 3), ("search", " Phone ")),
+    )
+    assert CountCache.make_key("products", {"search": ""}) == CountCache.make_key("products", {})
+    assert CountCache.make_key("products", {"search": " phone"}) != CountCache.make_key("products", {"search": "phone"})
+
+
+async def test_cached_counts_differ_for_padded_searches(db, async_db):
+    add_categories(db, "phones", "my phone")
+    assert await total(async_db, TotalMode.CACHED, search="phone") == 2
+    assert await total(async_db, TotalMode.CACHED, search=" phone") == 1
+
+
+def test_entries_expire_and_are_bounded():
+    cache = CountCache(ttl=-1)
+    cache.set(("t", ()), 5)
+    assert cache.get(("t", ())) is None
+
+    cache = CountCache(max_entries=2)
+    for index in range(3):
+        cache.set(("t", (("page", index),)), index)
+    assert cache.get(("t", (("page", 0),))) is None
+    assert cache.get(("t", (("page", 2),))) == 2
+    cache.invalidate("t")
+    assert cache.get(("t", (("page", 2),))) is None
@@ -0,0 +1,58 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from models.customer import Customer
+from schemas.customers import CustomerBulkCreate, CustomerBulkRequest, CustomerBulkUpdate
+from services.customer_bulk import CustomerBulkWriter
+
+
+def create(name, tax_id=None, **fields):
+    return CustomerBulkCreate(customer_name=name, customer_type="company", tax_id=tax_id, **fields)
+
+
+@pytest.mark.parametrize("fields", [
+    {"customer_name": "x" * 256},
+    {"tax_id": "T" * 51},
+    {"phone": "1" * 21},
+    {"industry": "i" * 101},
+    {"credit_limit": "1234567890123456"},
+    {"credit_limit": "1.234"},
+])
+def test_bulk_fields_follow_the_column_sizes(fields):
+    with pytest.raises(ValidationError):
+        CustomerBulkCreate(**{"customer_name": "Acme", "customer_type": "company", **fields})
+    with pytest.raises(ValidationError):
+        CustomerBulkUpdate(id=1, **fields)
+
+
+@pytest.mark.anyio
+async def test_creates_updates_and_upserts(engine, async_db):
+    writer = CustomerBulkWriter(async_db, user_id=None)
+    first = await writer.run(CustomerBulkRequest(creates=[create("Acme", "TX1"), create("Globex")]))
+    assert (first["created"], first["failed"]) == (2, 0)
+    acme_id = first["results"][0]["id"]
+
+    second = await CustomerBulkWriter(async_db, user_id=None).run(CustomerBulkRequest(
+        creates=[create("Acme Inc", "TX1")],
+        updates=[CustomerBulkUpdate(id=acme_id, industry="Retail"), CustomerBulkUpdate(id=999, industry="Retail")],
+    ))
+    assert [(result["status"], result["id"]) for result in second["results"]] == [
+        ("updated", acme_id), ("updated", acme_id), ("error", None),
+    ]
+    assert second["results"][2]["error"] == "Customer not found"
+
+
+@pytest.mark.anyio
+async def test_database_errors_reject_the_chunk(engine, async_db, monkeypatch):
+    async def refuse(self, sent, group, found):
+        raise DBAPIError("INSERT", {}, Exception("value too long for type character varying(255)"))
+
+    monkeypatch.setattr(CustomerBulkWriter, "_write_creates", refuse)
+    result = await CustomerBulkWriter(async_db, user_id=None, chunk_size=2).run(
+        CustomerBulkRequest(creates=[create("Acme"), create("Globex"), create("Initech")])
+    )
+    assert result["failed"] == 3
+    assert all("value too long" in item["error"] for item in result["results"])
+    assert await async_db.scalar(select(func.count(Customer.id))) == 0
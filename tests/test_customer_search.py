@@ -0,0 +1,44 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from models.customer import Customer
+from services.customer_search import apply_customer_search
+
+
+def compiled_search(search):
+    query, rank = apply_customer_search(select(Customer.id), search, "postgresql")
+    return str(query.compile(dialect=postgresql.dialect())), rank
+
+
+def test_long_digit_terms_use_the_normalized_phone():
+    sql, rank = compiled_search("(555) 01")
+    assert "customers.phone_normalized LIKE" in sql
+    assert "customers.phone_number" not in sql
+    assert rank is not None
+
+
+def test_short_digit_terms_keep_a_phone_match():
+    sql, _ = compiled_search("42")
+    assert "customers.phone_normalized" not in sql
+    assert "customers.phone_number ILIKE" in sql
+
+
+def test_terms_without_digits_skip_the_phone():
+    sql, _ = compiled_search("smith")
+    assert "phone" not in sql
+
+
+def test_sqlite_falls_back_to_the_legacy_filter(db):
+    db.add_all([
+        Customer(customer_name="Smith Logistics", customer_type="company", status="active", phone_number="+1 (555) 010-2030"),
+        Customer(customer_name="Garcia Retail", customer_type="company", status="active", phone_number="+1 (555) 999-4242"),
+    ])
+    db.commit()
+    query, rank = apply_customer_search(select(Customer.customer_name), "42", "sqlite")
+    assert rank is None
+    assert db.scalars(query).all() == ["Garcia Retail"]
+
+
+def test_short_terms_are_not_ranked():
+    assert compiled_search("a")[1] is None
+    assert compiled_search("smi")[1] is not None
@@ -0,0 +1,17 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import get_async_db
+from models.customer import Customer
+
+
+@pytest.mark.anyio
+async def test_get_async_db_yields_a_working_async_session(engine):
+    sessions = get_async_db()
+    db = await sessions.__anext__()
+    assert isinstance(db, AsyncSession)
+    db.add(Customer(customer_name="Acme", customer_type="company"))
+    await db.commit()
+    assert await db.scalar(select(func.count(Customer.id))) == 1
+    await sessions.aclose()
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from core.auth_cache import principal_cache
+from core.security import create_access_token
+from db.engines import REPLICA, WRITER, EngineRegistry, InstrumentedQueuePool
+from models.users import User
+
+
+@pytest.fixture
+def registry():
+    registry = EngineRegistry()
+    yield registry
+    registry.dispose()
+
+
+def test_same_role_returns_the_same_engine(registry):
+    engine = registry.get_engine(WRITER)
+    assert registry.get_engine(WRITER) is engine
+    # Without REPLICA_URL the replica role shares the writer's engine
+    assert registry.get_engine(REPLICA) is engine
+    assert registry.get_async_engine(WRITER) is registry.get_async_engine(WRITER)
+    assert registry.get_async_engine(WRITER) is not engine
+
+
+def test_option_engines_are_cached_and_share_the_pool(registry):
+    engine = registry.get_engine(WRITER)
+    allowed = registry.get_engine(WRITER, writer_allowed=True)
+    assert registry.get_engine(WRITER, writer_allowed=True) is allowed
+    assert allowed is not engine
+    assert allowed.pool is engine.pool
+
+
+def test_unknown_roles_are_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.get_engine("analytics")
+
+
+def test_pool_stats_cover_every_created_engine(registry):
+    registry.get_engine(WRITER)
+    [stats] = registry.pool_stats()
+    assert stats["role"] == WRITER
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 0
+
+
+def test_waiting_for_a_connection_is_timed():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0)
+    held = engine.connect()
+
+    def release():
+        time.sleep(0.2)
+        held.close()
+
+    releaser = threading.Thread(target=release)
+    releaser.start()
+    with engine.connect():
+        pass
+    releaser.join()
+
+    stats = engine.pool.wait_stats.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["wait_seconds_max"] >= 0.15
+    assert stats["wait_seconds_total"] >= stats["wait_seconds_max"]
+    engine.dispose()
+
+
+@pytest.mark.parametrize("is_superuser, status_code", [(False, 403), (True, 200)])
+def test_db_pool_endpoint_is_superuser_only(client, db, is_superuser, status_code):
+    db.add(User(email="ops@example.com", hashed_password="x", is_superuser=is_superuser))
+    db.commit()
+    principal_cache.clear()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'ops@example.com'})}"}
+    response = client.get("/api/health/db-pool", headers=headers)
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert "engines" in response.json()
+
+
+def test_db_pool_endpoint_requires_a_token(client):
+    assert client.get("/api/health/db-pool").status_code == 401
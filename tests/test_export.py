@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from models.categories import Category
+from models.customer import Customer
+from models.products import Product
+from schemas.customers import CustomerStatus, CustomerType
+from services.export import stream_export
+
+
+@pytest.fixture
+def customers(db):
+    db.add_all([
+        Customer(customer_name="Zeta Corp", customer_type=CustomerType.COMPANY, status=CustomerStatus.ACTIVE),
+        Customer(customer_name="Ada", customer_type=CustomerType.INDIVIDUAL, status=CustomerStatus.ACTIVE),
+        Customer(customer_name="Acme", customer_type=CustomerType.COMPANY, status=CustomerStatus.LEAD),
+    ])
+    db.commit()
+
+
+@pytest.fixture
+def products(db):
+    db.add_all([Category(id=1, name="Home"), Category(id=2, name="Kitchen", parent_id=1), Category(id=3, name="Garden")])
+    db.add_all([
+        Product(name="Mug", status="available", category_id=2),
+        Product(name="Rake", status="available", category_id=3),
+        Product(name="Plate", status="discontinued", category_id=2),
+        Product(name="Lamp", status="available", category_id=1),
+    ])
+    db.commit()
+
+
+def read_csv(response):
+    return list(csv.reader(io.StringIO(response.text)))
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_customer_csv_has_a_header_and_follows_the_filters(client, auth_headers, customers):
+    response = client.get("/api/customers/export", params={"customer_type": "company"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="customers.csv"' in response.headers["content-disposition"]
+    header, *rows = read_csv(response)
+    assert header[:3] == ["id", "customer_name", "customer_type"]
+    assert [(row[1], row[2]) for row in rows] == [("Zeta Corp", "company"), ("Acme", "company")]
+    assert [int(row[0]) for row in rows] == sorted(int(row[0]) for row in rows)
+
+
+def test_customer_ndjson_follows_the_filters(client, auth_headers, customers):
+    response = client.get("/api/customers/export", params={"format": "ndjson", "status": "active"}, headers=auth_headers)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = read_ndjson(response)
+    assert [record["customer_name"] for record in records] == ["Zeta Corp", "Ada"]
+    assert [record["id"] for record in records] == sorted(record["id"] for record in records)
+
+
+def test_customer_export_needs_a_user(client, customers):
+    assert client.get("/api/customers/export").status_code == 401
+
+
+@pytest.mark.parametrize("path", ["/api/customers/export", "/api/products/export"])
+def test_unknown_formats_are_rejected(client, auth_headers, path):
+    response = client.get(path, params={"format": "xlsx"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unsupported export format 'xlsx'"
+
+
+def test_product_csv_follows_status_and_category(client, products):
+    response = client.get("/api/products/export", params={"status": "available", "category_id": 1})
+    header, *rows = read_csv(response)
+    assert header == ["id", "name", "slug", "status", "category_id", "product_type_id",
+                      "tax_class_id", "rating", "created_at", "updated_at"]
+    assert [(row[1], row[3]) for row in rows] == [("Mug", "available"), ("Lamp", "available")]
+
+
+def test_product_ndjson_is_ordered_by_id(client, products):
+    records = read_ndjson(client.get("/api/products/export", params={"format": "ndjson"}))
+    assert [record["name"] for record in records] == ["Mug", "Rake", "Plate", "Lamp"]
+    assert [record["id"] for record in records] == sorted(record["id"] for record in records)
+
+
+def test_unknown_category_is_a_404(client, products):
+    assert client.get("/api/products/export", params={"category_id": 99}).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_batches_share_one_header(engine, customers):
+    query = select(Customer.id, Customer.customer_name).order_by(Customer.id)
+    chunks = [chunk async for chunk in stream_export(query, "csv", use_writer=True, batch_size=1)]
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == "id,customer_name"
+    assert [line.split(",")[1] for line in lines[1:]] == ["Zeta Corp", "Ada", "Acme"]
+
+
+@pytest.mark.anyio
+async def test_empty_csv_exports_still_have_a_header(engine):
+    query = select(Customer.id, Customer.customer_name)
+    assert [chunk async for chunk in stream_export(query, "csv", use_writer=True)] == [b"id,customer_name\r\n"]
+    assert [chunk async for chunk in stream_export(query, "ndjson", use_writer=True)] == []
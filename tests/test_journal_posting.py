@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from models.account import Account, JournalEntry, JournalItem
+from services.account_tree import get_subtree_balances
+from services.journal_posting import _validate, post_draft_entries, post_journal_entries, to_units
+from services.ledger_periods import open_period_start
+
+
+def items(debit="10.00", credit="10.00"):
+    return [{"account_id": 1, "debit": debit}, {"account_id": 2, "credit": credit}]
+
+
+@pytest.mark.parametrize("value, units", [(None, 0), ("1.5", 1500000), (Decimal("0.000001"), 1), (3, 3000000)])
+def test_to_units(value, units):
+    assert to_units(value) == units
+
+
+@pytest.mark.parametrize("value", ["0.0000001", "abc", [1]])
+def test_to_units_rejects_bad_amounts(value):
+    with pytest.raises(ValueError):
+        to_units(value)
+
+
+def test_validate_normalizes_dates():
+    aware = datetime(2026, 10, 18, 2, 0, tzinfo=timezone(timedelta(hours=3)))
+    assert _validate({"date": aware, "items": items()})[1] == datetime(2026, 10, 17, 23, 0)
+    assert _validate({"date": date(2026, 10, 18), "items": items()})[1] == datetime(2026, 10, 18)
+    error, entry_at, converted = _validate({"date": datetime(2026, 10, 18), "items": items()})
+    assert error is None
+    assert converted == [(1, 10000000, 0, None), (2, 0, 10000000, None)]
+
+
+@pytest.mark.parametrize("entry, message", [
+    ({"items": items()}, "needs a date"),
+    ({"date": "2026-10-18", "items": items()}, "needs a date"),
+    ({"date": datetime(2000, 1, 1), "items": items()}, "Period closed"),
+    ({"date": datetime(2026, 10, 18), "items": items()[:1]}, "at least two items"),
+    ({"date": datetime(2026, 10, 18), "items": items(credit="9.99")}, "Unbalanced"),
+    ({"date": datetime(2026, 10, 18), "items": items("0", "0")}, "total is zero"),
+    ({"date": datetime(2026, 10, 18), "items": items("-1", "-1")}, "must not be negative"),
+])
+def test_validate_rejects(entry, message):
+    error, entry_at, converted = _validate(entry, datetime(2026, 10, 1))
+    assert message in error
+    assert entry_at is None and converted == []
+
+
+def test_post_journal_entries_reports_bad_entries(db):
+    db.add_all([Account(id=1, name="Cash"), Account(id=2, name="Sales")])
+    db.commit()
+    today = datetime.now(timezone.utc)
+    result = post_journal_entries(db, [
+        {"date": today, "items": items()},
+        {"items": items()},
+        {"date": today.date(), "items": items("5", "5")},
+    ])
+    assert result["posted_entries"] == 2
+    assert [error["entry"] for error in result["errors"]] == [1]
+    assert db.get(Account, 1).balance == Decimal(15)
+    assert db.get(Account, 2).balance == Decimal(-15)
+
+
+def test_post_draft_entries_reports_every_unposted_id(db):
+    db.add_all([Account(id=1, name="Cash"), Account(id=2, name="Sales")])
+    entry_at = open_period_start() + timedelta(days=1)
+    db.add_all([
+        JournalEntry(id=1, date=entry_at, status="draft"),
+        JournalEntry(id=2, date=entry_at, status="draft"),
+        JournalEntry(id=3, date=entry_at, status="posted"),
+        JournalEntry(id=4, date=entry_at, status="draft"),
+        JournalItem(entry_id=1, account_id=1, debit=Decimal(5)),
+        JournalItem(entry_id=1, account_id=2, credit=Decimal(5)),
+        JournalItem(entry_id=4, account_id=1, debit=Decimal(5)),
+    ])
+    db.commit()
+    result = post_draft_entries(db, [1, 2, 3, 4, 5])
+    db.commit()
+    assert result["posted"] == [1]
+    assert {error["entry"]: error["message"] for error in result["errors"]} == {
+        2: "Entry has no items",
+        3: "Entry is posted, not a draft",
+        4: "Unbalanced entry: debit 5.000000 != credit 0.000000",
+        5: "Entry does not exist",
+    }
+    assert db.get(JournalEntry, 1).status == "posted"
+    assert db.get(JournalEntry, 2).status == "draft"
+
+
+def test_rejected_chunks_keep_pending_session_work(db):
+    db.add_all([Account(id=1, name="Cash"), Account(id=2, name="Sales")])
+    db.commit()
+    db.add(Account(id=3, name="Rent"))
+    today = datetime.now(timezone.utc)
+    result = post_journal_entries(db, [
+        {"date": today, "items": [{"account_id": 1, "debit": "1"}, {"account_id": 9, "credit": "1"}]},
+    ])
+    assert result["failed"] == 1
+    db.commit()
+    assert db.get(Account, 3).name == "Rent"
+
+
+def test_posting_invalidates_cached_subtree_totals(db):
+    db.add_all([Account(id=10, name="Assets", is_group=True), Account(id=1, name="Cash", parent_id=10), Account(id=2, name="Sales")])
+    db.commit()
+    assert get_subtree_balances(db, [10]) == {10: Decimal(0)}
+    post_journal_entries(db, [{"date": datetime.now(timezone.utc), "items": items()}])
+    assert get_subtree_balances(db, [10]) == {10: Decimal(10)}
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from core.auth_cache import principal_cache
+from models.account import Account, JournalEntry, JournalItem
+from models.users import User
+from services.ledger_periods import open_period_start
+from services.ledger_reports import split_periods
+
+CLOSED = datetime(2000, 1, 15)
+
+
+@pytest.fixture
+def accounts(db):
+    db.add_all([Account(id=1, name="Cash"), Account(id=2, name="Sales")])
+    db.commit()
+
+
+def test_split_periods_keeps_the_open_period_live():
+    months, live = split_periods(datetime(2026, 1, 10), datetime(2026, 5, 1), datetime(2026, 4, 1))
+    assert months == [datetime(2026, 2, 1), datetime(2026, 3, 1)]
+    assert live == [(datetime(2026, 1, 10), datetime(2026, 2, 1)), (datetime(2026, 4, 1), datetime(2026, 5, 1))]
+
+
+def test_open_period_start():
+    assert open_period_start(datetime(2026, 10, 3)) == datetime(2026, 9, 1)
+    assert open_period_start(datetime(2026, 10, 18)) == datetime(2026, 10, 1)
+
+
+def test_posted_entries_in_a_closed_period_are_rejected(db, accounts):
+    db.add(JournalEntry(date=CLOSED, status="posted", items=[JournalItem(account_id=1, debit=Decimal(1))]))
+    with pytest.raises(ValueError, match="Period closed"):
+        db.flush()
+
+
+def test_drafts_in_a_closed_period_can_be_written_but_not_posted(db, accounts):
+    entry = JournalEntry(date=CLOSED, status="draft", items=[JournalItem(account_id=1, debit=Decimal(1))])
+    db.add(entry)
+    db.commit()
+    entry.status = "posted"
+    with pytest.raises(ValueError, match="Period closed"):
+        db.flush()
+
+
+def test_moving_a_posted_entry_out_of_a_closed_period_is_rejected(db, accounts):
+    entry = JournalEntry(date=open_period_start() + timedelta(days=1), status="posted")
+    db.add(entry)
+    db.commit()
+    entry.date = CLOSED
+    with pytest.raises(ValueError, match="Period closed"):
+        db.flush()
+
+
+def test_items_of_closed_posted_entries_are_rejected(db, accounts):
+    entry = JournalEntry(date=open_period_start() + timedelta(days=1), status="posted")
+    db.add(entry)
+    db.commit()
+    # Backdated behind the listener, as a Core write could
+    db.execute(JournalEntry.__table__.update().values(date=CLOSED))
+    db.commit()
+    db.add(JournalItem(entry_id=entry.id, account_id=2, credit=Decimal(1)))
+    with pytest.raises(ValueError, match="Period closed"):
+        db.flush()
+
+
+@pytest.mark.parametrize("path", ["/api/accounting/trial-balance", "/api/accounting/accounts/1/ledger"])
+def test_reports_need_the_ledger_grant(client, auth_headers, db, accounts, path):
+    params = {"date_from": "2026-01-01T00:00:00"}
+    assert client.get(path, params=params).status_code == 401
+    assert client.get(path, params=params, headers=auth_headers).status_code == 403
+
+    db.execute(User.__table__.update().values(is_superuser=True))
+    db.commit()
+    principal_cache.clear()
+    assert client.get(path, params=params, headers=auth_headers).status_code == 200
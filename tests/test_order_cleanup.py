@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from models.channel import Channel
+from models.order import Order, OrderLine
+from models.products import ProductVariant
+from models.stock import Allocation, StockLevel, Warehouse
+from services.order_cleanup import EXPIRABLE_STATUS, EXPIRED_STATUS, delete_expired_orders, expire_orders
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def foreign_keys(engine):
+    # SQLite only cascades deletes with foreign keys switched on
+    event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    engine.dispose()
+
+
+@pytest.fixture
+def shop(db):
+    def channel(slug, expire_after=None, delete_after=timedelta(days=60)):
+        channel = Channel(
+            name=slug, slug=slug, currency_code="USD", default_country="US",
+            expire_orders_after=expire_after, delete_expired_orders_after=delete_after,
+        )
+        db.add(channel)
+        db.commit()
+        return channel.id
+
+    def order(channel_id, age, status=EXPIRABLE_STATUS, charge_status="NONE", expired_age=None):
+        order = Order(
+            channel_id=channel_id, status=status, charge_status=charge_status, created_at=NOW - age,
+            expired_at=(NOW - expired_age).replace(tzinfo=None) if expired_age is not None else None,
+        )
+        db.add(order)
+        db.commit()
+        return order.id
+
+    return channel, order
+
+
+def statuses(db):
+    return dict(db.execute(select(Order.id, Order.status)).all())
+
+
+def test_orders_expire_per_channel_policy(db, shop):
+    channel, order = shop
+    hourly, forever = channel("hourly", expire_after=60), channel("forever")
+    old, fresh, paid, confirmed = (
+        order(hourly, timedelta(hours=2)),
+        order(hourly, timedelta(minutes=30)),
+        order(hourly, timedelta(hours=2), charge_status="FULLY_CHARGED"),
+        order(hourly, timedelta(hours=2), status="UNFULFILLED"),
+    )
+    kept = order(forever, timedelta(days=30))
+
+    assert expire_orders(db, now=NOW) == {hourly: 1}
+    assert statuses(db) == {
+        old: EXPIRED_STATUS, fresh: EXPIRABLE_STATUS, paid: EXPIRABLE_STATUS,
+        confirmed: "UNFULFILLED", kept: EXPIRABLE_STATUS,
+    }
+    assert db.scalar(select(Order.expired_at).where(Order.id == old)) == NOW.replace(tzinfo=None)
+
+
+def test_expiry_releases_allocated_stock(db, shop):
+    channel, order = shop
+    order_id = order(channel("hourly", expire_after=60), timedelta(hours=2))
+    warehouse, variant = Warehouse(name="Main", code="MAIN"), ProductVariant(sku="MUG-1", name="Mug")
+    db.add_all([warehouse, variant])
+    db.flush()
+    level = StockLevel(product_variant_id=variant.id, warehouse_id=warehouse.id, quantity=5, reserved=2)
+    line = OrderLine(order_id=order_id, product_variant_id=variant.id, quantity=2)
+    db.add_all([level, line])
+    db.flush()
+    db.add(Allocation(order_line_id=line.id, stock_level_id=level.id, quantity_allocated=2))
+    db.commit()
+
+    expire_orders(db, now=NOW)
+    assert db.scalar(select(StockLevel.reserved)) == Decimal(0)
+    assert db.scalar(select(func.count()).select_from(Allocation)) == 0
+
+
+def test_purge_follows_retention_and_cascades_to_lines(db, shop, foreign_keys):
+    channel, order = shop
+    monthly, yearly = channel("monthly", delete_after=timedelta(days=30)), channel("yearly", delete_after=timedelta(days=365))
+    purged = order(monthly, timedelta(days=90), status=EXPIRED_STATUS, expired_age=timedelta(days=40))
+    recent = order(monthly, timedelta(days=90), status=EXPIRED_STATUS, expired_age=timedelta(days=10))
+    retained = order(yearly, timedelta(days=90), status=EXPIRED_STATUS, expired_age=timedelta(days=40))
+    db.execute(insert(OrderLine), [{"order_id": order_id, "quantity": 1} for order_id in (purged, recent, retained)])
+    db.commit()
+
+    assert delete_expired_orders(db, now=NOW) == {monthly: 1, yearly: 0}
+    assert set(statuses(db)) == {recent, retained}
+    assert set(db.scalars(select(OrderLine.order_id))) == {recent, retained}
+
+
+def test_runs_stop_after_the_chunk_budget(db, shop):
+    channel, order = shop
+    first, second = channel("first", expire_after=60), channel("second", expire_after=60)
+    for channel_id, count in ((first, 5), (second, 2)):
+        for _ in range(count):
+            order(channel_id, timedelta(hours=2))
+
+    # The budget is shared by every channel of a run
+    assert expire_orders(db, chunk_size=2, max_chunks=2, now=NOW) == {first: 4, second: 0}
+    assert expire_orders(db, chunk_size=2, max_chunks=2, now=NOW) == {first: 1, second: 2}
+    assert expire_orders(db, chunk_size=2, max_chunks=2, now=NOW) == {first: 0, second: 0}
@@ -0,0 +1,97 @@
+import multiprocessing
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from services.order_numbers import OrderNumberAllocator
+
+BLOCK_SIZE = 10
+
+
+def draw(engine, allocator, count, sequential=False):
+    with Session(engine) as db:
+        return [allocator.next_number(db, sequential) for _ in range(count)]
+
+
+def run_threads(target, workers):
+    results = [None] * workers
+    threads = [
+        threading.Thread(target=lambda index=index: results.__setitem__(index, target(index)))
+        for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_threads_share_one_block_without_gaps(engine):
+    allocator = OrderNumberAllocator(BLOCK_SIZE)
+    results = run_threads(lambda _: draw(engine, allocator, 15), workers=8)
+    numbers = [number for result in results for number in result]
+    # 120 numbers are exactly 12 blocks, all handed out
+    assert sorted(numbers) == list(range(1, 121))
+    for result in results:
+        assert result == sorted(result)
+
+
+def test_allocators_in_separate_processes_get_disjoint_blocks(engine):
+    # One allocator per thread behaves like one per process: each
+    # reserves its own blocks from the shared counter
+    results = run_threads(lambda _: draw(engine, OrderNumberAllocator(BLOCK_SIZE), 25), workers=4)
+    numbers = sorted(number for result in results for number in result)
+    assert len(set(numbers)) == len(numbers) == 100
+    for result in results:
+        # Blocks are contiguous; a partly used last block is the only gap
+        blocks = [result[start:start + BLOCK_SIZE] for start in range(0, len(result), BLOCK_SIZE)]
+        for block in blocks:
+            assert block == list(range(block[0], block[0] + len(block)))
+            assert (block[0] - 1) % BLOCK_SIZE == 0
+    assert numbers[-1] <= 4 * 3 * BLOCK_SIZE
+
+
+def test_sequential_numbers_are_unique_and_increasing(engine):
+    allocator = OrderNumberAllocator(BLOCK_SIZE)
+    block = draw(engine, allocator, 1)
+    results = run_threads(lambda _: draw(engine, allocator, 5, sequential=True), workers=4)
+    for result in results:
+        assert result == sorted(result)
+    numbers = sorted(number for result in results for number in result)
+    assert numbers == list(range(BLOCK_SIZE + 1, BLOCK_SIZE + 21))
+    assert block == [1]
+
+
+def _draw_in_child(url, allocator, queue):
+    engine = create_engine(url)
+    try:
+        queue.put(draw(engine, allocator, 3))
+    finally:
+        engine.dispose()
+
+
+def test_forked_children_do_not_reuse_the_parent_block(engine):
+    allocator = OrderNumberAllocator(BLOCK_SIZE)
+    parent = draw(engine, allocator, 2)
+    assert parent == [1, 2]
+    # The parent still holds 3..10; without the fork reset each child
+    # would hand those out again
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    children = [
+        context.Process(target=_draw_in_child, args=(str(engine.url), allocator, queue))
+        for _ in range(3)
+    ]
+    for child in children:
+        child.start()
+    drawn = [queue.get(timeout=30) for _ in children]
+    for child in children:
+        child.join(timeout=30)
+        assert child.exitcode == 0
+    parent += draw(engine, allocator, 8)
+    numbers = parent + [number for result in drawn for number in result]
+    assert len(set(numbers)) == len(numbers)
+    assert parent == list(range(1, 11))
+    for result in drawn:
+        assert result[0] > BLOCK_SIZE and result == list(range(result[0], result[0] + 3))
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from models.associations import channel_warehouses
+from models.channel import Channel
+from models.order import Order, OrderLine
+from models.products import ProductVariant
+from models.stock import StockLevel, Warehouse
+from services.order_processing import (
+    CONFIRMED_STATUS,
+    ORDER_PROCESSING_MAX_ATTEMPTS,
+    PENDING_STATUS,
+    process_orders,
+    retry_delay,
+)
+
+
+@pytest.fixture
+def shop(db):
+    def channel(slug, auto_confirm=True):
+        channel = Channel(
+            name=slug, slug=slug, currency_code="USD", default_country="US",
+            delete_expired_orders_after=timedelta(days=60), automatically_confirm_all_new_orders=auto_confirm,
+        )
+        db.add(channel)
+        db.flush()
+        db.execute(insert(channel_warehouses).values(channel_id=channel.id, warehouse_id=warehouse.id, sort_order=0))
+        return channel.id
+
+    warehouse = Warehouse(name="Main", code="MAIN")
+    variant = ProductVariant(sku="MUG-1", name="Mug")
+    db.add_all([warehouse, variant])
+    db.flush()
+    db.add(StockLevel(product_variant_id=variant.id, warehouse_id=warehouse.id, quantity=5, reserved=0))
+    auto, manual = channel("auto"), channel("manual", auto_confirm=False)
+
+    def order(channel_id=auto, quantity=None):
+        order = Order(channel_id=channel_id)
+        db.add(order)
+        db.flush()
+        if quantity is not None:
+            db.add(OrderLine(
+                order_id=order.id, product_variant_id=variant.id, quantity=quantity,
+                unit_price_net_amount=10, unit_price_gross_amount=12,
+            ))
+        db.commit()
+        return order.id
+
+    return order, manual
+
+
+def state(db, order_id):
+    return db.execute(
+        select(Order.status, Order.number, Order.processed_at, Order.processing_attempts, Order.processing_error)
+        .where(Order.id == order_id)
+    ).one()
+
+
+def test_only_confirmed_orders_are_stamped(db, shop):
+    order, manual = shop
+    confirmed, short, empty, unconfirmed = order(quantity=2), order(quantity=9), order(), order(manual, quantity=1)
+
+    assert process_orders(db) == {"processed": 2, "confirmed": 1, "failed": 1, "exhausted": 0}
+    db.commit()
+
+    status, number, processed_at, attempts, error = state(db, confirmed)
+    assert (status, attempts, error) == (CONFIRMED_STATUS, 0, None)
+    assert number is not None and processed_at is not None
+
+    status, number, processed_at, attempts, error = state(db, short)
+    assert (status, number, processed_at, attempts) == (PENDING_STATUS, None, None, 1)
+    assert error.startswith("Insufficient stock")
+    # Orders without lines and orders of manually confirming channels are left alone
+    for order_id in (empty, unconfirmed):
+        assert state(db, order_id) == (PENDING_STATUS, None, None, 0, None)
+
+
+def test_new_orders_start_pending_and_get_confirmed(db, shop):
+    order, _ = shop
+    order_id = order(quantity=1)
+    assert state(db, order_id).status == PENDING_STATUS
+    process_orders(db)
+    db.commit()
+    assert state(db, order_id).status == CONFIRMED_STATUS
+
+
+def test_orders_failing_allocation_take_no_number(db, shop):
+    order, _ = shop
+    confirmed, short = order(quantity=2), order(quantity=9)
+    process_orders(db)
+    db.commit()
+    assert state(db, short).number is None
+
+    db.execute(update(OrderLine).where(OrderLine.order_id == short).values(quantity=3))
+    db.execute(update(Order).where(Order.id == short).values(next_attempt_at=None))
+    process_orders(db)
+    db.commit()
+    # The retried order takes the number right after the first one
+    assert state(db, short).number == state(db, confirmed).number + 1
+
+
+def test_failed_orders_are_retried_after_a_delay(db, shop):
+    order, _ = shop
+    short = order(quantity=9)
+    assert process_orders(db)["failed"] == 1
+    db.commit()
+    # Still waiting out its delay
+    assert process_orders(db)["processed"] == 0
+
+    def retry_now():
+        db.execute(update(Order).where(Order.id == short).values(next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        db.commit()
+        return process_orders(db, order_ids=[short])
+
+    assert retry_now()["failed"] == 1
+    db.commit()
+    assert state(db, short).processing_attempts == 2
+    db.execute(update(OrderLine).where(OrderLine.order_id == short).values(quantity=4))
+    assert retry_now() == {"processed": 1, "confirmed": 1, "failed": 0, "exhausted": 0}
+    db.commit()
+    assert state(db, short)[:1] == (CONFIRMED_STATUS,)
+    assert state(db, short).processing_error is None
+
+
+def test_orders_stop_being_claimed_after_the_last_attempt(db, shop):
+    order, _ = shop
+    short = order(quantity=9)
+    db.execute(update(Order).where(Order.id == short).values(processing_attempts=ORDER_PROCESSING_MAX_ATTEMPTS))
+    db.commit()
+    assert process_orders(db)["processed"] == 0
+
+
+def test_retry_delay_doubles():
+    assert [retry_delay(attempts).total_seconds() for attempts in (1, 2, 3)] == [60, 120, 240]
+
+
+def test_orders_are_flagged_after_the_last_attempt(db, shop, caplog):
+    order, _ = shop
+    short = order(quantity=9)
+    db.execute(update(Order).where(Order.id == short).values(processing_attempts=ORDER_PROCESSING_MAX_ATTEMPTS - 1))
+    db.commit()
+    with caplog.at_level("ERROR", logger="services.order_processing"):
+        assert process_orders(db)["exhausted"] == 1
+    db.commit()
+    assert state(db, short).processing_attempts == ORDER_PROCESSING_MAX_ATTEMPTS
+    assert db.scalar(select(Order.next_attempt_at).where(Order.id == short)) is None
+    assert f"Orders [{short}] failed processing" in caplog.text
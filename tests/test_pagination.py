@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from db.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate
+from models.categories import Category
+
+pytestmark = pytest.mark.anyio
+
+KEYSET_FIELDS = ("id", "created_at", "updated_at")
+
+
+@pytest.fixture
+def categories(db):
+    start = datetime(2026, 1, 1)
+    # Pairs share created_at so ties have to be broken by id
+    db.add_all([Category(name=f"category {index}", created_at=start + timedelta(minutes=index // 2)) for index in range(25)])
+    db.commit()
+    return db.scalars(select(Category.id)).all()
+
+
+async def walk(async_db, sort_by, sort_order, size):
+    ids, cursor = [], None
+    while True:
+        items, cursor = await paginate(
+            async_db, select(Category), Category, page=1, size=size,
+            sort_by=sort_by, sort_order=sort_order, cursor=cursor, keyset_fields=KEYSET_FIELDS,
+        )
+        ids.extend(item.id for item in items)
+        if cursor is None:
+            return ids
+
+
+async def offset_pages(async_db, sort_by, sort_order, size):
+    ids, page = [], 1
+    while True:
+        items, _ = await paginate(
+            async_db, select(Category), Category, page=page, size=size,
+            sort_by=sort_by, sort_order=sort_order, keyset_fields=KEYSET_FIELDS,
+        )
+        if not items:
+            return ids
+        ids.extend(item.id for item in items)
+        page += 1
+
+
+@pytest.mark.parametrize("sort_by", ["id", "created_at"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_cursor_walk_matches_offset_pages(async_db, categories, sort_by, sort_order):
+    by_cursor = await walk(async_db, sort_by, sort_order, size=4)
+    assert by_cursor == await offset_pages(async_db, sort_by, sort_order, size=4)
+    assert sorted(by_cursor) == sorted(categories)
+
+
+async def test_last_page_has_no_cursor(async_db, categories):
+    items, cursor = await paginate(
+        async_db, select(Category), Category, page=1, size=len(categories),
+        sort_by="id", sort_order="asc", keyset_fields=KEYSET_FIELDS,
+    )
+    assert len(items) == len(categories)
+    assert cursor is None
+
+
+async def test_no_cursor_for_fields_outside_the_keyset(async_db, categories):
+    _, cursor = await paginate(
+        async_db, select(Category), Category, page=1, size=5,
+        sort_by="name", sort_order="asc", keyset_fields=KEYSET_FIELDS,
+    )
+    assert cursor is None
+    with pytest.raises(InvalidCursorError):
+        await paginate(
+            async_db, select(Category), Category, page=1, size=5, sort_by="name", sort_order="asc",
+            cursor=encode_cursor("name", "asc", "category 1", 1), keyset_fields=KEYSET_FIELDS,
+        )
+
+
+async def test_cursor_must_match_the_sort(async_db, categories):
+    _, cursor = await paginate(
+        async_db, select(Category), Category, page=1, size=5,
+        sort_by="id", sort_order="asc", keyset_fields=KEYSET_FIELDS,
+    )
+    with pytest.raises(InvalidCursorError):
+        await paginate(
+            async_db, select(Category), Category, page=1, size=5,
+            sort_by="id", sort_order="desc", cursor=cursor, keyset_fields=KEYSET_FIELDS,
+        )
+
+
+def test_cursor_round_trip():
+    at = datetime(2026, 3, 4, 5, 6, 7)
+    assert decode_cursor(encode_cursor("created_at", "desc", at, 42)) == ("created_at", "desc", at.isoformat(), 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("id", "asc", 1, 1)[:-3], "W10"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
@@ -0,0 +1,100 @@
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from core.auth_cache import UserPrincipal, principal_cache
+from core.security import create_access_token, require_permissions
+from models.group import Group
+from models.permission import ContentType, Permission
+from models.users import User
+from services.permissions import permission_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_permission_cache():
+    permission_cache._entries.clear()
+    yield
+    permission_cache._entries.clear()
+
+
+@pytest.fixture
+def user(db):
+    customers = ContentType(app_label="customers", model="customer")
+    add = Permission(name="Can add customer", codename="add_customer", content_type=customers)
+    delete = Permission(name="Can delete customer", codename="delete_customer", content_type=customers)
+    user = User(email="clerk@example.com", hashed_password="x", user_permissions=[add])
+    db.add_all([user, Group(name="managers", permissions=[delete], users=[user])])
+    db.commit()
+    return user
+
+
+def principal(user, is_superuser=False):
+    return UserPrincipal(
+        id=user.id, uuid=user.uuid, email=user.email, is_active=True,
+        is_superuser=is_superuser, jwt_token_key=user.jwt_token_key,
+    )
+
+
+def test_direct_group_and_all_permissions(user):
+    assert user.get_user_permissions() == {"customers.add_customer"}
+    assert user.get_group_permissions() == {"customers.delete_customer"}
+    assert user.get_all_permissions() == {"customers.add_customer", "customers.delete_customer"}
+    assert user.has_perms(["customers.add_customer", "customers.delete_customer"])
+    assert not user.has_perm("customers.change_customer")
+
+
+def test_detached_user_needs_an_explicit_session(db, user):
+    db.refresh(user)
+    db.expunge(user)
+    with pytest.raises(ValueError):
+        user.get_all_permissions()
+    assert user.has_perm("customers.add_customer", db=db)
+
+
+def test_group_permission_change_invalidates_on_commit(db, user):
+    assert not user.has_perm("customers.change_customer")
+    customers = db.query(ContentType).one()
+    managers = db.query(Group).one()
+    managers.permissions.append(Permission(name="Can change customer", codename="change_customer", content_type=customers))
+    db.commit()
+    assert user.has_perm("customers.change_customer")
+
+
+@pytest.mark.anyio
+async def test_async_variants(user, async_db):
+    assert await user.get_user_permissions_async(async_db) == {"customers.add_customer"}
+    assert await user.get_group_permissions_async(async_db) == {"customers.delete_customer"}
+    assert await user.has_perms_async(async_db, ["customers.add_customer", "customers.delete_customer"])
+    assert not await user.has_perm_async(async_db, "customers.change_customer")
+
+
+@pytest.mark.anyio
+async def test_require_permissions(user, async_db):
+    check = require_permissions("customers.delete_customer", "customers.change_customer")
+    with pytest.raises(HTTPException) as error:
+        await check(current_user=principal(user), db=async_db)
+    assert error.value.status_code == 403
+    assert await check(current_user=principal(user, is_superuser=True), db=async_db)
+    assert await require_permissions("customers.delete_customer")(current_user=principal(user), db=async_db)
+
+
+guarded_app = FastAPI()
+
+
+@guarded_app.delete("/customers/{customer_id}", status_code=204)
+async def delete_customer(customer_id: int, current_user=Depends(require_permissions("customers.delete_customer"))):
+    pass
+
+
+@guarded_app.put("/customers/{customer_id}", status_code=204)
+async def update_customer(customer_id: int, current_user=Depends(require_permissions("customers.change_customer"))):
+    pass
+
+
+def test_routes_reject_users_without_the_grant(user):
+    principal_cache.clear()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+    with TestClient(guarded_app) as client:
+        assert client.put("/customers/1", headers=headers).status_code == 403
+        assert client.delete("/customers/1", headers=headers).status_code == 204
+        assert client.delete("/customers/1").status_code == 401
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from models.categories import Category
+from models.products import Product
+from models.stock import StockLevel, Warehouse
+from services.product_import import ProductImporter, iter_records
+
+
+async def stream(data: bytes, chunk_size: int = 5):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+async def parse(data: bytes, format: str, chunk_size: int = 5):
+    return [record async for record in iter_records(stream(data, chunk_size), format)]
+
+
+@pytest.mark.anyio
+async def test_ndjson_records_and_errors():
+    data = '{"name": "Café", "sku": "A-1"}\r\n\n[1, 2]\n{"name": \n{"name": "Tea", "sku": "B-2"}'.encode()
+    # Chunks of 3 bytes split the two-byte "é"
+    records = await parse(data, "ndjson", chunk_size=3)
+    assert records[0] == ({"name": "Café", "sku": "A-1"}, None)
+    assert records[1] == (None, "Each line must be a JSON object")
+    assert records[2][0] is None and records[2][1].startswith("Invalid JSON")
+    assert records[3] == ({"name": "Tea", "sku": "B-2"}, None)
+    assert len(records) == 4
+
+
+@pytest.mark.anyio
+async def test_csv_header_quoted_newlines_and_empty_cells():
+    data = '﻿name, sku ,quantity\r\n"Mug, large",M-1,\n"Two\nlines",T-2,5\nshort\n'.encode()
+    assert await parse(data, "csv") == [
+        ({"name": "Mug, large", "sku": "M-1"}, None),
+        ({"name": "Two\nlines", "sku": "T-2", "quantity": "5"}, None),
+        (None, "Expected 3 columns, got 1"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_csv_unterminated_quote():
+    assert await parse(b'name,sku\n"open,X-1\n', "csv") == [(None, "Unterminated quoted field")]
+
+
+@pytest.fixture
+def catalog(db):
+    category = Category(name="Kitchen", slug="kitchen")
+    warehouse = Warehouse(name="Main", code="MAIN")
+    db.add_all([category, warehouse])
+    db.commit()
+    return category.id, warehouse.id
+
+
+def ndjson(*rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+@pytest.mark.anyio
+async def test_import_reports_rejected_rows(catalog, async_db):
+    category_id, warehouse_id = catalog
+    data = ndjson(
+        {"name": "Mug", "sku": "M-1", "category_id": category_id, "quantity": "5", "warehouse_id": warehouse_id},
+        {"name": "Mug", "sku": "M-2", "category_id": category_id},
+        {"name": "Bowl", "sku": "B-1", "category_id": category_id, "quantity": "3"},
+        {"name": "Plate", "sku": "P-1", "category_id": 999},
+        {"name": "Cup", "sku": "C-1"},
+    )
+    result = await ProductImporter(async_db, chunk_size=2).run(iter_records(stream(data, 64), "ndjson"))
+
+    assert (result["total_rows"], result["imported"], result["failed"]) == (5, 1, 4)
+    assert [(error.row, error.field) for error in result["errors"]] == [
+        (2, "name"), (3, "warehouse_id"), (4, "category_id"), (5, "category_id"),
+    ]
+    assert await async_db.scalar(select(StockLevel.quantity).where(StockLevel.warehouse_id == warehouse_id)) == 5
+
+
+@pytest.mark.anyio
+async def test_database_errors_reject_the_chunk(catalog, async_db, monkeypatch):
+    category_id, _ = catalog
+
+    async def refuse(self, rows):
+        raise DBAPIError("INSERT", {}, Exception("value too long for type character varying(255)"))
+
+    monkeypatch.setattr(ProductImporter, "_insert", refuse)
+    data = ndjson(*({"name": f"Item {index}", "sku": f"I-{index}", "category_id": category_id} for index in range(3)))
+    result = await ProductImporter(async_db).run(iter_records(stream(data, 64), "ndjson"))
+
+    assert (result["imported"], result["failed"], result["rows_per_second"]) == (0, 3, 0.0)
+    assert all("value too long" in error.message for error in result["errors"])
+    assert await async_db.scalar(select(func.count(Product.id))) == 0
@@ -0,0 +1,53 @@
+from models.attribute import AssignedProductAttributeValue, Attribute, AttributeValue
+from models.products import Product, ProductVariant
+from services.product_search import update_dirty_products_search_vector
+
+
+def reindex(db):
+    update_dirty_products_search_vector(db)
+    db.commit()
+
+
+def document(db, product_id):
+    db.expire_all()
+    product = db.get(Product, product_id)
+    return product.search_document, product.search_index_dirty
+
+
+def test_orm_edits_keep_the_search_document_current(db):
+    color = Attribute(name="Color", slug="color", input_type="dropdown")
+    red = AttributeValue(name="Red", attribute=color)
+    product = Product(name="Mug")
+    db.add_all([color, red, product])
+    db.flush()
+    variant = ProductVariant(product_id=product.id, sku="MUG-1", name="Mug")
+    db.add_all([variant, AssignedProductAttributeValue(product_id=product.id, value=red)])
+    db.commit()
+    reindex(db)
+    assert document(db, product.id) == ("mug mug-1 red", False)
+
+    db.get(ProductVariant, variant.id).sku = "MUG-2"
+    db.commit()
+    assert document(db, product.id)[1] is True
+    reindex(db)
+    assert document(db, product.id) == ("mug mug-2 red", False)
+
+    db.get(AttributeValue, red.id).name = "Crimson"
+    db.commit()
+    reindex(db)
+    assert document(db, product.id) == ("mug mug-2 crimson", False)
+
+    db.get(Product, product.id).name = "Cup"
+    db.commit()
+    reindex(db)
+    assert document(db, product.id) == ("cup mug-2 crimson", False)
+
+
+def test_unrelated_edits_leave_the_flag_alone(db):
+    product = Product(name="Mug")
+    db.add(product)
+    db.commit()
+    reindex(db)
+    db.get(Product, product.id).status = "available"
+    db.commit()
+    assert document(db, product.id)[1] is False
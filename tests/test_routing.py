@@ -0,0 +1,108 @@
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import api.deps
+import db.connection
+from api.deps import WRITER_STICKY_COOKIE, get_routed_db
+from db.engines import REPLICA
+from models.customer import Customer
+
+app = FastAPI()
+
+
+@app.get("/role")
+async def read_role(db: AsyncSession = Depends(get_routed_db)):
+    return {"role": db.sync_session.info["db_role"]}
+
+
+@app.post("/customers")
+async def write_customer(valid: bool = True, db: AsyncSession = Depends(get_routed_db)):
+    db.add(Customer(customer_name="Acme", customer_type="company" if valid else None))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return {"role": db.sync_session.info["db_role"], "saved": False}
+    return {"role": db.sync_session.info["db_role"], "saved": True}
+
+
+@pytest.fixture
+async def replica(engine, monkeypatch):
+    """A usable replica session factory on the test database."""
+    replica_engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"])
+    monkeypatch.setattr(db.connection, "AsyncReplicaSession", async_sessionmaker(
+        replica_engine, expire_on_commit=False, info={"db_role": REPLICA, "read_only": True},
+    ))
+    lag = {"seconds": 0.0}
+
+    async def get_replica_lag():
+        return lag["seconds"]
+
+    monkeypatch.setattr(db.connection, "get_replica_lag", get_replica_lag)
+    yield lag
+    await replica_engine.dispose()
+
+
+@pytest.fixture
+def client(replica):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_the_replica(client):
+    assert client.get("/role").json() == {"role": "replica"}
+
+
+@pytest.mark.anyio
+async def test_writes_go_to_the_writer_and_pin_reads_after_commit(client):
+    response = client.post("/customers")
+    assert response.json() == {"role": "writer", "saved": True}
+    assert WRITER_STICKY_COOKIE in response.cookies
+    assert client.get("/role").json() == {"role": "writer"}
+
+
+@pytest.mark.anyio
+async def test_failed_writes_do_not_pin(client):
+    response = client.post("/customers", params={"valid": False})
+    assert response.json() == {"role": "writer", "saved": False}
+    assert WRITER_STICKY_COOKIE not in response.cookies
+    assert client.get("/role").json() == {"role": "replica"}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("lag, role", [(0.5, "replica"), (60.0, "writer"), (None, "writer")])
+async def test_lagging_replica_falls_back_to_the_writer(client, replica, lag, role):
+    replica["seconds"] = lag
+    assert client.get("/role").json() == {"role": role}
+
+
+@pytest.mark.anyio
+async def test_replica_lag_is_sampled_at_most_once_per_interval(monkeypatch):
+    queries = []
+
+    class Connection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalar(self, query):
+            queries.append(query)
+            return 1.5
+
+    class Engine:
+        def connect(self):
+            return Connection()
+
+    monkeypatch.setattr(db.connection, "get_async_engine", lambda role: Engine())
+    monkeypatch.setattr(db.connection, "_replica_lag", {"checked_at": 0.0, "seconds": None})
+    assert await db.connection.get_replica_lag() == 1.5
+    assert await db.connection.get_replica_lag() == 1.5
+    assert len(queries) == 1
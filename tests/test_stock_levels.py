@@ -0,0 +1,134 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from api.private.stock import AVAILABILITY_MAX_VARIANTS
+from models.products import ProductVariant
+from models.stock import StockLevel, StockMovement, Warehouse
+from services.stock_levels import apply_stock_movements, rebuild_stock_levels, replay_ledger, verify_stock_levels
+
+
+@pytest.fixture
+def stock(db):
+    warehouses = [Warehouse(name="Main", code="MAIN"), Warehouse(name="Annex", code="ANNEX")]
+    variants = [ProductVariant(sku="MUG-1", name="Mug"), ProductVariant(sku="CUP-1", name="Cup")]
+    db.add_all([*warehouses, *variants])
+    db.commit()
+    return [variant.id for variant in variants], [warehouse.id for warehouse in warehouses]
+
+
+def movement(variant_id, warehouse_id, quantity, type="in"):
+    return StockMovement(product_variant_id=variant_id, warehouse_id=warehouse_id, quantity=Decimal(quantity), type=type)
+
+
+def levels(db):
+    return {
+        (variant_id, warehouse_id): quantity
+        for variant_id, warehouse_id, quantity in db.execute(
+            select(StockLevel.product_variant_id, StockLevel.warehouse_id, StockLevel.quantity)
+        )
+    }
+
+
+def test_orm_movements_are_projected_at_flush(db, stock):
+    (mug, cup), (main, annex) = stock
+    db.add_all([movement(mug, main, 10), movement(mug, main, 4, type="out"), movement(cup, annex, 2)])
+    db.flush()
+    assert levels(db) == {(mug, main): 6, (cup, annex): 2}
+
+    # A transfer is a negative row at the source and a positive one at the destination
+    db.add_all([movement(mug, main, -5, type="transfer"), movement(mug, annex, 5, type="transfer")])
+    # Movements without a location stay out of the projection
+    db.add(StockMovement(product_variant_id=mug, quantity=Decimal(3), type="in"))
+    db.commit()
+    assert levels(db) == {(mug, main): 1, (mug, annex): 5, (cup, annex): 2}
+
+
+def test_rolled_back_movements_leave_no_stock(db, stock):
+    (mug, _), (main, _) = stock
+    db.add(movement(mug, main, 10))
+    db.flush()
+    db.rollback()
+    assert levels(db) == {}
+
+
+@pytest.mark.anyio
+async def test_core_inserts_are_projected_explicitly(db, async_db, stock):
+    (mug, _), (main, _) = stock
+    rows = [
+        {"product_variant_id": mug, "warehouse_id": main, "quantity": Decimal(7), "type": "in"},
+        {"product_variant_id": mug, "warehouse_id": main, "quantity": Decimal(2), "type": "out"},
+    ]
+    await async_db.execute(StockMovement.__table__.insert(), rows)
+    await apply_stock_movements(async_db, rows)
+    await async_db.commit()
+    assert levels(db) == {(mug, main): 5}
+
+
+def test_replay_reads_the_ledger_in_id_ranges(db, stock):
+    (mug, cup), (main, _) = stock
+    db.add_all([movement(mug, main, 10), movement(cup, main, 3), movement(mug, main, 4, type="out")])
+    db.commit()
+    assert replay_ledger(db, batch_size=1) == {(mug, main): 6, (cup, main): 3}
+    first_id = db.scalar(select(StockMovement.id).order_by(StockMovement.id))
+    assert replay_ledger(db, batch_size=1, until_id=first_id) == {(mug, main): 10}
+
+
+def test_verify_and_rebuild_repair_drifted_levels(db, stock):
+    (mug, cup), (main, annex) = stock
+    db.add_all([movement(mug, main, 10), movement(cup, annex, 3)])
+    db.commit()
+    assert verify_stock_levels(db) == []
+
+    db.execute(update(StockLevel).where(StockLevel.product_variant_id == mug).values(quantity=8, reserved=2))
+    db.execute(delete(StockLevel).where(StockLevel.product_variant_id == cup))
+    db.commit()
+    assert verify_stock_levels(db, batch_size=1) == [
+        {"product_variant_id": mug, "warehouse_id": main, "expected": Decimal(10), "actual": Decimal(8)},
+        {"product_variant_id": cup, "warehouse_id": annex, "expected": Decimal(3), "actual": None},
+    ]
+
+    assert rebuild_stock_levels(db) == 2
+    db.commit()
+    assert verify_stock_levels(db) == []
+    assert db.scalar(select(StockLevel.reserved).where(StockLevel.product_variant_id == mug)) == 2
+
+
+def totals(row):
+    return tuple(Decimal(row[field]) for field in ("quantity", "reserved", "available"))
+
+
+def test_availability_sums_warehouses_and_zero_fills(client, auth_headers, db, stock):
+    (mug, cup), (main, annex) = stock
+    db.add_all([movement(mug, main, 10), movement(mug, annex, 5)])
+    db.commit()
+    db.execute(update(StockLevel).where(StockLevel.warehouse_id == main).values(reserved=4))
+    db.commit()
+
+    response = client.get("/api/stock/availability", params={"variant_ids": [cup, mug, cup]}, headers=auth_headers)
+    assert response.status_code == 200
+    cup_row, mug_row = response.json()
+    assert cup_row["product_variant_id"] == cup and cup_row["warehouses"] == []
+    assert totals(cup_row) == (0, 0, 0)
+    assert totals(mug_row) == (15, 4, 11)
+    assert [warehouse["warehouse_id"] for warehouse in mug_row["warehouses"]] == sorted([main, annex])
+
+    response = client.get(
+        "/api/stock/availability", params={"variant_ids": [mug], "warehouse_ids": [annex]}, headers=auth_headers
+    )
+    [mug_row] = response.json()
+    assert totals(mug_row) == (5, 0, 5)
+
+
+def test_availability_caps_the_variant_count(client, auth_headers):
+    params = {"variant_ids": list(range(1, AVAILABILITY_MAX_VARIANTS + 2))}
+    response = client.get("/api/stock/availability", params=params, headers=auth_headers)
+    assert response.status_code == 400
+    # Repeated ids count once
+    params = {"variant_ids": [1] * (AVAILABILITY_MAX_VARIANTS + 1)}
+    assert client.get("/api/stock/availability", params=params, headers=auth_headers).status_code == 200
+
+
+def test_availability_needs_a_user(client):
+    assert client.get("/api/stock/availability", params={"variant_ids": [1]}).status_code == 401
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, update
+
+from models.channel import Channel
+from models.tax import TaxClassCountryRate
+from services.tax_rates import TaxRateTable, get_tax_rate_table, tax_rate_cache
+
+
+def table():
+    return TaxRateTable(
+        channels=[(1, "US"), (2, "DE"), (3, None)],
+        configurations=[(10, 1, True, "FLAT_RATES", False, False, None)],
+        exceptions=[(10, "gb", False, None, None, None), (10, "DE", None, None, True, "app")],
+        rates=[("us", 5, Decimal("0.08")), ("US", None, Decimal("0.05")), ("DE", None, Decimal("0.19"))],
+    )
+
+
+def test_resolve_uses_the_class_rate_then_the_country_default():
+    rates = table()
+    assert rates.resolve(1, "US", 5).rate == Decimal("0.08")
+    assert rates.resolve(1, "us", 6).rate == Decimal("0.05")
+    assert rates.resolve(1, "FR", 5).rate == Decimal(0)
+
+
+def test_resolve_falls_back_to_the_default_country():
+    resolved = table().resolve(1, None, 5)
+    assert (resolved.country, resolved.rate) == ("US", Decimal("0.08"))
+    resolved = table().resolve(3, None, 5)
+    assert (resolved.country, resolved.rate) == (None, Decimal(0))
+
+
+def test_resolve_applies_configuration_and_country_exceptions():
+    rates = table()
+    resolved = rates.resolve(1, "US", None)
+    assert (resolved.charge_taxes, resolved.tax_calculation_strategy, resolved.display_gross_prices, resolved.prices_entered_with_tax) == (True, "FLAT_RATES", False, False)
+    # charge_taxes=False on the exception zeroes the rate
+    exempt = rates.resolve(1, "GB", None)
+    assert (exempt.charge_taxes, exempt.rate, exempt.tax_calculation_strategy) == (False, Decimal(0), "FLAT_RATES")
+    # NULL exception columns keep the channel's values
+    germany = rates.resolve(1, "DE", None)
+    assert (germany.rate, germany.display_gross_prices, germany.tax_app_id, germany.prices_entered_with_tax) == (Decimal("0.19"), True, "app", False)
+
+
+def test_resolve_without_a_configuration_uses_the_defaults():
+    resolved = table().resolve(2, None, None)
+    assert (resolved.country, resolved.rate, resolved.charge_taxes, resolved.prices_entered_with_tax) == ("DE", Decimal("0.19"), True, True)
+
+
+def test_table_is_rebuilt_after_a_commit_not_a_rollback(db):
+    db.add(Channel(name="Web", slug="web", currency_code="USD", default_country="US", delete_expired_orders_after=timedelta(days=60)))
+    db.add(TaxClassCountryRate(country="US", rate=Decimal("0.05")))
+    db.commit()
+    tax_rate_cache.invalidate()
+    cached = get_tax_rate_table(db)
+
+    db.add(TaxClassCountryRate(country="DE", rate=Decimal("0.19")))
+    db.flush()
+    db.rollback()
+    assert get_tax_rate_table(db) is cached
+
+    db.add(TaxClassCountryRate(country="DE", rate=Decimal("0.19")))
+    db.commit()
+    rebuilt = get_tax_rate_table(db)
+    assert rebuilt is not cached
+    assert rebuilt.resolve(1, "DE", None).rate == Decimal("0.19")
+
+
+def test_changes_committed_elsewhere_are_seen_on_the_next_request(db, engine):
+    db.add(Channel(name="Web", slug="web", currency_code="USD", default_country="US", delete_expired_orders_after=timedelta(days=60)))
+    db.add(TaxClassCountryRate(country="US", rate=Decimal("0.05")))
+    db.commit()
+    cached = get_tax_rate_table(db)
+    assert get_tax_rate_table(db) is cached
+
+    # A Core write, as another process would commit it: no local invalidation
+    with engine.begin() as connection:
+        connection.execute(update(TaxClassCountryRate).values(rate=Decimal("0.07"), updated_at=datetime(2100, 1, 1)))
+    rebuilt = get_tax_rate_table(db)
+    assert rebuilt is not cached
+    assert rebuilt.resolve(1, "US", None).rate == Decimal("0.07")
+
+    with engine.begin() as connection:
+        connection.execute(delete(TaxClassCountryRate))
+    assert get_tax_rate_table(db).resolve(1, "US", None).rate == Decimal(0)
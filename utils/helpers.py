@@ -0,0 +1,17 @@
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    """Digits only, so "+1 (555) 010-2030" and "15550102030" match."""
+    if value is None:
+        return None
+    return _NON_DIGITS.sub("", value) or None
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.strip().lower() or None